@@ -1,13 +1,35 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, render_template, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
-from pymongo import MongoClient
+from pymongo import MongoClient, ASCENDING, TEXT, IndexModel, ReplaceOne, ReturnDocument, UpdateOne, monitoring
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 from bson import ObjectId
-from datetime import datetime
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+import base64
+import csv
+import hashlib
+import io
+import json
+import mmap
 import os
-import random
+import re
 import string
+import struct
+import tempfile
+import threading
+import time
+import zlib
 from dotenv import load_dotenv
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it responses are gzip-only
+    brotli = None
+try:
+    import fcntl
+except ImportError:  # Windows: no shared version generations, versions are read from the store
+    fcntl = None
 from whitenoise import WhiteNoise
+from storage import CatalogStore, SQLiteCatalogStore
 
 app = Flask(__name__, static_folder='static')
 CORS(app)
@@ -27,96 +49,643 @@ load_dotenv()
 MONGO_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
 DB_NAME = os.getenv('DB_NAME', 'BooksDB')
 
-# Global variables for MongoDB connection
+# Catalog storage: 'mongodb' (default) or 'sqlite' for the embedded engine in storage.py
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'mongodb').lower()
+SQLITE_PATH = os.getenv('SQLITE_PATH', 'books.db')
+
+# Global variables for MongoDB connection. PyMongo clients are not fork-safe, so each
+# worker process opens its own: client_pid records which process created the client,
+# and one inherited from a parent (gunicorn --preload) is replaced on first use.
 client = None
+client_pid = None
 db = None
 authors_collection = None
 titles_collection = None
+store = None
+_connect_lock = threading.Lock()
 
-def init_mongodb():
-    """Initialize MongoDB connection - called on first request"""
-    global client, db, authors_collection, titles_collection
+# Client settings shared by the sync driver here and the async driver in asgi.py
+MONGO_CLIENT_OPTIONS = {
+    'serverSelectionTimeoutMS': 5000,   # 5 second timeout
+    'connectTimeoutMS': 10000,          # 10 second connection timeout
+    'socketTimeoutMS': 45000,           # 45 second socket timeout
+    'maxPoolSize': 50,                  # Connection pool size
+    'tls': True,                        # Enable TLS
+    'tlsAllowInvalidCertificates': False,
+    'retryWrites': True,
+    'appname': 'books-manager-app'      # Identify this connection in MongoDB logs
+}
+
+# Connections each worker opens before it reports ready, and the wait between failed warm-ups
+WARMUP_CONNECTIONS = int(os.getenv('MONGO_WARMUP_CONNECTIONS', 4))
+WARMUP_RETRY_SECONDS = float(os.getenv('MONGO_WARMUP_RETRY_SECONDS', 5))
+
+# After warm-up each worker pings every HEARTBEAT_INTERVAL seconds. It is ready while the
+# last successful ping is at most READY_MAX_STALENESS old, and alive while its heartbeat
+# thread has run at all within HEALTH_MAX_STALENESS (a ping can block for the timeouts above)
+HEARTBEAT_INTERVAL = float(os.getenv('HEARTBEAT_INTERVAL_SECONDS', 5))
+READY_MAX_STALENESS = float(os.getenv('READY_MAX_STALENESS_SECONDS', 15))
+HEALTH_MAX_STALENESS = float(os.getenv('HEALTH_MAX_STALENESS_SECONDS', 120))
+
+def mongo_connection_uri():
+    """Return MONGO_URI with the parameters MongoDB Atlas needs, plus a printable copy"""
+    # Parse the connection string
+    from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
     
-    if client is not None:
-        return  # Already initialized
+    # Parse the URI
+    parsed = urlparse(MONGO_URI)
+    query = parse_qs(parsed.query)
     
-    try:
-        # Ensure connection string has proper parameters for MongoDB Atlas
-        connection_uri = MONGO_URI
-        
-        # Parse the connection string
-        from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-        
-        # Parse the URI
-        parsed = urlparse(connection_uri)
-        query = parse_qs(parsed.query)
+    # Add required parameters
+    query['retryWrites'] = 'true'
+    query['w'] = 'majority'
+    
+    # For MongoDB Atlas, we need to use tls/ssl
+    if 'ssl' not in query:
+        query['ssl'] = 'true'
         
-        # Add required parameters
-        query['retryWrites'] = 'true'
-        query['w'] = 'majority'
+    # Rebuild the query string
+    new_query = urlencode(query, doseq=True)
+    
+    # Rebuild the URI
+    connection_uri = urlunparse(parsed._replace(query=new_query))
+    redacted = connection_uri.replace(parsed.password, '***') if parsed.password else connection_uri
+    return connection_uri, redacted
+
+def init_mongodb():
+    """Create this process's MongoDB client.
+    
+    The driver connects in the background, so this does not wait for the server;
+    worker_health checks the connection and fills the pool off the request path.
+    """
+    global client, client_pid, db, authors_collection, titles_collection
+    
+    with _connect_lock:
+        if client is not None and client_pid == os.getpid():
+            return  # Already initialized in this process
         
-        # For MongoDB Atlas, we need to use tls/ssl
-        if 'ssl' not in query:
-            query['ssl'] = 'true'
+        try:
+            # Ensure connection string has proper parameters for MongoDB Atlas
+            connection_uri, redacted_uri = mongo_connection_uri()
             
-        # Rebuild the query string
-        new_query = urlencode(query, doseq=True)
-        
-        # Rebuild the URI
-        connection_uri = urlunparse(parsed._replace(query=new_query))
-        
-        print(f"Connecting to MongoDB with URI: {connection_uri.replace(parsed.password, '***') if parsed.password else connection_uri}")
-        
-        # Configure the client with SSL and other options
-        client = MongoClient(
-            connection_uri,
-            serverSelectionTimeoutMS=5000,  # 5 second timeout
-            connectTimeoutMS=10000,         # 10 second connection timeout
-            socketTimeoutMS=45000,          # 45 second socket timeout
-            maxPoolSize=50,                 # Connection pool size
-            tls=True,                       # Enable TLS
-            tlsAllowInvalidCertificates=False,
-            retryWrites=True,
-            appname='books-manager-app'     # Identify this connection in MongoDB logs
-        )
-        
-        # Test connection
-        client.admin.command('ping')
-        db = client[DB_NAME]
-        authors_collection = db['authors']
-        titles_collection = db['titles']
-        print(f"✅ Successfully connected to MongoDB database: {DB_NAME}")
-    except Exception as e:
-        print(f"❌ MongoDB connection error: {str(e)}")
-        print("⚠️  Make sure MONGODB_URI is set correctly in environment variables")
-        print("⚠️  Check MongoDB Atlas Network Access allows connections from Render (0.0.0.0/0)")
-        print("⚠️  IMPORTANT: Set Python version to 3.11 in Render dashboard (Settings → Environment)")
-        raise
+            print(f"Connecting to MongoDB with URI: {redacted_uri} (pid {os.getpid()})")
+            
+            # Configure the client with SSL and other options. A client inherited
+            # across fork is dropped, not closed: its sockets belong to the parent.
+            client = MongoClient(connection_uri, event_listeners=mongo_event_listeners('sync'), **MONGO_CLIENT_OPTIONS)
+            client_pid = os.getpid()
+            db = client[DB_NAME]
+            authors_collection = db['authors']
+            titles_collection = db['titles']
+        except Exception as e:
+            print(f"❌ MongoDB connection error: {str(e)}")
+            print("⚠️  Make sure MONGODB_URI is set correctly in environment variables")
+            raise
 
 # Helper function to ensure MongoDB is initialized
 def ensure_db():
-    """Ensure MongoDB connection is initialized"""
-    global client, db, authors_collection, titles_collection
-    if client is None or db is None:
+    """Ensure this process has its own MongoDB client"""
+    if STORAGE_BACKEND == 'sqlite':
+        raise RuntimeError('MongoDB is not configured (STORAGE_BACKEND=sqlite)')
+    if client is None or client_pid != os.getpid():
         init_mongodb()
     return db, authors_collection, titles_collection
 
-# Try to initialize on import, but don't crash if it fails
-try:
-    init_mongodb()
-except Exception as e:
-    print("⚠️  MongoDB connection will be retried on first request")
-    # Don't raise - allow app to start
+def get_store():
+    """The catalog store of this process, opened on first use"""
+    global store
+    if STORAGE_BACKEND != 'sqlite':
+        ensure_db()
+    if store is None:
+        with _connect_lock:
+            if store is None and STORAGE_BACKEND == 'sqlite':
+                store = SQLiteCatalogStore(SQLITE_PATH, tombstone_retention=CHANGES_RETENTION)
+                print(f"✅ Using the embedded SQLite catalog at {SQLITE_PATH}")
+            elif store is None:
+                store = MongoCatalogStore()
+    return store
+
+class WorkerHealth:
+    """Warm-up and heartbeat of this worker process.
+    
+    start() runs the store's warm-up (connect, reconcile indexes, open pooled
+    connections) on a background thread, retrying until it succeeds, so neither
+    boot nor the first request waits on a database round trip. The same thread
+    then pings every HEARTBEAT_INTERVAL seconds and keeps the outcome, so the
+    health and readiness probes answer from memory however often they poll.
+    A forked worker starts over with its own state.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self.warmed_up = False
+        self.error = None
+        self.attempts = 0
+        self.failures = 0         # Consecutive failed heartbeats
+        self.started_at = None    # time.monotonic() of each event
+        self.warmed_up_at = None
+        self.last_beat = None     # Last warm-up attempt or heartbeat, successful or not
+        self.last_ok = None       # Last successful warm-up or heartbeat
+        self.ping_ms = None
+    
+    def start(self):
+        """Begin warming up this process; a no-op once started"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.warmed_up = False
+            self.error = None
+            self.attempts = self.failures = 0
+            self.started_at = time.monotonic()
+            self.warmed_up_at = self.last_beat = self.last_ok = self.ping_ms = None
+            threading.Thread(target=self._run, name='worker-health', daemon=True).start()
+    
+    def _run(self):
+        while not self.warmed_up:
+            self.attempts += 1
+            try:
+                get_store().warm_up()
+            except Exception as e:
+                self.error = str(e)
+                print(f"❌ Warm-up of worker {os.getpid()} failed (attempt {self.attempts}): {self.error}")
+                if self.attempts == 1 and STORAGE_BACKEND != 'sqlite':
+                    print("⚠️  Check MongoDB Atlas Network Access allows connections from Render (0.0.0.0/0)")
+                    print("⚠️  IMPORTANT: Set Python version to 3.11 in Render dashboard (Settings → Environment)")
+                self.last_beat = time.monotonic()
+                time.sleep(WARMUP_RETRY_SECONDS)
+                continue
+            self.error = None
+            self.warmed_up_at = self.last_beat = self.last_ok = time.monotonic()
+            self.warmed_up = True
+            print(f"✅ Worker {os.getpid()} ready in {self.warmed_up_at - self.started_at:.2f}s")
+        
+        while True:
+            time.sleep(HEARTBEAT_INTERVAL)
+            self._beat()
+    
+    def _beat(self):
+        started = time.perf_counter()
+        try:
+            get_store().ping()
+        except Exception as e:
+            self.error = str(e)
+            self.failures += 1
+            if self.failures == 1:
+                print(f"❌ Heartbeat of worker {os.getpid()} failed: {self.error}")
+        else:
+            if self.failures:
+                print(f"✅ Worker {os.getpid()} reached the database again after {self.failures} failed heartbeats")
+            self.error = None
+            self.failures = 0
+            self.ping_ms = (time.perf_counter() - started) * 1000
+            self.last_ok = time.monotonic()
+        self.last_beat = time.monotonic()
+    
+    def _age(self, moment):
+        return None if moment is None else time.monotonic() - moment
+    
+    def liveness_error(self):
+        """Why this worker should be restarted, or None: its heartbeat thread stopped beating"""
+        if self._pid != os.getpid():
+            return None  # Not started yet in this process
+        age = self._age(self.last_beat if self.last_beat is not None else self.started_at)
+        if age > HEALTH_MAX_STALENESS:
+            return f'No heartbeat for {age:.0f}s'
+        return None
+    
+    def readiness_error(self):
+        """Why this worker should not get traffic, or None"""
+        if self._pid != os.getpid() or not self.warmed_up:
+            return self.error or 'Warming up'
+        age = self._age(self.last_ok)
+        if age > READY_MAX_STALENESS:
+            return self.error or f'No successful heartbeat for {age:.0f}s'
+        return None
+    
+    @property
+    def ready(self):
+        return self.readiness_error() is None
+    
+    def status(self):
+        def rounded(value):
+            return None if value is None else round(value, 3)
+        
+        own = self._pid == os.getpid()
+        return {
+            'pid': os.getpid(),
+            'alive': self.liveness_error() is None,
+            'ready': self.ready,
+            'backend': STORAGE_BACKEND,
+            'warmup_attempts': self.attempts if own else 0,
+            'warmup_seconds': rounded(self.warmed_up_at - self.started_at) if own and self.warmed_up else None,
+            'last_heartbeat_age_seconds': rounded(self._age(self.last_beat)) if own else None,
+            'last_success_age_seconds': rounded(self._age(self.last_ok)) if own else None,
+            'ping_ms': rounded(self.ping_ms) if own else None,
+            'consecutive_failures': self.failures if own else 0,
+            'error': self.error if own else None,
+            'index_errors': index_build_errors if own else {},
+            'pool': pool_stats('sync'),
+        }
+
+worker_health = WorkerHealth()
+
+# ==================== INDEXES ====================
+
+# Deleted authors and titles leave a tombstone for /api/changes, expired after this long
+CHANGES_RETENTION = int(os.getenv('CHANGES_RETENTION_SECONDS', 7 * 24 * 3600))
+
+# Indexes the app depends on, reconciled by each worker's warm-up.
+# Every hot path filters on au_id, title_id or the multikey authors.au_id,
+# so none of them may fall back to a COLLSCAN.
+MANAGED_INDEXES = {
+    'authors': [
+        IndexModel([('au_id', ASCENDING)], name='au_id_unique', unique=True),
+        IndexModel([('updated_at', ASCENDING)], name='updated_at'),
+        IndexModel([('search_keys', ASCENDING)], name='search_keys'),
+    ],
+    'titles': [
+        IndexModel([('title_id', ASCENDING)], name='title_id_unique', unique=True),
+        IndexModel([('authors.au_id', ASCENDING)], name='authors_au_id'),
+        IndexModel([('updated_at', ASCENDING)], name='updated_at'),
+        IndexModel([('search_keys', ASCENDING)], name='search_keys'),
+        IndexModel([('notes', TEXT)], name='notes_text', weights={'notes': 1}),
+    ],
+    'tombstones': [
+        IndexModel([('deleted_at', ASCENDING)], name='deleted_at_ttl', expireAfterSeconds=CHANGES_RETENTION),
+    ],
+}
+
+# Indexes the app used to manage and no longer reads, dropped so writes stop maintaining them
+RETIRED_INDEXES = {
+    'authors': ['change_seq'],
+    'titles': ['change_seq'],
+    'tombstones': ['change_seq'],
+}
+
+INDEX_REPORT_ON_STARTUP = os.getenv('INDEX_REPORT_ON_STARTUP', 'False').lower() == 'true'
+
+# Index options that must match for an existing index to count as the managed one
+INDEX_OPTIONS = ('unique', 'sparse', 'partialFilterExpression', 'collation', 'weights', 'expireAfterSeconds')
+
+def _index_key(key):
+    """An index key as index_information() reports it; text fields are stored as _fts/_ftsx"""
+    key = list(key.items())
+    if any(direction == TEXT for _, direction in key):
+        return [('_fts', TEXT), ('_ftsx', 1)]
+    return key
+
+def _index_matches(existing, wanted):
+    """Check whether an index_information() entry satisfies an IndexModel document"""
+    if list(existing['key']) != _index_key(wanted['key']):
+        return False
+    return all(existing.get(opt) == wanted.get(opt) for opt in INDEX_OPTIONS)
+
+class IndexBuildError(RuntimeError):
+    """A managed index could not be built; the existing ones were left in place"""
+
+# Managed indexes this worker's warm-up could not build, 'collection.name' -> error.
+# Usually data the index rejects (e.g. duplicate IDs drawn before the allocator
+# existed), which no retry fixes, so they are reported by /api/ready and the index
+# report rather than holding the worker back.
+index_build_errors = {}
+
+def _model_from_info(name, info):
+    """An IndexModel that recreates an index_information() entry"""
+    if 'weights' in info:
+        key = [(field, TEXT) for field in info['weights']]
+    else:
+        key = list(info['key'])
+    options = {opt: info[opt] for opt in INDEX_OPTIONS if opt in info}
+    return IndexModel(key, name=name, **options)
+
+def _duplicate_key(collection, key):
+    """One set of values that occurs more than once for the key fields, or None"""
+    group = {field.replace('.', '_'): f'${field}' for field, _ in key}
+    pipeline = [
+        {'$group': {'_id': group, 'count': {'$sum': 1}}},
+        {'$match': {'count': {'$gt': 1}}},
+        {'$limit': 1},
+    ]
+    duplicate = next(collection.aggregate(pipeline, allowDiskUse=True), None)
+    return duplicate['_id'] if duplicate else None
+
+def _rebuild_index(collection, model, stale, existing):
+    """Replace the stale indexes by model without leaving the key pattern unindexed.
+
+    A unique index is checked for duplicates before anything is dropped. A
+    stand-in on the same keys plus _id serves the queries while the old index is
+    dropped and the new one built (MongoDB allows one text index per collection,
+    so a text index is instead restored from its old definition if the build fails).
+    """
+    wanted = model.document
+    name = wanted['name']
+    key = list(wanted['key'].items())
+    is_text = any(direction == TEXT for _, direction in key)
+    
+    if wanted.get('unique'):
+        duplicate = _duplicate_key(collection, key)
+        if duplicate is not None:
+            raise IndexBuildError(f'{collection.name}.{name}: duplicate values {duplicate}')
+    
+    standin = None
+    if not is_text:
+        options = {opt: wanted[opt] for opt in INDEX_OPTIONS if opt in wanted and opt != 'unique'}
+        standin = f'{name}_rebuild'
+        collection.create_indexes([IndexModel(key + [('_id', ASCENDING)], name=standin, **options)])
+    
+    for old in stale:
+        print(f"♻️  Dropping outdated index {collection.name}.{old}")
+        collection.drop_index(old)
+    try:
+        collection.create_indexes([model])
+    except OperationFailure:
+        if is_text:
+            collection.create_indexes([_model_from_info(old, existing[old]) for old in stale])
+            print(f"↩️  Restored {', '.join(stale)} on {collection.name}")
+        raise
+    if standin is not None:
+        collection.drop_index(standin)
+
+def ensure_indexes(database):
+    """Create missing managed indexes and rebuild any whose definition drifted.
+    
+    Returns the indexes that could not be built, 'collection.name' -> error, after
+    reconciling the rest. An index is only dropped once its replacement is in place.
+    """
+    failures = {}
+    for collection_name, models in MANAGED_INDEXES.items():
+        collection = database[collection_name]
+        existing = collection.index_information()
+        
+        for name in RETIRED_INDEXES.get(collection_name, []):
+            if name in existing:
+                print(f"♻️  Dropping retired index {collection_name}.{name}")
+                collection.drop_index(name)
+                del existing[name]
+        
+        for model in models:
+            wanted = model.document
+            name = wanted['name']
+            
+            if name in existing and _index_matches(existing[name], wanted):
+                continue
+            
+            # Same keys under another name (e.g. created by hand) count as present if the options match
+            same_keys = [
+                other for other, info in existing.items()
+                if other != name and list(info['key']) == _index_key(wanted['key'])
+            ]
+            if any(_index_matches(existing[other], wanted) for other in same_keys):
+                continue
+            
+            try:
+                stale = ([name] if name in existing else []) + same_keys
+                if stale:
+                    _rebuild_index(collection, model, stale, existing)
+                else:
+                    collection.create_indexes([model])
+                print(f"✅ Created index {collection_name}.{name}")
+            except (OperationFailure, IndexBuildError) as e:
+                # e.g. duplicate au_id values block a unique index
+                print(f"❌ Could not create index {collection_name}.{name}: {str(e)}")
+                failures[f'{collection_name}.{name}'] = str(e)
+    return failures
+
+def index_report_queries():
+    """The canonical query shapes of the hot paths, as explainable commands"""
+    sample_author = '000-00-0000'
+    sample_title = 'AA0000'
+    return [
+        ('get_authors', {
+            'find': 'authors', 'filter': {'au_id': {'$gt': sample_author}},
+            'sort': {'au_id': 1}, 'limit': DEFAULT_PAGE_SIZE + 1
+        }),
+        ('get_author', {'find': 'authors', 'filter': {'au_id': sample_author}}),
+        ('get_titles', {
+            'find': 'titles', 'filter': {'title_id': {'$gt': sample_title}},
+            'projection': TITLE_PROJECTION, 'sort': {'title_id': 1}, 'limit': DEFAULT_PAGE_SIZE + 1
+        }),
+        ('get_title', {'find': 'titles', 'filter': {'title_id': sample_title}, 'projection': TITLE_PROJECTION}),
+        ('get_titles_by_author', {
+            'find': 'titles', 'filter': {'authors.au_id': sample_author},
+            'projection': TITLES_BY_AUTHOR_PROJECTION, 'sort': {'title_id': 1}
+        }),
+        ('delete_author', {'find': 'titles', 'filter': {'authors.au_id': sample_author}}),
+        ('resolve_title_authors', {'find': 'authors', 'filter': {'au_id': {'$in': [sample_author]}}}),
+        ('search_authors', {
+            'find': 'authors', 'filter': search_filter(['smi']), 'limit': SEARCH_CANDIDATES
+        }),
+        ('search_titles', {
+            'find': 'titles', 'filter': search_filter(['smi']), 'limit': SEARCH_CANDIDATES
+        }),
+        ('refresh_author_stats', {
+            'aggregate': 'titles', 'pipeline': author_stats_pipeline([sample_author]), 'cursor': {}
+        }),
+        ('get_author_profile', {
+            'aggregate': 'authors', 'pipeline': author_profile_pipeline(sample_author), 'cursor': {}
+        }),
+        ('search_notes', {
+            'find': 'titles', 'filter': {'$text': {'$search': 'smith'}}, 'limit': SEARCH_CANDIDATES
+        }),
+    ]
+
+def _plan_stages(node, stages):
+    """Collect every plan stage name found anywhere in an explain document"""
+    if isinstance(node, dict):
+        if isinstance(node.get('stage'), str):
+            stages.append(node['stage'])
+        for value in node.values():
+            _plan_stages(value, stages)
+    elif isinstance(node, list):
+        for item in node:
+            _plan_stages(item, stages)
+    return stages
+
+def index_report(database):
+    """Explain each canonical query and flag any that would scan a whole collection"""
+    report = []
+    for name, command in index_report_queries():
+        entry = {'query': name, 'collection': command.get('find') or command.get('aggregate')}
+        try:
+            plan = database.command('explain', command, verbosity='queryPlanner')
+            entry['stages'] = sorted(set(_plan_stages(plan, [])))
+            entry['collscan'] = 'COLLSCAN' in entry['stages']
+        except OperationFailure as e:
+            entry['error'] = str(e)
+        report.append(entry)
+    return report
+
+def print_index_report(report):
+    """Print an index report and return True when every query is index-backed"""
+    healthy = True
+    for entry in report:
+        if 'error' in entry:
+            healthy = False
+            print(f"❌ {entry['query']}: explain failed: {entry['error']}")
+        elif entry['collscan']:
+            healthy = False
+            print(f"❌ {entry['query']}: COLLSCAN on {entry['collection']} ({', '.join(entry['stages'])})")
+        else:
+            print(f"✅ {entry['query']}: {', '.join(entry['stages'])}")
+    return healthy
+
+@app.cli.command('index-report')
+def index_report_command():
+    """Reconcile managed indexes, then explain the hot paths and fail on any COLLSCAN"""
+    database, _, _ = ensure_db()
+    failures = ensure_indexes(database)
+    if not print_index_report(index_report(database)) or failures:
+        raise SystemExit(1)
+
+# ==================== ID ALLOCATION ====================
+
+# IDs come from per-collection sequences in the counters collection. Each worker
+# leases a block of ID_BLOCK_SIZE numbers with one atomic $inc, then hands them
+# out locally, so inserts never pay an extra round trip to pick a unique ID.
+ID_BLOCK_SIZE = int(os.getenv('ID_BLOCK_SIZE', 100))
+ID_INSERT_RETRIES = 5
+
+AUTHOR_ID_SPACE = 900 * 90 * 9000   # XXX-XX-XXXX
+TITLE_ID_SPACE = 26 * 26 * 10000    # LLNNNN
+
+class IdAllocator:
+    """Hands out sequence numbers from blocks leased from the counters collection"""
+    
+    def __init__(self, name, capacity):
+        self.name = name
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._pid = None
+        self._next = 0
+        self._end = 0
+    
+    def take(self, count=1):
+        """Return the next ``count`` unused sequence numbers"""
+        with self._lock:
+            # A forked worker must not hand out numbers from its parent's block
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._next = self._end = 0
+            
+            numbers = []
+            while len(numbers) < count:
+                if self._next >= self._end:
+                    self._lease(max(ID_BLOCK_SIZE, count - len(numbers)))
+                take = min(self._end - self._next, count - len(numbers))
+                numbers.extend(range(self._next, self._next + take))
+                self._next += take
+            return numbers
+    
+    def _lease(self, size):
+        end = get_store().lease_ids(self.name, size)
+        if end > self.capacity:
+            raise RuntimeError(f'No {self.name} IDs left to allocate')
+        self._next, self._end = end - size, end
+
+author_ids = IdAllocator('authors', AUTHOR_ID_SPACE)
+title_ids = IdAllocator('titles', TITLE_ID_SPACE)
+
+def format_author_id(seq):
+    """Map a sequence number onto the XXX-XX-XXXX author ID format"""
+    seq, last = divmod(seq, 9000)
+    first, middle = divmod(seq, 90)
+    return f"{100 + first}-{10 + middle}-{1000 + last}"
+
+def format_title_id(seq):
+    """Map a sequence number onto the LLNNNN title ID format"""
+    letters, numbers = divmod(seq, 10000)
+    first, second = divmod(letters, 26)
+    return f"{string.ascii_uppercase[first]}{string.ascii_uppercase[second]}{numbers:04d}"
 
 def generate_author_id():
     """Generate a unique author ID in format XXX-XX-XXXX"""
-    return f"{random.randint(100,999)}-{random.randint(10,99)}-{random.randint(1000,9999)}"
+    return format_author_id(author_ids.take()[0])
 
 def generate_title_id():
     """Generate a unique title ID in format LLNNNN"""
-    letters = ''.join(random.choices(string.ascii_uppercase, k=2))
-    numbers = ''.join(random.choices(string.digits, k=4))
-    return letters + numbers
+    return format_title_id(title_ids.take()[0])
+
+def insert_with_generated_id(collection, document, id_field, generate_id):
+    """Insert a document under a freshly allocated ID.
+
+    Sequence IDs never collide with each other, but they can land on an ID that
+    was drawn at random before the allocator existed. The unique index rejects
+    that insert and we simply move on to the next ID.
+    """
+    for _ in range(ID_INSERT_RETRIES):
+        document[id_field] = generate_id()
+        document.pop('_id', None)
+        try:
+            return collection.insert_one(document)
+        except DuplicateKeyError as e:
+            key_pattern = (e.details or {}).get('keyPattern')
+            if key_pattern is not None and id_field not in key_pattern:
+                raise
+    raise RuntimeError(f'Could not allocate a unique {id_field}')
+
+# Keyset pagination settings for the list endpoints
+DEFAULT_PAGE_SIZE = int(os.getenv('DEFAULT_PAGE_SIZE', 100))
+MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 1000))
+
+def encode_cursor(last_key):
+    """Encode the sort key of the last returned row into an opaque cursor"""
+    payload = json.dumps({'k': last_key}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Decode an opaque cursor back into the sort key it was created from"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        last_key = payload['k']
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(last_key, str):
+        raise ValueError('Invalid cursor')
+    return last_key
+
+def parse_page_args(args):
+    """Read the pagination query parameters from a request's args.
+
+    Returns (paginate, limit, after). ``?all=true`` turns pagination off and
+    returns the full, unpaginated list for backward compatibility.
+    """
+    if args.get('all', '').lower() in ('1', 'true', 'yes'):
+        return False, None, None
+
+    limit = parse_limit(args.get('limit', DEFAULT_PAGE_SIZE))
+    after = args.get('after')
+    return True, limit, decode_cursor(after) if after else None
+
+def parse_limit(limit):
+    """Validate a page size and cap it at MAX_PAGE_SIZE"""
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    if limit < 1:
+        raise ValueError('limit must be at least 1')
+    return min(limit, MAX_PAGE_SIZE)
+
+def page_response(rows, limit, key):
+    """Trim a limit + 1 fetch down to one page and build the response envelope"""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        'success': True,
+        'data': rows,
+        'next_cursor': encode_cursor(rows[-1][key]) if has_more and rows else None
+    }
+
+def isoformat_utc(value):
+    """Format a stored (naive UTC) timestamp as ISO 8601"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat().replace('+00:00', 'Z')
 
 def serialize_objectid(obj):
     """Recursively convert ObjectId instances to strings in dictionaries and lists"""
@@ -129,179 +698,1178 @@ def serialize_objectid(obj):
     else:
         return obj
 
-# ==================== MAIN PAGE ====================
+# ==================== SPARSE FIELDSETS ====================
 
-@app.route('/')
-def index():
-    """Serve the main page"""
-    return render_template('index.html')
+# Read endpoints take ``?fields=a,b,c`` and compile it into the MongoDB projection,
+# so fields the client does not want are never read, sent or serialized.
 
-# ==================== AUTHOR ENDPOINTS ====================
+def parse_fields(args, allowed):
+    """Read ``?fields=`` into a sorted tuple of field names, or None for the full document"""
+    raw = args.get('fields')
+    if raw is None:
+        return None
+    fields = {field.strip() for field in raw.split(',') if field.strip()}
+    unknown = sorted(fields - set(allowed))
+    if unknown:
+        raise ValueError(
+            f"Unknown field{'s' if len(unknown) > 1 else ''}: {', '.join(unknown)} "
+            f"(allowed: {', '.join(allowed)})"
+        )
+    return tuple(sorted(fields))
 
-def serialize_author(author):
-    """Convert MongoDB document to JSON serializable format"""
-    if not author:
+def fields_projection(fields, key, default):
+    """Compile a sparse fieldset into a projection; the key field is always returned.
+
+    ``authors`` stands for every field of the title's author entries.
+    """
+    if fields is None:
+        return default
+    projection = {'_id': 1 if '_id' in fields else 0, key: 1}
+    for field in fields:
+        if field == 'authors':
+            projection.update({path: 1 for path in TITLE_PROJECTION if path.startswith('authors.')})
+        elif field != '_id':
+            projection[field] = 1
+    return projection
+
+# ==================== READ CACHE ====================
+
+# Serialized responses of the catalog read endpoints, kept per worker process.
+# Entries are tagged with what they contain ('authors', 'titles', 'title:<id>',
+# 'author:<id>') and every write handler invalidates exactly the tags it touched.
+CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', 32 * 1024 * 1024))
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+CACHE_TTL_SECONDS = float(os.getenv('CACHE_TTL_SECONDS', 300))
+
+class ResponseCache:
+    """Bounded LRU cache of response bodies with a TTL, a memory cap and tag invalidation"""
+    
+    def __init__(self, max_bytes, max_entries, ttl):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (body, tags, expires_at)
+        self._tags = {}                # tag -> set of keys
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+    
+    def get(self, key):
+        """Return the cached body for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[2] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def set(self, key, body, tags):
+        """Store a body under key, evicting least recently used entries to stay within the caps"""
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (body, tuple(tags), time.monotonic() + self.ttl)
+            self._bytes += len(body)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+    
+    def invalidate(self, *tags):
+        """Drop every entry carrying any of the given tags"""
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.get(tag, set()).copy():
+                    self._remove(key)
+                    self.invalidations += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+    
+    def _remove(self, key):
+        body, tags, _ = self._entries.pop(key)
+        self._bytes -= len(body)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+read_cache = ResponseCache(CACHE_MAX_BYTES, CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS)
+
+def cached_response(key, etag):
+    """Answer from the client's validator or the read cache; None means the caller must query.
+
+    Cache entries are stored per ETag, so a body cached before another worker's
+    write is never served once the collection version has moved on.
+    """
+    if etag_matches(request.if_none_match, etag):
+        return not_modified(etag)
+    body = read_cache.get((key, etag))
+    if body is None:
         return None
-    author['_id'] = str(author['_id'])  # Convert ObjectId to string
-    return author
+    return with_etag(app.response_class(body, mimetype='application/json'), etag)
 
-@app.route('/api/authors', methods=['GET'])
-def get_authors():
-    """Get all authors"""
-    try:
-        _, authors_collection, _ = ensure_db()
-        authors = list(authors_collection.find({}).sort('au_id', 1))
-        return jsonify({
-            'success': True, 
-            'data': [serialize_author(author) for author in authors]
-        })
-    except Exception as e:
-        return jsonify({
-            'success': False, 
-            'error': str(e)
-        }), 500
+def cache_response(key, etag, payload, tags):
+    """Serialize a payload into a JSON response and remember its body under key"""
+    response = app.json.response(payload)
+    read_cache.set((key, etag), response.get_data(), tags)
+    return with_etag(response, etag)
 
-@app.route('/api/authors', methods=['POST'])
-def add_author():
-    """Add a new author"""
-    try:
-        _, authors_collection, _ = ensure_db()
-        data = request.json
-        au_name = data.get('au_name', '').strip()
-        
-        if not au_name:
-            return jsonify({'success': False, 'error': 'Author last name is required'}), 400
-        
-        # Create author document
-        author = {
-            'au_id': generate_author_id(),
-            'au_name': au_name,
-            'au_fname': data.get('au_fname', '').strip() or None,
-            'phone': data.get('phone', '').strip() or None,
-            'address': data.get('address', '').strip() or None,
-            'city': data.get('city', '').strip() or None,
-            'state': data.get('state', '').strip() or None,
-            'zip': data.get('zip', '').strip() or None,
-            'contract': data.get('contract', False)
+def title_tags(title_id, au_ids):
+    """Cache tags touched by a write to one title"""
+    return ['titles', f'title:{title_id}'] + [f'author:{au_id}' for au_id in au_ids]
+
+# ==================== CONDITIONAL REQUESTS ====================
+
+# Every write bumps a per-collection version stored in Mongo, so all workers agree
+# on it. Read endpoints derive a strong ETag from the versions they depend on and
+# answer If-None-Match with 304 Not Modified before running any query.
+#
+# Reading those versions would cost a round trip per request, so each worker keeps
+# its own copy. After a write commits, the writer also bumps the collection's
+# generation in a memory-mapped file that every worker on the host maps, and a
+# worker only goes back to the store when a generation it depends on has moved,
+# or when its copy is older than VERSIONS_MAX_AGE (which bounds how long a write
+# made on another host can go unnoticed). Checking costs a few memory reads.
+VERSIONS_MAX_AGE = float(os.getenv('VERSIONS_MAX_AGE_SECONDS', 1))
+
+def default_generations_path():
+    """One file per catalog, in shared memory where the platform has it"""
+    directory = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    catalog = SQLITE_PATH if STORAGE_BACKEND == 'sqlite' else f'{MONGO_URI}|{DB_NAME}'
+    digest = hashlib.sha1(f'{STORAGE_BACKEND}|{catalog}'.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(directory, f'books-versions-{digest}')
+
+# Empty disables the shared generations; every read then asks the store
+SHARED_VERSIONS_PATH = os.getenv('SHARED_VERSIONS_PATH', default_generations_path())
+
+class SharedGenerations:
+    """Write generation counters shared by every process on the host through one mmapped file.
+    
+    Collections hash onto a fixed number of 8-byte slots; two collections sharing a
+    slot only cost each other extra refreshes. Increments hold an exclusive flock,
+    so concurrent writers in different workers never lose one.
+    """
+    
+    SLOTS = 64
+    SIZE = SLOTS * 8
+    
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pid = None
+        self._fd = None
+        self._map = None
+    
+    def _mapping(self):
+        # flock belongs to the open file, which a forked worker shares with its
+        # parent, so every process opens the file itself
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+                    if os.fstat(fd).st_size < self.SIZE:
+                        os.ftruncate(fd, self.SIZE)
+                    self._fd, self._map = fd, mmap.mmap(fd, self.SIZE)
+                    self._pid = os.getpid()
+        return self._map
+    
+    def _offset(self, name):
+        return (zlib.crc32(name.encode('utf-8')) % self.SLOTS) * 8
+    
+    def read(self, collections):
+        mapping = self._mapping()
+        return tuple(struct.unpack_from('<Q', mapping, self._offset(name))[0] for name in collections)
+    
+    def bump(self, *collections):
+        mapping = self._mapping()
+        with self._lock:  # flock does not exclude threads sharing the descriptor
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                for offset in {self._offset(name) for name in collections}:
+                    struct.pack_into('<Q', mapping, offset, struct.unpack_from('<Q', mapping, offset)[0] + 1)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+class VersionCache:
+    """This worker's copy of the store's collection versions, per combination of collections read"""
+    
+    def __init__(self, generations, max_age):
+        self.generations = generations
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.hits = 0
+        self.refreshes = 0
+    
+    def lookup(self, collections):
+        """Return (versions, token): versions is None when the caller must read the store,
+        then hand the token and what it read to remember()"""
+        if self.generations is None:
+            return None, None
+        # Read the generations before the store: a write that lands in between
+        # moves them again and the next lookup refreshes
+        token = (self.generations.read(collections), time.monotonic())
+        with self._lock:
+            entry = self._entries.get(collections)
+            if entry is not None and entry[0] == token[0] and token[1] - entry[2] < self.max_age:
+                self.hits += 1
+                return entry[1], token
+            self.refreshes += 1
+        return None, token
+    
+    def remember(self, collections, token, versions):
+        if token is not None:
+            with self._lock:
+                self._entries[collections] = (token[0], versions, token[1])
+    
+    def bump(self, *collections):
+        if self.generations is not None:
+            self.generations.bump(*collections)
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'shared': self.generations.path if self.generations is not None else None,
+                'max_age_seconds': self.max_age,
+                'hits': self.hits,
+                'refreshes': self.refreshes,
+            }
+
+version_cache = VersionCache(
+    SharedGenerations(SHARED_VERSIONS_PATH) if SHARED_VERSIONS_PATH and fcntl is not None else None,
+    VERSIONS_MAX_AGE
+)
+
+def bump_versions(*collections, session=None):
+    """Increment the version of each named collection in one round trip.
+    
+    Inside a transaction, call versions_changed once it has committed.
+    """
+    get_store().bump_versions(*collections, session=session)
+    if session is None:
+        versions_changed(*collections)
+
+def versions_changed(*collections):
+    """Tell every worker on this host that committed writes moved these collection versions"""
+    version_cache.bump(*collections)
+
+def collection_versions(*collections):
+    """Current version of each named collection, from this worker's copy while it is current"""
+    versions, token = version_cache.lookup(collections)
+    if versions is None:
+        versions = get_store().collection_versions(*collections)
+        version_cache.remember(collections, token, versions)
+    return versions
+
+def make_etag(key, versions):
+    """Hash a cache key and the collection versions it was read at into an ETag"""
+    return hashlib.sha1(repr((key, versions)).encode('utf-8')).hexdigest()[:20]
+
+def resource_etag(key, *collections):
+    """Strong ETag for a read endpoint: changes whenever the collections it reads change"""
+    return make_etag(key, collection_versions(*collections))
+
+def with_etag(response, etag):
+    """Attach the validator and make clients revalidate before reusing their copy"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def not_modified(etag):
+    return with_etag(app.response_class(status=304), etag)
+
+# ==================== STREAMING ====================
+
+# Unpaginated lists are streamed straight from the cursor instead of being built
+# as a list, a serialized list and a JSON string, so memory stays flat per request.
+STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', 500))
+
+def stream_list_response(documents, serialize, etag):
+    """Stream a cursor (or a store's batched iterator) as the usual {"success": true, "data": [...]} envelope.
+
+    Documents are fetched STREAM_BATCH_SIZE at a time and each batch is written
+    out as one chunk, so at most one batch is held in memory.
+    """
+    if etag_matches(request.if_none_match, etag):
+        return not_modified(etag)
+    
+    def generate():
+        yield '{"success":true,"data":['
+        separator = ''
+        chunk = []
+        for document in documents:
+            chunk.append(separator + app.json.dumps(serialize(document), separators=(',', ':')))
+            separator = ','
+            if len(chunk) >= STREAM_BATCH_SIZE:
+                yield ''.join(chunk)
+                chunk = []
+        yield ''.join(chunk) + ']}\n'
+    
+    response = app.response_class(stream_with_context(generate()), mimetype='application/json')
+    return with_etag(response, etag)
+
+# ==================== COMPRESSION ====================
+
+# API responses are compressed with the best encoding the client accepts (brotli
+# when the brotli package is installed, else gzip). Bodies under
+# COMPRESS_MIN_BYTES go out as is; streamed responses are compressed chunk by
+# chunk. A compressed representation gets its own ETag (<etag>-gzip / <etag>-br)
+# and compressed bodies of ETagged responses are kept in the read cache.
+COMPRESS_MIN_BYTES = int(os.getenv('COMPRESS_MIN_BYTES', 1024))
+COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))      # gzip, 1-9
+BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', 5))      # brotli, 0-11
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/csv')
+ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+class CompressionStats:
+    """Raw vs. sent byte counters per encoding, for this worker"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+    
+    def record(self, encoding, raw_bytes, sent_bytes):
+        with self._lock:
+            counter = self._counters.setdefault(encoding, {'responses': 0, 'raw_bytes': 0, 'sent_bytes': 0})
+            counter['responses'] += 1
+            counter['raw_bytes'] += raw_bytes
+            counter['sent_bytes'] += sent_bytes
+    
+    def stats(self):
+        with self._lock:
+            counters = {encoding: dict(counter) for encoding, counter in self._counters.items()}
+        raw = sum(counter['raw_bytes'] for counter in counters.values())
+        sent = sum(counter['sent_bytes'] for counter in counters.values())
+        return {
+            'encodings': counters,
+            'available': list(ENCODINGS),
+            'min_bytes': COMPRESS_MIN_BYTES,
+            'raw_bytes': raw,
+            'sent_bytes': sent,
+            'saved_bytes': raw - sent,
+            'ratio': round(sent / raw, 3) if raw else None
         }
-        
-        # Insert into MongoDB
-        result = authors_collection.insert_one(author)
-        
-        return jsonify({
-            'success': True, 
-            'message': 'Author added successfully', 
-            'id': author['au_id'],
-            'mongo_id': str(result.inserted_id)
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False, 
-            'error': str(e)
-        }), 500
-@app.route('/api/authors/<au_id>', methods=['GET'])
-def get_author(au_id):
-    """Get a specific author"""
-    try:
-        author = authors_collection.find_one({'au_id': au_id})
-        if author:
-            return jsonify({
-                'success': True, 
-                'data': serialize_author(author)
-            })
+
+compression_stats = CompressionStats()
+
+def negotiate_encoding(accept_encoding):
+    """Pick the preferred encoding we support from an Accept-Encoding header, or None"""
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    best = None
+    for encoding in ENCODINGS:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > 0 and (best is None or quality > best[1]):
+            best = (encoding, quality)
+    return best[0] if best else None
+
+class StreamCompressor:
+    """Incremental gzip or brotli compressor; every chunk is flushed so streams stay live"""
+    
+    def __init__(self, encoding):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
         else:
-            return jsonify({
-                'success': False, 
-                'error': 'Author not found'
-            }), 404
-    except Exception as e:
-        return jsonify({
-            'success': False, 
-            'error': str(e)
-        }), 500
+            self._compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)
+    
+    def compress(self, data):
+        if self.encoding == 'br':
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+    
+    def finish(self):
+        if self.encoding == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush()
 
-@app.route('/api/authors/<au_id>', methods=['PUT'])
-def update_author(au_id):
-    """Update an existing author"""
-    try:
-        data = request.json
-        updates = {}
-        
-        # Only include fields that are provided and not empty
-        if 'au_name' in data and data['au_name'].strip():
-            updates['au_name'] = data['au_name'].strip()
-        if 'au_fname' in data:
-            updates['au_fname'] = data['au_fname'].strip() if data['au_fname'].strip() else None
-        if 'phone' in data:
-            updates['phone'] = data['phone'].strip() if data['phone'].strip() else None
-        if 'address' in data:
-            updates['address'] = data['address'].strip() if data['address'].strip() else None
-        if 'city' in data:
-            updates['city'] = data['city'].strip() if data['city'].strip() else None
-        if 'state' in data:
-            updates['state'] = data['state'].strip() if data['state'].strip() else None
-        if 'zip' in data:
-            updates['zip'] = data['zip'].strip() if data['zip'].strip() else None
-        if 'contract' in data:
-            updates['contract'] = bool(data['contract'])
-            
-        if not updates:
-            return jsonify({
-                'success': False, 
-                'error': 'No valid fields to update'
-            }), 400
-        
-        # Update the author in MongoDB
-        result = authors_collection.update_one(
-            {'au_id': au_id},
-            {'$set': updates}
-        )
-        
-        if result.matched_count == 0:
-            return jsonify({
-                'success': False, 
-                'error': 'Author not found'
-            }), 404
-            
-        return jsonify({
-            'success': True, 
-            'message': 'Author updated successfully'
-        })
-            
-    except Exception as e:
-        return jsonify({
-            'success': False, 
-            'error': str(e)
-        }), 500
+def compress_body(body, encoding):
+    """Compress a complete body in one go"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
 
-@app.route('/api/authors/<au_id>', methods=['DELETE'])
-def delete_author(au_id):
-    """Delete an author and their orphaned books"""
-    try:
-        # Start a session for transaction
+def compress_stream(chunks, encoding):
+    """Compress a streamed body chunk by chunk, counting raw and sent bytes"""
+    compressor = StreamCompressor(encoding)
+    raw = sent = 0
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        raw += len(chunk)
+        data = compressor.compress(chunk)
+        sent += len(data)
+        if data:
+            yield data
+    data = compressor.finish()
+    compression_stats.record(encoding, raw, sent + len(data))
+    yield data
+
+def encoded_etag(etag, encoding):
+    """ETag of the compressed representation of the resource tagged etag"""
+    return f'{etag}-{encoding}'
+
+def etag_matches(if_none_match, etag):
+    """Whether If-None-Match names the resource in any representation we serve"""
+    return any(
+        if_none_match.contains(candidate)
+        for candidate in (etag, *(encoded_etag(etag, encoding) for encoding in ENCODINGS))
+    )
+
+def cached_compressed_body(etag, encoding, body):
+    """Compress an ETagged body once and serve later requests from the read cache"""
+    key = ('compressed', etag, encoding)
+    compressed = read_cache.get(key)
+    if compressed is None:
+        compressed = compress_body(body, encoding)
+        read_cache.set(key, compressed, ['compressed'])
+    return compressed
+
+@app.after_request
+def compress_response(response):
+    """Negotiate and apply compression to /api/ responses"""
+    if not request.path.startswith('/api/') or 'Content-Encoding' in response.headers:
+        return response
+    etag, _ = response.get_etag()
+    
+    if response.status_code == 304:
+        # Echo the representation the client holds
+        response.vary.add('Accept-Encoding')
+        for encoding in ENCODINGS:
+            if etag and request.if_none_match.contains(encoded_etag(etag, encoding)):
+                response.set_etag(encoded_etag(etag, encoding))
+        return response
+    
+    if response.mimetype not in COMPRESSIBLE_TYPES:
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'))
+    if response.status_code != 200 or encoding is None:
+        return response
+    
+    if response.is_streamed:
+        response.response = compress_stream(response.response, encoding)
+    else:
+        body = response.get_data()
+        if len(body) < COMPRESS_MIN_BYTES:
+            return response
+        compressed = cached_compressed_body(etag, encoding, body) if etag else compress_body(body, encoding)
+        response.set_data(compressed)
+        compression_stats.record(encoding, len(body), len(compressed))
+    
+    response.headers['Content-Encoding'] = encoding
+    if etag:
+        response.set_etag(encoded_etag(etag, encoding))
+    return response
+
+# ==================== METRICS ====================
+
+# Request and MongoDB metrics for this worker, served at /metrics in the
+# Prometheus text format. Requests are timed per route template, driver
+# commands per command name and collection through a PyMongo CommandListener,
+# and connection checkouts through a ConnectionPoolListener. Each response gets
+# a Server-Timing header with the time spent in the app, in MongoDB and waiting
+# for a pooled connection.
+LATENCY_BUCKETS = tuple(
+    float(bucket) for bucket in
+    os.getenv('METRICS_BUCKETS', '0.001,0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10').split(',')
+)
+
+def escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_labels(labels):
+    """Render (name, value) label pairs as {name="value",...}"""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label_value(value)}"' for name, value in labels) + '}'
+
+class Metric:
+    """Base class for a labelled metric family; values are kept per label tuple"""
+    kind = None
+    
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+    
+    def _key(self, labels):
+        return tuple((name, labels[name]) for name in self.labelnames)
+    
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            lines.extend(self._samples(key, value))
+        return lines
+    
+    def _samples(self, key, value):
+        return [f'{self.name}{format_labels(key)} {value:g}']
+    
+    def items(self):
+        """(labels dict, value) of every series"""
+        with self._lock:
+            values = list(self._values.items())
+        return [(dict(key), value) for key, value in values]
+
+class Counter(Metric):
+    kind = 'counter'
+    
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(Metric):
+    kind = 'gauge'
+    
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+    
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(Metric):
+    kind = 'histogram'
+    
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry['buckets'][index] += 1
+                    break
+            entry['sum'] += value
+            entry['count'] += 1
+    
+    def _samples(self, key, value):
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, value['buckets']):
+            cumulative += count
+            samples.append(f'{self.name}_bucket{format_labels(key + (("le", f"{bound:g}"),))} {cumulative}')
+        samples.append(f'{self.name}_bucket{format_labels(key + (("le", "+Inf"),))} {value["count"]}')
+        samples.append(f'{self.name}_sum{format_labels(key)} {value["sum"]:g}')
+        samples.append(f'{self.name}_count{format_labels(key)} {value["count"]}')
+        return samples
+
+http_requests = Counter('http_requests_total', 'HTTP requests by route and status', ('method', 'route', 'status'))
+http_errors = Counter('http_request_errors_total', 'HTTP requests answered with a 5xx status', ('method', 'route'))
+http_latency = Histogram('http_request_duration_seconds', 'HTTP request latency, including streamed bodies', ('method', 'route'))
+http_in_flight = Gauge('http_requests_in_flight', 'HTTP requests being served', ())
+mongo_latency = Histogram('mongodb_command_duration_seconds', 'MongoDB command latency', ('client', 'command', 'collection'))
+mongo_failures = Counter('mongodb_command_failures_total', 'MongoDB commands that returned an error', ('client', 'command', 'collection'))
+pool_wait = Histogram('mongodb_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection', ('client', 'address'))
+pool_checkout_failures = Counter('mongodb_pool_checkout_failures_total', 'Connection checkouts that failed, by reason', ('client', 'address', 'reason'))
+pool_in_use = Gauge('mongodb_pool_connections_in_use', 'Connections checked out of the pool', ('client', 'address'))
+pool_open = Gauge('mongodb_pool_connections_open', 'Connections open in the pool', ('client', 'address'))
+pool_waiting = Gauge('mongodb_pool_checkouts_waiting', 'Threads waiting for a connection', ('client', 'address'))
+pool_max = Gauge('mongodb_pool_max_connections', 'maxPoolSize of the pool', ('client', 'address'))
+
+def pool_stats(client_name):
+    """address -> pool gauges of one driver client, as its pool listener last saw them"""
+    stats = {}
+    for field, gauge in (('in_use', pool_in_use), ('open', pool_open), ('waiting', pool_waiting), ('max', pool_max)):
+        for labels, value in gauge.items():
+            if labels['client'] == client_name:
+                stats.setdefault(labels['address'], {})[field] = value
+    return stats
+
+METRICS = (
+    http_requests, http_errors, http_latency, http_in_flight,
+    mongo_latency, mongo_failures,
+    pool_wait, pool_checkout_failures, pool_in_use, pool_open, pool_waiting, pool_max
+)
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+# Per-thread timings of the request being served, for the Server-Timing header.
+# Driver events fire on the thread that runs the command, which is the request's
+# thread under the sync WSGI workers.
+_request_timing = threading.local()
+
+def current_timing():
+    return getattr(_request_timing, 'timing', None)
+
+def server_timing_header(timing, app_seconds):
+    """Server-Timing value: app, db (with the command count) and pool wait, in milliseconds"""
+    parts = [f'app;dur={app_seconds * 1000:.1f}']
+    if timing['db_commands']:
+        parts.append(f'db;dur={timing["db"] * 1000:.1f};desc="{timing["db_commands"]} commands"')
+    if timing['pool_wait']:
+        parts.append(f'pool;dur={timing["pool_wait"] * 1000:.1f}')
+    return ', '.join(parts)
+
+def command_collection(command_name, command):
+    """Collection a driver command targets, or '' for database-level commands"""
+    target = command.get('collection') if command_name == 'getMore' else command.get(command_name)
+    return target if isinstance(target, str) else ''
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every driver command by name and collection"""
+    
+    def __init__(self, client_name):
+        self.client_name = client_name
+        self._lock = threading.Lock()
+        self._collections = {}  # (connection_id, request_id) -> collection of an in-flight command
+    
+    def started(self, event):
+        with self._lock:
+            self._collections[(event.connection_id, event.request_id)] = command_collection(event.command_name, event.command)
+    
+    def _finish(self, event):
+        with self._lock:
+            collection = self._collections.pop((event.connection_id, event.request_id), '')
+        seconds = event.duration_micros / 1e6
+        mongo_latency.observe(seconds, client=self.client_name, command=event.command_name, collection=collection)
+        timing = current_timing()
+        if timing is not None:
+            timing['db'] += seconds
+            timing['db_commands'] += 1
+        return collection
+    
+    def succeeded(self, event):
+        self._finish(event)
+    
+    def failed(self, event):
+        collection = self._finish(event)
+        mongo_failures.inc(client=self.client_name, command=event.command_name, collection=collection)
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Tracks pool size, connections in use and how long checkouts wait"""
+    
+    def __init__(self, client_name):
+        self.client_name = client_name
+        self._local = threading.local()  # checkout start times; a checkout starts and ends on one thread
+    
+    def _labels(self, event):
+        host, port = event.address
+        return {'client': self.client_name, 'address': f'{host}:{port}'}
+    
+    def _checkout_done(self, event):
+        started = getattr(self._local, 'started', {}).pop(event.address, None)
+        labels = self._labels(event)
+        pool_waiting.dec(**labels)
+        if started is not None:
+            seconds = time.perf_counter() - started
+            pool_wait.observe(seconds, **labels)
+            timing = current_timing()
+            if timing is not None:
+                timing['pool_wait'] += seconds
+        return labels
+    
+    def pool_created(self, event):
+        pool_max.set(event.options.get('maxPoolSize', MONGO_CLIENT_OPTIONS['maxPoolSize']), **self._labels(event))
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        pass
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_created(self, event):
+        pool_open.inc(**self._labels(event))
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        pool_open.dec(**self._labels(event))
+    
+    def connection_check_out_started(self, event):
+        if not hasattr(self._local, 'started'):
+            self._local.started = {}
+        self._local.started[event.address] = time.perf_counter()
+        pool_waiting.inc(**self._labels(event))
+    
+    def connection_check_out_failed(self, event):
+        labels = self._checkout_done(event)
+        pool_checkout_failures.inc(reason=event.reason, **labels)
+    
+    def connection_checked_out(self, event):
+        labels = self._checkout_done(event)
+        pool_in_use.inc(**labels)
+    
+    def connection_checked_in(self, event):
+        pool_in_use.dec(**self._labels(event))
+
+def mongo_event_listeners(client_name):
+    """Metrics and slow-operation listeners to pass as event_listeners to a MongoClient"""
+    listeners = [MongoCommandMetrics(client_name), MongoPoolMetrics(client_name)]
+    if slow_ops.enabled:
+        listeners.append(SlowCommandListener(client_name))
+    return listeners
+
+def request_route():
+    """Route template of the current request, so /api/authors/<au_id> is one series"""
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+def observe_request(method, route, status, seconds):
+    http_requests.inc(method=method, route=route, status=status)
+    if status >= 500:
+        http_errors.inc(method=method, route=route)
+    http_latency.observe(seconds, method=method, route=route)
+
+@app.before_request
+def start_request_timing():
+    _request_timing.timing = {
+        'start': time.perf_counter(), 'route': f'{request.method} {request_route()}',
+        'db': 0.0, 'db_commands': 0, 'pool_wait': 0.0
+    }
+    http_in_flight.inc()
+
+@app.after_request
+def record_request_metrics(response):
+    """Add Server-Timing and record the request once its body has been sent"""
+    timing = current_timing()
+    if timing is None:
+        return response
+    response.headers['Server-Timing'] = server_timing_header(timing, time.perf_counter() - timing['start'])
+    method, route, status = request.method, request_route(), response.status_code
+    
+    def finish():
+        # Runs after the last chunk of a streamed body, so exports are timed in full
+        observe_request(method, route, status, time.perf_counter() - timing['start'])
+        http_in_flight.dec()
+        if current_timing() is timing:
+            _request_timing.timing = None
+    
+    response.call_on_close(finish)
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus scrape endpoint for this worker"""
+    return app.response_class(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+# ==================== SLOW OPERATIONS ====================
+
+# Driver commands slower than SLOW_OP_MS are kept in a per-worker ring buffer of
+# SLOW_OP_BUFFER entries, with the command's shape (every literal value replaced
+# by '?'), its duration, the documents it returned and the route that issued it.
+# /api/admin/slow-ops lists them and can explain any captured read on demand,
+# which adds the winning plan and documents examined, without turning on the
+# database profiler.
+SLOW_OP_MS = float(os.getenv('SLOW_OP_MS', 100))
+SLOW_OP_BUFFER = int(os.getenv('SLOW_OP_BUFFER', 200))
+
+# Command fields that are driver/session plumbing rather than part of the query
+COMMAND_META_KEYS = {
+    'lsid', '$db', '$clusterTime', '$readPreference', 'txnNumber', 'autocommit', 'startTransaction',
+    'readConcern', 'writeConcern', 'apiVersion', 'apiStrict', 'apiDeprecationErrors'
+}
+# Fields whose values describe the query's structure, not user data, and are kept as is
+SHAPE_VERBATIM_KEYS = {
+    'sort', 'projection', 'hint', 'limit', 'batchSize',
+    '$sort', '$project', '$limit', '$skip', '$unwind', '$count',
+    'from', 'localField', 'foreignField', 'as'
+}
+SHAPE_MAX_ITEMS = 10
+EXPLAINABLE_COMMANDS = ('find', 'aggregate', 'count', 'distinct')
+
+def redact_shape(value):
+    """Replace every literal in a command with '?', keeping keys, operators and $field paths"""
+    if isinstance(value, dict):
+        return {
+            key: item if key in SHAPE_VERBATIM_KEYS else redact_shape(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        # Identical shapes (an $in list, a batch of inserts) collapse to one entry
+        shapes = []
+        for item in value:
+            shape = redact_shape(item)
+            if shape not in shapes:
+                shapes.append(shape)
+            if len(shapes) >= SHAPE_MAX_ITEMS:
+                break
+        return shapes
+    if isinstance(value, str) and value.startswith('$'):
+        return value
+    return '?'
+
+def command_shape(command_name, command):
+    """The redacted shape of a driver command, without session fields"""
+    shape = {}
+    for key, value in command.items():
+        if key in COMMAND_META_KEYS:
+            continue
+        shape[key] = value if key == command_name else redact_shape(value)
+    return shape
+
+def reply_docs_returned(command_name, reply):
+    """How many documents a command returned or affected, from its reply"""
+    cursor = reply.get('cursor')
+    if isinstance(cursor, dict):
+        batch = cursor.get('firstBatch', cursor.get('nextBatch'))
+        if batch is not None:
+            return len(batch)
+    if command_name == 'findAndModify':
+        return 1 if reply.get('value') else 0
+    if command_name == 'distinct':
+        return len(reply.get('values', []))
+    return reply.get('n')
+
+class SlowOperationLog:
+    """Bounded ring buffer of slow driver commands, shared by every client of the worker"""
+    
+    def __init__(self, max_entries):
+        self._lock = threading.Lock()
+        self._entries = deque(maxlen=max(max_entries, 1))
+        self._commands = {}  # op id -> command to explain, for entries still in the buffer
+        self._next_id = 1
+        self.enabled = max_entries > 0
+        self.recorded = 0
+    
+    def record(self, entry, command=None):
+        with self._lock:
+            entry['id'] = self._next_id
+            self._next_id += 1
+            if len(self._entries) == self._entries.maxlen:
+                self._commands.pop(self._entries[0]['id'], None)
+            self._entries.append(entry)
+            if command is not None:
+                self._commands[entry['id']] = command
+            self.recorded += 1
+    
+    def entries(self, limit=None):
+        """Most recent first"""
+        with self._lock:
+            entries = [dict(entry) for entry in reversed(self._entries)]
+        return entries[:limit] if limit else entries
+    
+    def get(self, op_id):
+        with self._lock:
+            for entry in self._entries:
+                if entry['id'] == op_id:
+                    return entry, self._commands.get(op_id)
+        return None, None
+    
+    def attach_explain(self, op_id, explain):
+        with self._lock:
+            for entry in self._entries:
+                if entry['id'] == op_id:
+                    entry['explain'] = explain
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._commands.clear()
+
+slow_ops = SlowOperationLog(SLOW_OP_BUFFER)
+
+class SlowCommandListener(monitoring.CommandListener):
+    """Records commands slower than SLOW_OP_MS into slow_ops"""
+    
+    def __init__(self, client_name):
+        self.client_name = client_name
+        self._lock = threading.Lock()
+        self._started = {}  # (connection_id, request_id) -> (database, command) of an in-flight command
+    
+    def started(self, event):
+        if event.command_name == 'explain':
+            return  # our own on-demand explains
+        with self._lock:
+            self._started[(event.connection_id, event.request_id)] = (event.database_name, event.command)
+    
+    def _finish(self, event, **outcome):
+        with self._lock:
+            started = self._started.pop((event.connection_id, event.request_id), None)
+        duration_ms = event.duration_micros / 1000
+        if started is None or duration_ms < SLOW_OP_MS:
+            return
+        database_name, command = started
+        timing = current_timing()
+        slow_ops.record({
+            'at': datetime.now(timezone.utc).isoformat(),
+            'client': self.client_name,
+            'route': timing.get('route') if timing else None,
+            'database': database_name,
+            'command': event.command_name,
+            'collection': command_collection(event.command_name, command),
+            'duration_ms': round(duration_ms, 2),
+            'shape': command_shape(event.command_name, command),
+            'explainable': event.command_name in EXPLAINABLE_COMMANDS,
+            'explain': None,
+            **outcome
+        }, command if event.command_name in EXPLAINABLE_COMMANDS else None)
+    
+    def succeeded(self, event):
+        self._finish(event, ok=True, docs_returned=reply_docs_returned(event.command_name, event.reply))
+    
+    def failed(self, event):
+        failure = event.failure if isinstance(event.failure, dict) else {}
+        self._finish(event, ok=False, error=failure.get('errmsg', str(event.failure)))
+
+def _execution_totals(node, totals):
+    """Sum the executionStats counters found anywhere in an explain document"""
+    if isinstance(node, dict):
+        stats = node.get('executionStats')
+        if isinstance(stats, dict):
+            for field in ('nReturned', 'totalKeysExamined', 'totalDocsExamined', 'executionTimeMillis'):
+                totals[field] = totals.get(field, 0) + stats.get(field, 0)
+        for key, value in node.items():
+            if key != 'executionStats':
+                _execution_totals(value, totals)
+    elif isinstance(node, list):
+        for item in node:
+            _execution_totals(item, totals)
+    return totals
+
+def summarize_explain(plan):
+    """Plan stages, documents examined vs. returned and per-stage timings of an explain result"""
+    totals = _execution_totals(plan, {})
+    stages = sorted(set(_plan_stages(plan, [])))
+    summary = {
+        'stages': stages,
+        'collscan': 'COLLSCAN' in stages,
+        'docs_examined': totals.get('totalDocsExamined'),
+        'keys_examined': totals.get('totalKeysExamined'),
+        'docs_returned': totals.get('nReturned'),
+        'execution_ms': totals.get('executionTimeMillis'),
+    }
+    if isinstance(plan.get('stages'), list):
+        # Aggregations report each pipeline stage separately
+        summary['pipeline'] = [
+            {
+                'stage': next((key for key in stage if key.startswith('$')), None),
+                'docs_returned': stage.get('nReturned'),
+                'time_ms': stage.get('executionTimeMillisEstimate')
+            }
+            for stage in plan['stages']
+        ]
+    return summary
+
+def explain_slow_op(database, op_id):
+    """Explain a captured command with executionStats and attach the summary to its entry.
+
+    Returns None when the entry has already left the buffer.
+    """
+    entry, command = slow_ops.get(op_id)
+    if entry is None:
+        return None
+    if command is None:
+        raise ValueError(f"'{entry['command']}' commands cannot be explained")
+    command = {key: value for key, value in command.items() if key not in COMMAND_META_KEYS}
+    # $out/$merge pipelines would write during executionStats, so only plan them
+    writes = any('$out' in stage or '$merge' in stage for stage in command.get('pipeline', []))
+    plan = database.client[entry['database']].command(
+        'explain', command, verbosity='queryPlanner' if writes else 'executionStats'
+    )
+    summary = summarize_explain(plan)
+    slow_ops.attach_explain(op_id, summary)
+    return summary
+
+# ==================== STORAGE ====================
+
+# The catalog handlers go through a CatalogStore (storage.py). This is the
+# MongoDB one; with STORAGE_BACKEND=sqlite the embedded SQLiteCatalogStore
+# serves the same endpoints, and the MongoDB-only features (search, statistics,
+# profiles, bulk import, export, admin) answer 501.
+SQLITE_ENDPOINTS = {
+    'index', 'get_metrics', 'health_check', 'readiness_check',
+    'get_authors', 'add_author', 'get_author', 'update_author', 'delete_author',
+    'get_titles', 'add_title', 'get_title', 'update_title', 'delete_title', 'get_titles_by_author',
+    'get_author_profile', 'get_changes', 'get_cache_stats', 'get_compression_stats',
+}
+
+class MongoCatalogStore(CatalogStore):
+    """Catalog store on the MongoDB collections of this process (see ensure_db)"""
+    
+    name = 'mongodb'
+    
+    def ping(self):
+        client.admin.command('ping')
+    
+    def warm_up(self):
+        client.admin.command('ping')
+        print(f"✅ Successfully connected to MongoDB database: {DB_NAME}")
+        failures = ensure_indexes(db)
+        index_build_errors.clear()
+        index_build_errors.update(failures)
+        if INDEX_REPORT_ON_STARTUP:
+            print_index_report(index_report(db))
+        # Concurrent pings make the pool open several connections (TCP + TLS + auth)
+        # now rather than on the first requests of the worker
+        threads = [
+            threading.Thread(target=client.admin.command, args=('ping',))
+            for _ in range(min(WARMUP_CONNECTIONS, MONGO_CLIENT_OPTIONS['maxPoolSize']) - 1)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    
+    def lease_ids(self, sequence, size):
+        counter = db['counters'].find_one_and_update(
+            {'_id': sequence},
+            {'$inc': {'seq': size}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return counter['seq']
+    
+    def bump_versions(self, *collections, session=None):
+        db['versions'].bulk_write(
+            [UpdateOne({'_id': name}, {'$inc': {'v': 1}}, upsert=True) for name in collections],
+            ordered=False,
+            session=session
+        )
+    
+    def collection_versions(self, *collections):
+        found = {
+            doc['_id']: doc['v']
+            for doc in db['versions'].find({'_id': {'$in': list(collections)}})
+        }
+        return tuple(found.get(name, 0) for name in collections)
+    
+    def refresh_author_stats(self, au_ids):
+        refresh_author_stats(db, au_ids)
+    
+    # Authors
+    
+    def find_authors(self, after, limit, projection):
+        query = {'au_id': {'$gt': after}} if after else {}
+        return list(authors_collection.find(query, projection).sort('au_id', 1).limit(limit))
+    
+    def iter_authors(self, projection):
+        return authors_collection.find({}, projection).sort('au_id', 1).batch_size(STREAM_BATCH_SIZE)
+    
+    def get_author(self, au_id, projection):
+        return authors_collection.find_one({'au_id': au_id}, projection)
+    
+    def fetch_authors(self, au_ids):
+        return {
+            doc['au_id']: doc for doc in authors_collection.find(
+                {'au_id': {'$in': list(set(au_ids))}},
+                {'_id': 0, 'au_id': 1, 'au_name': 1, 'au_fname': 1}
+            )
+        }
+    
+    def insert_author(self, author, generate_id):
+        return insert_with_generated_id(authors_collection, author, 'au_id', generate_id).inserted_id
+    
+    def update_author(self, au_id, updates):
+        # Name changes also go to the snapshot on every title by this author
+        name_updates = author_name_updates(updates)
+        
         with client.start_session() as session:
             with session.start_transaction():
-                # First, check if author exists
-                author = authors_collection.find_one(
+                author = authors_collection.find_one_and_update(
                     {'au_id': au_id},
+                    {'$set': updates},
+                    projection={'au_name': 1, 'au_fname': 1},
+                    return_document=ReturnDocument.AFTER,
                     session=session
                 )
                 
-                if not author:
-                    return jsonify({
-                        'success': False, 
-                        'error': 'Author not found'
-                    }), 404
+                if author is None:
+                    session.abort_transaction()
+                    return False
                 
-                # Get all titles by this author
-                titles = list(titles_collection.find(
-                    {'authors.au_id': au_id},
-                    {'_id': 1, 'title_id': 1, 'authors': 1},
-                    session=session
-                ))
+                if name_updates:
+                    authors_collection.update_one(
+                        {'_id': author['_id']},
+                        {'$set': {'search_keys': search_tokens(author.get('au_name'), author.get('au_fname'))}},
+                        session=session
+                    )
+                    titles_collection.update_many(
+                        {'authors.au_id': au_id},
+                        {'$set': {**name_updates, 'updated_at': updates['updated_at']}},
+                        array_filters=[{'author.au_id': au_id}],
+                        session=session
+                    )
+                    self.bump_versions('authors', 'titles', session=session)
+                else:
+                    self.bump_versions('authors', session=session)
                 
-                # Delete the author
+                session.commit_transaction()
+        return True
+    
+    def author_profile(self, au_id):
+        return unpack_author_profile(next(authors_collection.aggregate(author_profile_pipeline(au_id))))
+    
+    def author_title_counts(self, au_id):
+        if not authors_collection.count_documents({'au_id': au_id}, limit=1):
+            return None
+        linked = titles_collection.count_documents({'authors.au_id': au_id})
+        orphaned = titles_collection.count_documents(orphaned_titles_filter(au_id))
+        return linked, orphaned
+    
+    def delete_author(self, au_id):
+        with client.start_session() as session:
+            with session.start_transaction():
+                # Delete the author; nothing deleted means there was no such author
                 result = authors_collection.delete_one(
                     {'au_id': au_id},
                     session=session
@@ -309,258 +1877,1778 @@ def delete_author(au_id):
                 
                 if result.deleted_count == 0:
                     session.abort_transaction()
-                    return jsonify({
-                        'success': False, 
-                        'error': 'Failed to delete author'
-                    }), 500
+                    return None
                 
-                # Update titles to remove this author and delete any that become orphaned
-                for title in titles:
-                    # Remove this author from the title's authors array
-                    updated_authors = [
-                        author for author in title.get('authors', []) 
-                        if author.get('au_id') != au_id
-                    ]
-                    
-                    if not updated_authors:
-                        # If no authors left, delete the title
-                        titles_collection.delete_one(
-                            {'_id': title['_id']},
-                            session=session
-                        )
-                    else:
-                        # Otherwise, update the authors list
-                        titles_collection.update_one(
-                            {'_id': title['_id']},
-                            {'$set': {'authors': updated_authors}},
-                            session=session
-                        )
+                # Titles this author wrote alone would be left without authors, so delete them
+                orphaned = [
+                    title['title_id']
+                    for title in titles_collection.find(orphaned_titles_filter(au_id), {'_id': 0, 'title_id': 1}, session=session)
+                ]
+                deleted = titles_collection.delete_many(
+                    orphaned_titles_filter(au_id),
+                    session=session
+                )
+                
+                # Remove the author from the remaining co-authored titles
+                updated = titles_collection.update_many(
+                    {'authors.au_id': au_id},
+                    {
+                        '$pull': {'authors': {'au_id': au_id}},
+                        '$set': {'updated_at': datetime.now(timezone.utc)}
+                    },
+                    session=session
+                )
                 
+                db['tombstones'].insert_many(
+                    tombstones([('authors', au_id)] + [('titles', title_id) for title_id in orphaned]),
+                    session=session
+                )
+                self.bump_versions('authors', 'titles', session=session)
                 session.commit_transaction()
+        return deleted.deleted_count, updated.modified_count
+    
+    # Titles
+    
+    def find_titles(self, after, limit, projection):
+        query = {'title_id': {'$gt': after}} if after else {}
+        return list(titles_collection.find(query, projection).sort('title_id', 1).limit(limit))
+    
+    def iter_titles(self, projection):
+        return titles_collection.find({}, projection).sort('title_id', 1).batch_size(STREAM_BATCH_SIZE)
+    
+    def get_title(self, title_id, projection):
+        return titles_collection.find_one({'title_id': title_id}, projection)
+    
+    def titles_by_author(self, au_id):
+        return titles_collection.find(
+            {'authors.au_id': au_id}, TITLES_BY_AUTHOR_PROJECTION
+        ).sort('title_id', 1)
+    
+    def insert_title(self, title, generate_id):
+        return insert_with_generated_id(titles_collection, title, 'title_id', generate_id).inserted_id
+    
+    def update_title(self, title_id, updates):
+        # The write itself tells us whether the title exists
+        if not updates:
+            return titles_collection.find_one({'title_id': title_id}, {'_id': 1})
+        return titles_collection.find_one_and_update(
+            {'title_id': title_id},
+            {'$set': updates},
+            projection={'_id': 1, 'authors.au_id': 1}
+        )
+    
+    def delete_title(self, title_id):
+        # The tombstone commits with the delete, so the changes feed cannot miss it
+        with client.start_session() as session:
+            with session.start_transaction():
+                title = titles_collection.find_one_and_delete(
+                    {'title_id': title_id},
+                    projection={'_id': 1, 'authors.au_id': 1},
+                    session=session
+                )
+                if title is not None:
+                    db['tombstones'].insert_many(tombstones([('titles', title_id)]), session=session)
+        return title
+    
+    # Changes
+    
+    def change_position(self):
+        # Opening a stream returns the resume token of the latest write without waiting for one
+        with db.watch(CHANGES_PIPELINE, max_await_time_ms=CHANGES_AWAIT_MS) as stream:
+            return CHANGE_STREAM_POSITION + stream.resume_token['_data']
+    
+    def changes_since(self, position, limit, author_projection, title_projection):
+        if not position.startswith(CHANGE_STREAM_POSITION):
+            return None
+        written = {'authors': {}, 'titles': {}}
+        deletions = []
+        try:
+            with db.watch(
+                CHANGES_PIPELINE,
+                resume_after={'_data': position[len(CHANGE_STREAM_POSITION):]},
+                max_await_time_ms=CHANGES_AWAIT_MS
+            ) as stream:
+                # An empty batch means the stream has caught up; its resume token is the new position
+                while (change := stream.try_next()) is not None:
+                    if change['ns']['coll'] == 'tombstones':
+                        deletions.append((change['fullDocument']['kind'], change['fullDocument']['key']))
+                    else:
+                        written[change['ns']['coll']][change['documentKey']['_id']] = True
+                    if max(len(written['authors']), len(written['titles']), len(deletions)) > limit:
+                        return None
+                position = CHANGE_STREAM_POSITION + stream.resume_token['_data']
+        except OperationFailure as e:
+            if e.code in CHANGE_STREAM_EXPIRED:
+                return None
+            if e.code in CHANGE_STREAM_INVALID:
+                raise ValueError('Invalid since token')
+            raise
+        
+        # Read after the stream: a document written again meanwhile comes back with its
+        # newest state now and once more on the next call, which is harmless
+        authors = list(authors_collection.find({'_id': {'$in': list(written['authors'])}}, author_projection).sort('au_id', 1))
+        titles = list(titles_collection.find({'_id': {'$in': list(written['titles'])}}, title_projection).sort('title_id', 1))
+        return position, authors, titles, deletions
+
+def tombstones(entries):
+    """Tombstone documents for the changes feed, one per deleted (collection, key)"""
+    deleted_at = datetime.now(timezone.utc)
+    return [{'kind': kind, 'key': key, 'deleted_at': deleted_at} for kind, key in entries]
+
+@app.before_request
+def start_warmup():
+    """Warm up on the first request of a worker not started by gunicorn.conf.py"""
+    worker_health.start()
+
+@app.before_request
+def require_backend_support():
+    """Answer 501 for MongoDB-only endpoints when the catalog runs on SQLite"""
+    if STORAGE_BACKEND == 'sqlite' and request.endpoint is not None and request.endpoint not in SQLITE_ENDPOINTS:
+        return jsonify({
+            'success': False, 
+            'error': 'Not available with STORAGE_BACKEND=sqlite'
+        }), 501
+
+# ==================== MAIN PAGE ====================
+
+@app.route('/')
+def index():
+    """Serve the main page"""
+    return render_template('index.html')
+
+# ==================== AUTHOR ENDPOINTS ====================
+
+def serialize_author(author):
+    """Convert MongoDB document to JSON serializable format"""
+    if not author:
+        return None
+    if '_id' in author:
+        author['_id'] = str(author['_id'])  # Convert ObjectId to string
+    author.pop('search_keys', None)
+    author.pop('change_seq', None)
+    if isinstance(author.get('updated_at'), datetime):
+        author['updated_at'] = isoformat_utc(author['updated_at'])
+    return author
+
+# Fields a client can ask for with ?fields=
+AUTHOR_FIELDS = (
+    '_id', 'au_id', 'au_name', 'au_fname', 'phone', 'address',
+    'city', 'state', 'zip', 'contract', 'updated_at'
+)
+
+# Every stored field except the search index keys and the change sequence number
+AUTHOR_PROJECTION = {'search_keys': 0, 'change_seq': 0}
+
+@app.route('/api/authors', methods=['GET'])
+def get_authors():
+    """Get authors, one keyset page at a time (``?all=true`` streams every author)"""
+    try:
+        paginate, limit, after = parse_page_args(request.args)
+        fields = parse_fields(request.args, AUTHOR_FIELDS)
+        projection = fields_projection(fields, 'au_id', AUTHOR_PROJECTION)
+        
+        cache_key = ('authors', paginate, limit, after, fields)
+        etag = resource_etag(cache_key, 'authors')
+
+        if not paginate:
+            return stream_list_response(get_store().iter_authors(projection), serialize_author, etag)
+
+        cached = cached_response(cache_key, etag)
+        if cached is not None:
+            return cached
+
+        authors = get_store().find_authors(after, limit + 1, projection)
+        return cache_response(cache_key, etag, page_response(
+            [serialize_author(author) for author in authors], limit, 'au_id'
+        ), ['authors'])
+    except ValueError as ve:
+        return jsonify({
+            'success': False, 
+            'error': str(ve)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), 500
+
+def build_author(data):
+    """Build a new author document from request data; au_id is allocated on insert"""
+    return {
+        'au_id': None,
+        'au_name': data.get('au_name', '').strip(),
+        'au_fname': data.get('au_fname', '').strip() or None,
+        'phone': data.get('phone', '').strip() or None,
+        'address': data.get('address', '').strip() or None,
+        'city': data.get('city', '').strip() or None,
+        'state': data.get('state', '').strip() or None,
+        'zip': data.get('zip', '').strip() or None,
+        'contract': data.get('contract', False),
+        'search_keys': search_tokens(data.get('au_name', ''), data.get('au_fname', '')),
+        'updated_at': datetime.now(timezone.utc)
+    }
+
+@app.route('/api/authors', methods=['POST'])
+def add_author():
+    """Add a new author"""
+    try:
+        # Create author document
+        author = build_author(request.json)
+        
+        if not author['au_name']:
+            return jsonify({'success': False, 'error': 'Author last name is required'}), 400
+        
+        # Insert under a newly allocated ID
+        inserted_id = get_store().insert_author(author, generate_author_id)
+        bump_versions('authors')
+        read_cache.invalidate('authors')
+        
+        return jsonify({
+            'success': True, 
+            'message': 'Author added successfully', 
+            'id': author['au_id'],
+            'mongo_id': str(inserted_id)
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), 500
+@app.route('/api/authors/<au_id>', methods=['GET'])
+def get_author(au_id):
+    """Get a specific author"""
+    try:
+        fields = parse_fields(request.args, AUTHOR_FIELDS)
+        cache_key = ('author', au_id, fields)
+        etag = resource_etag(cache_key, 'authors')
+        cached = cached_response(cache_key, etag)
+        if cached is not None:
+            return cached
+        
+        author = get_store().get_author(au_id, fields_projection(fields, 'au_id', AUTHOR_PROJECTION))
+        
+        if not author:
+            return jsonify({
+                'success': False, 
+                'error': 'Author not found'
+            }), 404
+        
+        return cache_response(cache_key, etag, {
+            'success': True, 
+            'data': serialize_author(author)
+        }, ['authors', f'author:{au_id}'])
+        
+    except ValueError as ve:
+        return jsonify({
+            'success': False, 
+            'error': str(ve)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), 500
+
+def build_author_updates(data):
+    """Collect the author fields present in an update request"""
+    updates = {}
+    
+    # Only include fields that are provided and not empty
+    if 'au_name' in data and data['au_name'].strip():
+        updates['au_name'] = data['au_name'].strip()
+    if 'au_fname' in data:
+        updates['au_fname'] = data['au_fname'].strip() if data['au_fname'].strip() else None
+    if 'phone' in data:
+        updates['phone'] = data['phone'].strip() if data['phone'].strip() else None
+    if 'address' in data:
+        updates['address'] = data['address'].strip() if data['address'].strip() else None
+    if 'city' in data:
+        updates['city'] = data['city'].strip() if data['city'].strip() else None
+    if 'state' in data:
+        updates['state'] = data['state'].strip() if data['state'].strip() else None
+    if 'zip' in data:
+        updates['zip'] = data['zip'].strip() if data['zip'].strip() else None
+    if 'contract' in data:
+        updates['contract'] = bool(data['contract'])
+    return updates
+
+def author_name_updates(updates):
+    """Array-filter updates that copy an author's new name onto their titles"""
+    return {
+        f'authors.$[author].{field}': updates[field]
+        for field in ('au_name', 'au_fname') if field in updates
+    }
+
+@app.route('/api/authors/<au_id>', methods=['PUT'])
+def update_author(au_id):
+    """Update an existing author"""
+    try:
+        updates = build_author_updates(request.json)
+            
+        if not updates:
+            return jsonify({
+                'success': False, 
+                'error': 'No valid fields to update'
+            }), 400
+        
+        updates['updated_at'] = datetime.now(timezone.utc)
+        renamed = bool(author_name_updates(updates))
+        
+        if not get_store().update_author(au_id, updates):
+            return jsonify({
+                'success': False, 
+                'error': 'Author not found'
+            }), 404
+        
+        if renamed:
+            versions_changed('authors', 'titles')
+            read_cache.invalidate('authors', 'titles', f'author:{au_id}')
+            stats_refresher.mark([au_id])
+        else:
+            versions_changed('authors')
+            read_cache.invalidate('authors')
+            
+        return jsonify({
+            'success': True, 
+            'message': 'Author updated successfully'
+        })
+            
+    except Exception as e:
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), 500
+
+def orphaned_titles_filter(au_id):
+    """Match titles whose only author is au_id, i.e. the ones left authorless by deleting them"""
+    return {
+        'authors.au_id': au_id,
+        'authors': {'$not': {'$elemMatch': {'au_id': {'$ne': au_id}}}}
+    }
+
+@app.route('/api/authors/<au_id>', methods=['DELETE'])
+def delete_author(au_id):
+    """Delete an author and their orphaned books.
+
+    The cascade is two set-based writes regardless of how many titles the author
+    has. ``?dry_run=true`` only reports what would be deleted and updated.
+    """
+    try:
+        if request.args.get('dry_run', '').lower() in ('1', 'true', 'yes'):
+            counts = get_store().author_title_counts(au_id)
+            if counts is None:
+                return jsonify({
+                    'success': False, 
+                    'error': 'Author not found'
+                }), 404
+            
+            linked, orphaned = counts
+            return jsonify({
+                'success': True, 
+                'dry_run': True,
+                'titles_deleted': orphaned,
+                'titles_updated': linked - orphaned
+            })
+        
+        result = get_store().delete_author(au_id)
+        if result is None:
+            return jsonify({
+                'success': False, 
+                'error': 'Author not found'
+            }), 404
+        
+        deleted, updated = result
+        versions_changed('authors', 'titles')
+        read_cache.invalidate('authors', 'titles', f'author:{au_id}')
+        stats_refresher.mark([au_id])
+        return jsonify({
+            'success': True, 
+            'message': 'Author and related data deleted successfully',
+            'titles_deleted': deleted,
+            'titles_updated': updated
+        })
+                
+    except Exception as e:
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), 500
+
+def serialize_title(title, fields=None):
+    """Convert MongoDB document to JSON serializable format"""
+    if not title:
+        return None
+    if '_id' in title:
+        title['_id'] = str(title['_id'])  # Convert ObjectId to string
+    
+    # Ensure authors is always a list, even if empty (unless a fieldset left it out)
+    if 'authors' not in title and (fields is None or any(field.startswith('authors') for field in fields)):
+        title['authors'] = []
+    
+    # Convert author _id to string if it exists
+    for author in title.get('authors', []):
+        if '_id' in author:
+            author['_id'] = str(author['_id'])
+    
+    # Convert date to string if it exists
+    if 'pubdate' in title and title['pubdate']:
+        if isinstance(title['pubdate'], datetime):
+            title['pubdate'] = title['pubdate'].strftime('%Y-%m-%d')
+    
+    return title
+
+# ==================== TITLE ENDPOINTS ====================
+
+# Titles carry a snapshot of their authors' names, so reads are plain indexed finds
+TITLE_PROJECTION = {
+    'title_id': 1,
+    'title': 1,
+    'type': 1,
+    'pub_id': 1,
+    'price': 1,
+    'advance': 1,
+    'royalty': 1,
+    'ytd_sales': 1,
+    'notes': 1,
+    'pubdate': 1,
+    'authors.au_id': 1,
+    'authors.au_name': 1,
+    'authors.au_fname': 1,
+    'authors.au_ord': 1,
+    'authors.royaltyper': 1
+}
+
+# Fields a client can ask for with ?fields=; 'authors' stands for all authors.* fields
+TITLE_FIELDS = ('_id',) + tuple(TITLE_PROJECTION) + ('authors',)
+
+# 'authors.$' keeps only the matched author's entry (royalty share and name)
+TITLES_BY_AUTHOR_PROJECTION = {
+    'title_id': 1,
+    'title': 1,
+    'type': 1,
+    'price': 1,
+    'pubdate': 1,
+    'authors.$': 1
+}
+
+@app.route('/api/titles', methods=['GET'])
+def get_titles():
+    """Get titles with their authors, one keyset page at a time (``?all=true`` streams every title)"""
+    try:
+        paginate, limit, after = parse_page_args(request.args)
+        fields = parse_fields(request.args, TITLE_FIELDS)
+        projection = fields_projection(fields, 'title_id', TITLE_PROJECTION)
+        
+        cache_key = ('titles', paginate, limit, after, fields)
+        etag = resource_etag(cache_key, 'titles')
+
+        if not paginate:
+            return stream_list_response(
+                get_store().iter_titles(projection), lambda title: serialize_title(title, fields), etag
+            )
+
+        cached = cached_response(cache_key, etag)
+        if cached is not None:
+            return cached
+
+        titles = get_store().find_titles(after, limit + 1, projection)
+        return cache_response(cache_key, etag, page_response(
+            [serialize_title(title, fields) for title in titles], limit, 'title_id'
+        ), ['titles'])
+
+    except ValueError as ve:
+        return jsonify({
+            'success': False, 
+            'error': str(ve)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), 500
+
+def resolve_title_authors(authors):
+    """Build a title's authors array, validating every referenced author with one $in query.
+
+    Each entry carries a snapshot of the author's name so title reads need no join.
+
+    Returns (author_updates, error) where error is a ready-to-return response
+    listing every missing author ID, or None when all authors exist.
+    """
+    error = title_authors_error(authors)
+    if error:
+        body, status = error
+        return None, (jsonify(body), status)
+    
+    author_updates, missing = build_title_authors(
+        authors, fetch_authors([author['au_id'] for author in authors])
+    )
+    if missing:
+        body, status = missing_authors_error(missing)
+        return None, (jsonify(body), status)
+    
+    return author_updates, None
+
+def title_authors_error(authors):
+    """(body, status) of the error for an authors array that is malformed before any lookup, or None"""
+    if not all(author.get('au_id') for author in authors):
+        return {
+            'success': False, 
+            'error': 'Author ID is required for all authors'
+        }, 400
+    
+    duplicates = duplicate_author_ids(authors)
+    if duplicates:
+        return {
+            'success': False, 
+            'error': duplicate_authors_message(duplicates),
+            'duplicates': duplicates
+        }, 400
+    return None
+
+def fetch_authors(au_ids):
+    """Fetch the name fields of the given authors with one $in query, keyed by au_id"""
+    return get_store().fetch_authors(au_ids)
+
+def build_title_authors(authors, known_authors):
+    """Build a title's authors array from already fetched authors.
+
+    Returns (author_updates, missing) where missing lists the referenced
+    author IDs that are not in known_authors.
+    """
+    missing = [
+        au_id for au_id in dict.fromkeys(author.get('au_id') for author in authors)
+        if au_id not in known_authors
+    ]
+    if missing:
+        return None, missing
+    
+    author_updates = [
+        {
+            'au_id': author['au_id'],
+            'au_name': known_authors[author['au_id']].get('au_name'),
+            'au_fname': known_authors[author['au_id']].get('au_fname'),
+            'au_ord': author.get('au_ord', i),
+            'royaltyper': int(author.get('royaltyper', 100))  # Default to 100%
+        }
+        for i, author in enumerate(authors, 1)
+    ]
+    return author_updates, []
+
+def missing_authors_message(missing):
+    return f"Author{'s' if len(missing) > 1 else ''} with ID {', '.join(missing)} not found"
+
+def missing_authors_error(missing):
+    """(body, status) of the error for authors that do not exist"""
+    return {
+        'success': False, 
+        'error': missing_authors_message(missing),
+        'missing': missing
+    }, 404
+
+def duplicate_author_ids(authors):
+    """Author IDs listed more than once in a title's authors, in order of first repeat"""
+    seen = set()
+    duplicates = []
+    for author in authors:
+        au_id = author.get('au_id')
+        if au_id in seen and au_id not in duplicates:
+            duplicates.append(au_id)
+        seen.add(au_id)
+    return duplicates
+
+def duplicate_authors_message(duplicates):
+    return f"Author{'s' if len(duplicates) > 1 else ''} with ID {', '.join(duplicates)} listed more than once"
+
+def build_title(data):
+    """Build a new title document from request data, without its authors.
+
+    title_id is allocated on insert. Raises ValueError on malformed numbers.
+    """
+    price = data.get('price')
+    advance = data.get('advance')
+    royalty = data.get('royalty')
+    ytd_sales = data.get('ytd_sales')
+    pubdate = data.get('pubdate')
+    
+    # Process pubdate
+    pubdate_obj = None
+    if pubdate:
+        # Try parsing the date in different formats
+        for fmt in ('%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y'):
+            try:
+                pubdate_obj = datetime.strptime(pubdate, fmt)
+                break
+            except ValueError:
+                continue
+    
+    # Convert values - handle None and empty strings
+    return {
+        'title_id': None,
+        'title': data.get('title', '').strip(),
+        'type': data.get('type', '').strip() or None,
+        'pub_id': data.get('pub_id', '').strip() or None,
+        'price': float(price) if price is not None and str(price).strip() else None,
+        'advance': float(advance) if advance is not None and str(advance).strip() else None,
+        'royalty': int(royalty) if royalty is not None and str(royalty).strip() else None,
+        'ytd_sales': int(ytd_sales) if ytd_sales is not None and str(ytd_sales).strip() else None,
+        'notes': data.get('notes', '').strip() or None,
+        'pubdate': pubdate_obj,
+        'authors': [],
+        'search_keys': search_tokens(data.get('title', '')),
+        'updated_at': datetime.now(timezone.utc)
+    }
+
+def insert_title(title_doc, generate_id):
+    """Insert a validated title under an ID from generate_id and mark what it changed.
+
+    Shared by the Flask and the async entry points; returns the inserted _id.
+    """
+    inserted_id = get_store().insert_title(title_doc, generate_id)
+    au_ids = [author['au_id'] for author in title_doc['authors']]
+    bump_versions('titles')
+    read_cache.invalidate(*title_tags(title_doc['title_id'], au_ids))
+    stats_refresher.mark(au_ids)
+    return inserted_id
+
+def apply_title_updates(title_id, updates):
+    """Apply validated updates to a title and mark what they changed.
+
+    Shared by the Flask and the async entry points. Returns the title as it was
+    before (its _id and author IDs), or None when it does not exist.
+    """
+    # The write itself tells us whether the title exists
+    if updates:
+        updates['updated_at'] = datetime.now(timezone.utc)
+    existing_title = get_store().update_title(title_id, updates)
+    
+    if existing_title and updates:
+        # Both the previous and the new authors' title lists may have changed
+        au_ids = {author.get('au_id') for author in existing_title.get('authors', [])}
+        au_ids.update(author['au_id'] for author in updates.get('authors', []))
+        bump_versions('titles')
+        read_cache.invalidate(*title_tags(title_id, au_ids))
+        if any(field in updates for field in STATS_FIELDS):
+            stats_refresher.mark(au_ids)
+    return existing_title
+
+@app.route('/api/titles', methods=['POST'])
+def add_title():
+    """Add a new title"""
+    try:
+        data = request.json
+        authors = data.get('authors', [])  # List of {au_id, royaltyper, au_ord}
+        
+        if not data.get('title', '').strip() or not authors:
+            return jsonify({
+                'success': False, 
+                'error': 'Title and authors are required'
+            }), 400
+        
+        # Create title document
+        title_doc = build_title(data)
+        
+        # Prepare authors array with validation
+        author_updates, error = resolve_title_authors(authors)
+        if error:
+            return error
+        title_doc['authors'] = author_updates
+        
+        # Insert under a newly allocated ID
+        inserted_id = insert_title(title_doc, generate_title_id)
+        
+        return jsonify({
+            'success': True, 
+            'message': 'Title added successfully', 
+            'id': title_doc['title_id'],
+            'mongo_id': str(inserted_id)
+        })
+        
+    except ValueError as ve:
+        return jsonify({
+            'success': False, 
+            'error': f'Invalid data format: {str(ve)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), 500
+
+@app.route('/api/titles/<title_id>', methods=['GET'])
+def get_title(title_id):
+    """Get a specific title with its authors"""
+    try:
+        fields = parse_fields(request.args, TITLE_FIELDS)
+        cache_key = ('title', title_id, fields)
+        etag = resource_etag(cache_key, 'titles')
+        cached = cached_response(cache_key, etag)
+        if cached is not None:
+            return cached
+        
+        title = get_store().get_title(title_id, fields_projection(fields, 'title_id', TITLE_PROJECTION))
+        
+        if not title:
+            return jsonify({
+                'success': False, 
+                'error': 'Title not found'
+            }), 404
+        
+        return cache_response(cache_key, etag, {
+            'success': True, 
+            'data': serialize_title(title, fields)
+        }, title_tags(title_id, [author.get('au_id') for author in title.get('authors', [])]))
+        
+    except ValueError as ve:
+        return jsonify({
+            'success': False, 
+            'error': str(ve)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), 500
+
+def build_title_updates(data):
+    """Collect the title fields present in an update request, except its authors.
+
+    Raises ValueError on malformed numbers.
+    """
+    updates = {}
+    
+    # Only include fields that are provided and not empty
+    if 'title' in data and data['title'].strip():
+        updates['title'] = data['title'].strip()
+        updates['search_keys'] = search_tokens(updates['title'])
+    if 'type' in data:
+        updates['type'] = data['type'].strip() if data['type'].strip() else None
+    if 'pub_id' in data:
+        updates['pub_id'] = data['pub_id'].strip() if data['pub_id'].strip() else None
+    if 'price' in data and data['price'] is not None:
+        price_str = str(data['price']).strip()
+        updates['price'] = float(price_str) if price_str else None
+    if 'advance' in data and data['advance'] is not None:
+        advance_str = str(data['advance']).strip()
+        updates['advance'] = float(advance_str) if advance_str else None
+    if 'royalty' in data and data['royalty'] is not None:
+        royalty_str = str(data['royalty']).strip()
+        updates['royalty'] = int(royalty_str) if royalty_str else None
+    if 'ytd_sales' in data and data['ytd_sales'] is not None:
+        ytd_str = str(data['ytd_sales']).strip()
+        updates['ytd_sales'] = int(ytd_str) if ytd_str else None
+    if 'notes' in data:
+        updates['notes'] = data['notes'].strip() if data['notes'].strip() else None
+    
+    # Handle pubdate if provided
+    if 'pubdate' in data and data['pubdate']:
+        pubdate = data['pubdate'].strip()
+        # Try parsing the date in different formats
+        for fmt in ('%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y'):
+            try:
+                updates['pubdate'] = datetime.strptime(pubdate, fmt)
+                break
+            except ValueError:
+                continue
+    return updates
+
+@app.route('/api/titles/<title_id>', methods=['PUT'])
+def update_title(title_id):
+    """Update an existing title"""
+    try:
+        data = request.json
+        updates = build_title_updates(data)
+        
+        # Handle authors if provided
+        if 'authors' in data and isinstance(data['authors'], list):
+            author_updates, error = resolve_title_authors(data['authors'])
+            if error:
+                return error
+            updates['authors'] = author_updates
+        
+        if not apply_title_updates(title_id, updates):
+            return jsonify({
+                'success': False, 
+                'error': 'Title not found'
+            }), 404
+        
+        return jsonify({
+            'success': True, 
+            'message': 'Title updated successfully'
+        })
+        
+    except ValueError as ve:
+        return jsonify({
+            'success': False, 
+            'error': f'Invalid data format: {str(ve)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), 500
+
+@app.route('/api/titles/<title_id>', methods=['DELETE'])
+def delete_title(title_id):
+    """Delete a title"""
+    try:
+        title = get_store().delete_title(title_id)
+        
+        if not title:
+            return jsonify({
+                'success': False, 
+                'error': 'Title not found'
+            }), 404
+        
+        au_ids = [author.get('au_id') for author in title.get('authors', [])]
+        bump_versions('titles')
+        read_cache.invalidate(*title_tags(title_id, au_ids))
+        stats_refresher.mark(au_ids)
+            
+        return jsonify({
+            'success': True, 
+            'message': 'Title deleted successfully'
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), 500
+
+def serialize_author_title(title):
+    """Flatten the matched author entry into a title from TITLES_BY_AUTHOR_PROJECTION.
+
+    Titles unwound by author (as in the author profile) carry the entry itself instead.
+    """
+    author = title.pop('authors', None) or {}
+    if isinstance(author, list):
+        author = author[0] if author else {}
+    title['royaltyper'] = author.get('royaltyper')
+    title['au_name'] = author.get('au_name')
+    title['au_fname'] = author.get('au_fname')
+    # Serialize all ObjectIds recursively
+    title = serialize_objectid(title)
+    # Convert dates to display string (DD-MM-YYYY)
+    if 'pubdate' in title and title['pubdate'] and isinstance(title['pubdate'], datetime):
+        title['pubdate'] = title['pubdate'].strftime('%d-%m-%Y')
+    return title
+
+@app.route('/api/titles/by-author/<au_id>', methods=['GET'])
+def get_titles_by_author(au_id):
+    """Get all titles by a specific author"""
+    try:
+        cache_key = ('titles_by_author', au_id)
+        etag = resource_etag(cache_key, 'titles')
+        cached = cached_response(cache_key, etag)
+        if cached is not None:
+            return cached
+        
+        # Find all titles that have this author in their authors array
+        titles = get_store().titles_by_author(au_id)
+        
+        # Convert ObjectIds and dates to JSON serializable format
+        serialized_titles = [serialize_author_title(title) for title in titles]
+        
+        return cache_response(cache_key, etag, {
+            'success': True, 
+            'data': serialized_titles
+        }, [f'author:{au_id}'])
+    except Exception as e:
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), 500
+
+# ==================== CHANGES ====================
+
+# A client that already holds the lists asks for what was written after the
+# position it last saw instead of reloading whole collections. The sync token is
+# the store's position wrapped like a page cursor. On MongoDB a position is a
+# change stream resume token: the server orders committed writes in the oplog,
+# so writers share no counter and a write that commits late still comes after
+# every token handed out before it. Deletes are read from the inserts of their
+# tombstones, which carry the deleted key.
+CHANGES_MAX_ITEMS = int(os.getenv('CHANGES_MAX_ITEMS', 1000))
+
+# How long one poll waits for the stream to report that it has caught up
+CHANGES_AWAIT_MS = int(os.getenv('CHANGES_AWAIT_MS', 50))
+
+CHANGE_STREAM_POSITION = 'stream:'
+
+CHANGES_PIPELINE = [
+    {'$match': {'$or': [
+        {'ns.coll': {'$in': ['authors', 'titles']}, 'operationType': {'$in': ['insert', 'update', 'replace']}},
+        {'ns.coll': 'tombstones', 'operationType': 'insert'},
+    ]}},
+    {'$project': {'ns': 1, 'documentKey': 1, 'fullDocument.kind': 1, 'fullDocument.key': 1}},
+]
+
+# ChangeStreamHistoryLost, ChangeStreamFatalError: the token has left the oplog
+CHANGE_STREAM_EXPIRED = (286, 280)
+# InvalidResumeToken, FailedToParse: not a token this server issued
+CHANGE_STREAM_INVALID = (260, 9)
+
+def decode_changes_token(token):
+    try:
+        return decode_cursor(token)
+    except ValueError:
+        raise ValueError('Invalid since token')
+
+def changes_response(next_since, reset, authors=(), titles=(), deleted=None):
+    return jsonify({
+        'success': True,
+        'reset': reset,
+        'next_since': next_since,
+        'data': {
+            'authors': list(authors),
+            'titles': list(titles),
+            'deleted': deleted or {'authors': [], 'titles': []},
+        }
+    })
+
+@app.route('/api/changes', methods=['GET'])
+def get_changes():
+    """Authors and titles written or deleted since a sync token.
+    
+    reset: true means the client must reload the lists: there was no token, it
+    is older than the store keeps changes for, or more than CHANGES_MAX_ITEMS changed.
+    """
+    try:
+        store = get_store()
+        token = request.args.get('since')
+        changes = None
+        if token:
+            changes = store.changes_since(
+                decode_changes_token(token), CHANGES_MAX_ITEMS, AUTHOR_PROJECTION, TITLE_PROJECTION
+            )
+        if changes is None:
+            return changes_response(encode_cursor(store.change_position()), True)
+        
+        position, authors, titles, removed = changes
+        next_since = encode_cursor(position)
+        
+        # Anything returned as written exists now, whatever was deleted before it
+        present = {
+            'authors': {author['au_id'] for author in authors},
+            'titles': {title['title_id'] for title in titles},
+        }
+        deleted = {'authors': [], 'titles': []}
+        for kind, key in removed:
+            if key not in present[kind] and key not in deleted[kind]:
+                deleted[kind].append(key)
+        
+        return changes_response(
+            next_since, False,
+            (serialize_author(author) for author in authors),
+            (serialize_title(title) for title in titles),
+            deleted
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), 500
+
+# ==================== SEARCH ====================
+
+# Every author and title stores the lowercased words of its names in search_keys.
+# A multikey index on that array turns a case-insensitive prefix search into an
+# anchored regex range scan, so lookups stay index-bound as the catalog grows.
+# Ranking only looks at the first SEARCH_CANDIDATES matches from each source.
+SEARCH_CANDIDATES = int(os.getenv('SEARCH_CANDIDATES', 200))
+SEARCH_MAX_TERMS = 8
+
+SEARCH_FIELDS = {
+    'authors': (('au_name', 3), ('au_fname', 2)),
+    'titles': (('title', 3),),
+}
+
+WORD_PATTERN = re.compile(r'\w+')
+
+def search_tokens(*values):
+    """Lowercased words of the given values, in order and without duplicates"""
+    words = []
+    for value in values:
+        if value:
+            words.extend(WORD_PATTERN.findall(str(value).lower()))
+    return list(dict.fromkeys(words))
+
+def search_filter(terms):
+    """Match documents with a word starting with every term, using the search_keys index"""
+    clauses = [{'search_keys': re.compile('^' + re.escape(term))} for term in terms]
+    return clauses[0] if len(clauses) == 1 else {'$and': clauses}
+
+def highlight_spans(value, terms):
+    """[start, end) spans of every word prefix in value that matches a search term"""
+    spans = []
+    for word in WORD_PATTERN.finditer(value or ''):
+        lowered = word.group().lower()
+        matched = [len(term) for term in terms if lowered.startswith(term)]
+        if matched:
+            spans.append([word.start(), word.start() + max(matched)])
+    return spans
+
+def search_score(document, fields, terms, phrase):
+    """Rank a match: exact words beat prefixes, and a field starting with the whole query ranks first"""
+    score = 0
+    for field, weight in fields:
+        words = WORD_PATTERN.findall((document.get(field) or '').lower())
+        if ' '.join(words).startswith(phrase):
+            score += 3 * weight
+        words = set(words)
+        for term in terms:
+            if term in words:
+                score += 2 * weight
+            elif any(word.startswith(term) for word in words):
+                score += weight
+    return score
+
+def search_result(kind, document, terms, phrase, text_score=0):
+    """Shape one ranked search hit with its highlight spans"""
+    fields = SEARCH_FIELDS[kind]
+    highlights = {
+        field: spans for field, _ in fields
+        if (spans := highlight_spans(document.get(field), terms))
+    }
+    if kind == 'authors':
+        result = {
+            'type': 'author',
+            'id': document['au_id'],
+            'label': ', '.join(filter(None, (document.get('au_name'), document.get('au_fname'))))
+        }
+    else:
+        result = {'type': 'title', 'id': document['title_id'], 'label': document.get('title')}
+    result['score'] = round(search_score(document, fields, terms, phrase) + text_score, 3)
+    result['fields'] = {field: document.get(field) for field, _ in fields}
+    result['highlights'] = highlights
+    return result
+
+def parse_search_args(args):
+    """Read q, type, notes and the page arguments of a search request"""
+    query = (args.get('q') or '').strip()
+    terms = search_tokens(query)[:SEARCH_MAX_TERMS]
+    if not terms:
+        raise ValueError('q must contain at least one letter or digit')
+    kind = args.get('type', 'all').lower()
+    if kind not in ('all', 'authors', 'titles'):
+        raise ValueError('type must be all, authors or titles')
+    notes = args.get('notes', '').lower() in ('1', 'true', 'yes')
+    limit = parse_limit(args.get('limit', DEFAULT_PAGE_SIZE))
+    # Ranked results have no stable sort key, so the cursor carries an offset
+    after = decode_cursor(args['after']) if args.get('after') else '0'
+    if not after.isdigit():
+        raise ValueError('Invalid cursor')
+    return query, terms, kind, notes, limit, int(after)
+
+@app.route('/api/search', methods=['GET'])
+def search():
+    """Ranked prefix search over author names and titles (``?notes=true`` adds full-text on notes)"""
+    try:
+        _, authors_collection, titles_collection = ensure_db()
+        query, terms, kind, notes, limit, offset = parse_search_args(request.args)
+        phrase = ' '.join(search_tokens(query))
+        
+        cache_key = ('search', tuple(terms), phrase, kind, notes)
+        etag = resource_etag(cache_key, 'authors', 'titles')
+        page_key = (cache_key, limit, offset)
+        cached = cached_response(page_key, etag)
+        if cached is not None:
+            return cached
+        
+        results = []
+        if kind in ('all', 'authors'):
+            authors = authors_collection.find(
+                search_filter(terms), {'au_id': 1, 'au_name': 1, 'au_fname': 1}
+            ).limit(SEARCH_CANDIDATES)
+            results.extend(search_result('authors', author, terms, phrase) for author in authors)
+        
+        if kind in ('all', 'titles'):
+            titles = {
+                title['title_id']: search_result('titles', title, terms, phrase)
+                for title in titles_collection.find(
+                    search_filter(terms), {'title_id': 1, 'title': 1}
+                ).limit(SEARCH_CANDIDATES)
+            }
+            if notes:
+                for title in titles_collection.find(
+                    {'$text': {'$search': query}},
+                    {'title_id': 1, 'title': 1, 'score': {'$meta': 'textScore'}}
+                ).sort([('score', {'$meta': 'textScore'})]).limit(SEARCH_CANDIDATES):
+                    hit = titles.get(title['title_id']) or search_result('titles', title, terms, phrase)
+                    hit['score'] = round(hit['score'] + title.get('score', 0), 3)
+                    hit['notes_match'] = True
+                    titles[title['title_id']] = hit
+            results.extend(titles.values())
+        
+        results.sort(key=lambda hit: (-hit['score'], hit['label'] or '', hit['id']))
+        page = results[offset:offset + limit]
+        has_more = offset + limit < len(results)
+        return cache_response(page_key, etag, {
+            'success': True,
+            'data': page,
+            'next_cursor': encode_cursor(str(offset + limit)) if has_more else None
+        }, ['authors', 'titles'])
+        
+    except ValueError as ve:
+        return jsonify({
+            'success': False, 
+            'error': str(ve)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), 500
+
+# ==================== AUTHOR STATS ====================
+
+# Per-author title statistics are materialized in the author_stats collection
+# (one document per au_id) by a single $unwind/$group aggregation over titles.
+# Title writes mark only the authors they touch for a refresh, so reads never aggregate.
+
+# How long the background refresh waits after a write, folding a burst of writes into one aggregation
+STATS_REFRESH_DELAY = float(os.getenv('STATS_REFRESH_DELAY_SECONDS', 0.5))
+
+# Title fields that feed the statistics; updates to anything else leave them as is
+STATS_FIELDS = ('authors', 'price', 'ytd_sales')
+
+def author_stats_group():
+    """$group stage over titles unwound by author: title counts, royalty shares, sales and revenue.
+
+    revenue is the author's share of gross sales: price * ytd_sales * royaltyper / 100.
+    """
+    return {
+        '$group': {
+            '_id': '$authors.au_id',
+            'au_name': {'$first': '$authors.au_name'},
+            'au_fname': {'$first': '$authors.au_fname'},
+            'titles': {'$sum': 1},
+            'royaltyper_total': {'$sum': {'$ifNull': ['$authors.royaltyper', 0]}},
+            'royaltyper_avg': {'$avg': {'$ifNull': ['$authors.royaltyper', 0]}},
+            'ytd_sales': {'$sum': {'$ifNull': ['$ytd_sales', 0]}},
+            'revenue': {
+                '$sum': {
+                    '$multiply': [
+                        {'$ifNull': ['$price', 0]},
+                        {'$ifNull': ['$ytd_sales', 0]},
+                        {'$divide': [{'$ifNull': ['$authors.royaltyper', 0]}, 100]}
+                    ]
+                }
+            }
+        }
+    }
+
+def author_stats_pipeline(au_ids=None):
+    """Aggregate the statistics of the given authors, or of every author when au_ids is None"""
+    pipeline = []
+    if au_ids is not None:
+        pipeline.append({'$match': {'authors.au_id': {'$in': au_ids}}})
+    pipeline.append({'$unwind': '$authors'})
+    if au_ids is not None:
+        pipeline.append({'$match': {'authors.au_id': {'$in': au_ids}}})
+    pipeline.append(author_stats_group())
+    return pipeline
+
+def refresh_author_stats(database, au_ids=None):
+    """Recompute the statistics of the given authors, or of every author when au_ids is None.
+
+    Authors left without titles lose their statistics document.
+    """
+    if au_ids is not None:
+        au_ids = [au_id for au_id in set(au_ids) if au_id]
+        if not au_ids:
+            return
+    
+    stats = database['author_stats']
+    # A full refresh reads the existing IDs before aggregating, so statistics a
+    # concurrent refresh adds meanwhile are not taken for stale ones
+    candidates = stats.distinct('_id') if au_ids is None else au_ids
+    
+    refreshed_at = datetime.now(timezone.utc)
+    refreshed = set()
+    batch = []
+    for doc in database['titles'].aggregate(author_stats_pipeline(au_ids)):
+        doc['refreshed_at'] = refreshed_at
+        refreshed.add(doc['_id'])
+        batch.append(ReplaceOne({'_id': doc['_id']}, doc, upsert=True))
+        if len(batch) >= BULK_CHUNK_SIZE:
+            stats.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        stats.bulk_write(batch, ordered=False)
+    
+    # Only authors this aggregation found no titles for; matching on refreshed_at
+    # would also delete what an overlapping refresh of the same authors just wrote
+    emptied = [au_id for au_id in candidates if au_id not in refreshed]
+    for start in range(0, len(emptied), BULK_CHUNK_SIZE):
+        stats.delete_many({'_id': {'$in': emptied[start:start + BULK_CHUNK_SIZE]}})
+    
+    bump_versions('author_stats')
+    read_cache.invalidate('author_stats')
+
+class StatsRefresher:
+    """Authors of this process whose statistics are stale, refreshed off the request path.
+    
+    Writes only mark() the authors they touched. A background thread, started by the
+    first mark in each process, waits STATS_REFRESH_DELAY and then refreshes every
+    marked author in one aggregation. The statistics endpoints flush() first, so they
+    never answer from numbers this worker still owes a refresh.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()  # One refresh at a time, so a flush waits for one in flight
+        self._pid = None
+        self._wake = threading.Event()
+        self._dirty = set()
+        self.refreshes = 0
+    
+    def mark(self, au_ids):
+        """Queue the statistics of au_ids for a refresh"""
+        au_ids = {au_id for au_id in au_ids if au_id}
+        if not au_ids:
+            return
+        with self._lock:
+            self._dirty.update(au_ids)
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._wake = threading.Event()
+                threading.Thread(target=self._run, name='stats-refresh', daemon=True).start()
+        self._wake.set()
+    
+    def flush(self, au_ids=None):
+        """Refresh the pending authors now: all of them, or only those among au_ids"""
+        with self._refresh_lock:
+            with self._lock:
+                pending = self._dirty if au_ids is None else self._dirty & set(au_ids)
+                self._dirty = self._dirty - pending
+            if not pending:
+                return
+            try:
+                get_store().refresh_author_stats(sorted(pending))
+            except Exception:
+                with self._lock:
+                    self._dirty |= pending
+                raise
+            self.refreshes += 1
+    
+    def _run(self):
+        while True:
+            self._wake.wait()
+            time.sleep(STATS_REFRESH_DELAY)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"❌ Refreshing author statistics failed: {str(e)}")
+                time.sleep(WARMUP_RETRY_SECONDS)
+                self._wake.set()
+
+stats_refresher = StatsRefresher()
+
+def serialize_author_stats(doc):
+    """Shape an author_stats document for the API"""
+    return {
+        'au_id': doc['_id'],
+        'au_name': doc.get('au_name'),
+        'au_fname': doc.get('au_fname'),
+        'titles': doc.get('titles', 0),
+        'royaltyper_total': doc.get('royaltyper_total', 0),
+        'royaltyper_avg': round(doc.get('royaltyper_avg') or 0, 2),
+        'ytd_sales': doc.get('ytd_sales', 0),
+        'revenue': round(doc.get('revenue') or 0, 2)
+    }
+
+def author_profile_pipeline(au_id):
+    """One aggregation returning an author, their titles and their statistics.
+
+    The author's titles are joined once through the authors_au_id index. The
+    join's own pipeline unwinds each title to this author's entry and keeps only
+    the fields the profile reads, so the joined array stays small however long
+    the titles' notes or author lists are; $facet then shapes it into the title
+    list and the statistics side by side.
+    """
+    own_titles = [{'$unwind': '$titles'}, {'$replaceRoot': {'newRoot': '$titles'}}]
+    return [
+        {'$match': {'au_id': au_id}},
+        {'$limit': 1},
+        {
+            '$lookup': {
+                'from': 'titles',
+                'pipeline': [
+                    {'$match': {'authors.au_id': au_id}},
+                    {'$unwind': '$authors'},
+                    {'$match': {'authors.au_id': au_id}},
+                    {'$project': {
+                        '_id': 1,
+                        'title_id': 1,
+                        'title': 1,
+                        'type': 1,
+                        'price': 1,
+                        'pubdate': 1,
+                        'ytd_sales': 1,
+                        'authors': 1
+                    }}
+                ],
+                'as': 'titles'
+            }
+        },
+        {
+            '$facet': {
+                'author': [{'$project': {'titles': 0, 'search_keys': 0, 'change_seq': 0}}],
+                'titles': own_titles + [
+                    {'$sort': {'title_id': 1}},
+                    {'$project': {'ytd_sales': 0}}
+                ],
+                'stats': own_titles + [author_stats_group()]
+            }
+        }
+    ]
+
+def unpack_author_profile(facets):
+    """The single $facet result of author_profile_pipeline as a store profile; None when there is no such author"""
+    if not facets['author']:
+        return None
+    return {
+        'author': facets['author'][0],
+        'titles': facets['titles'],
+        'stats': facets['stats'][0] if facets['stats'] else {}
+    }
+
+def serialize_author_profile(au_id, profile):
+    """Shape a profile from CatalogStore.author_profile for the API"""
+    author = serialize_author(profile['author'])
+    return {
+        'author': author,
+        'titles': [serialize_author_title(title) for title in profile['titles']],
+        'stats': serialize_author_stats({
+            **profile['stats'],
+            '_id': au_id,
+            'au_name': author.get('au_name'),
+            'au_fname': author.get('au_fname')
+        })
+    }
+
+@app.route('/api/authors/<au_id>/profile', methods=['GET'])
+def get_author_profile(au_id):
+    """Get an author with their titles and summary statistics in one round trip"""
+    try:
+        cache_key = ('author_profile', au_id)
+        etag = resource_etag(cache_key, 'authors', 'titles')
+        cached = cached_response(cache_key, etag)
+        if cached is not None:
+            return cached
+        
+        profile = get_store().author_profile(au_id)
+        if profile is None:
+            return jsonify({
+                'success': False, 
+                'error': 'Author not found'
+            }), 404
+        
+        return cache_response(cache_key, etag, {
+            'success': True, 
+            'data': serialize_author_profile(au_id, profile)
+        }, ['authors', f'author:{au_id}'])
+    except Exception as e:
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), 500
+
+@app.route('/api/stats/authors', methods=['GET'])
+def get_author_stats():
+    """Title counts, royalty shares, sales and revenue for every author with titles, paginated like /api/authors"""
+    try:
+        database, _, _ = ensure_db()
+        paginate, limit, after = parse_page_args(request.args)
+        stats_refresher.flush()
+        
+        cache_key = ('author_stats', paginate, limit, after)
+        etag = resource_etag(cache_key, 'author_stats')
+        
+        if not paginate:
+            stats = database['author_stats'].find({}).sort('_id', 1)
+            return stream_list_response(stats.batch_size(STREAM_BATCH_SIZE), serialize_author_stats, etag)
+        
+        cached = cached_response(cache_key, etag)
+        if cached is not None:
+            return cached
+        
+        query = {'_id': {'$gt': after}} if after else {}
+        stats = list(database['author_stats'].find(query).sort('_id', 1).limit(limit + 1))
+        return cache_response(cache_key, etag, page_response(
+            [serialize_author_stats(doc) for doc in stats], limit, 'au_id'
+        ), ['author_stats'])
+    except ValueError as ve:
+        return jsonify({
+            'success': False, 
+            'error': str(ve)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), 500
+
+@app.route('/api/stats/authors/<au_id>', methods=['GET'])
+def get_author_stats_for(au_id):
+    """Statistics for one author; an author without titles gets zeros"""
+    try:
+        database, authors_collection, _ = ensure_db()
+        stats_refresher.flush([au_id])
+        cache_key = ('author_stats', au_id)
+        etag = resource_etag(cache_key, 'author_stats', 'authors')
+        cached = cached_response(cache_key, etag)
+        if cached is not None:
+            return cached
+        
+        doc = database['author_stats'].find_one({'_id': au_id})
+        if doc is None:
+            author = authors_collection.find_one({'au_id': au_id}, {'au_name': 1, 'au_fname': 1})
+            if not author:
                 return jsonify({
-                    'success': True, 
-                    'message': 'Author and related data deleted successfully'
-                })
-                
+                    'success': False, 
+                    'error': 'Author not found'
+                }), 404
+            doc = {'_id': au_id, 'au_name': author.get('au_name'), 'au_fname': author.get('au_fname')}
+        
+        return cache_response(cache_key, etag, {
+            'success': True, 
+            'data': serialize_author_stats(doc)
+        }, ['author_stats', 'authors'])
     except Exception as e:
         return jsonify({
             'success': False, 
             'error': str(e)
         }), 500
 
-def serialize_title(title):
-    """Convert MongoDB document to JSON serializable format"""
-    if not title:
-        return None
-    title['_id'] = str(title['_id'])  # Convert ObjectId to string
-    
-    # Ensure authors is always a list, even if empty
-    if 'authors' not in title:
-        title['authors'] = []
-    
-    # Convert author _id to string if it exists
-    for author in title['authors']:
-        if '_id' in author:
-            author['_id'] = str(author['_id'])
+# ==================== BULK IMPORT ====================
+
+# Bulk endpoints read newline-delimited JSON (one author or title per line) as it
+# streams in and write it with unordered insert_many in chunks of BULK_CHUNK_SIZE.
+BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', 1000))
+MAX_BULK_CHUNK_SIZE = 10000
+
+def parse_chunk_size():
+    """Read the ?chunk_size= parameter of the bulk endpoints"""
+    try:
+        chunk_size = int(request.args.get('chunk_size', BULK_CHUNK_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError('chunk_size must be an integer')
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least 1')
+    return min(chunk_size, MAX_BULK_CHUNK_SIZE)
+
+def read_ndjson(stream):
+    """Yield (line_number, record, error) for every non-blank line of an NDJSON stream"""
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f'Invalid JSON: {str(e)}'
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, 'Each line must be a JSON object'
+            continue
+        yield line_number, record, None
+
+def chunked(rows, size):
+    """Group an iterable into lists of at most size items"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def insert_chunk(collection, rows, id_field, allocator, format_id):
+    """Insert (line_number, document) rows with one unordered insert_many.
+
+    IDs for the whole chunk come from a single allocator lease. The insert runs
+    outside a transaction, so a failing row never holds back the rest of the
+    chunk. Rows that clash with an existing ID get a fresh one and are retried
+    for as long as retries keep inserting rows; any other write error is
+    reported against its line. Returns (inserted_count, errors).
+    """
+    inserted = 0
+    errors = []
+    pending = rows
+    stalled = 0
     
-    # Convert date to string if it exists
-    if 'pubdate' in title and title['pubdate']:
-        if isinstance(title['pubdate'], datetime):
-            title['pubdate'] = title['pubdate'].strftime('%Y-%m-%d')
+    while pending and stalled < ID_INSERT_RETRIES:
+        for (_, document), seq in zip(pending, allocator.take(len(pending))):
+            document[id_field] = format_id(seq)
+            document.pop('_id', None)
+        
+        try:
+            collection.insert_many([document for _, document in pending], ordered=False)
+            inserted += len(pending)
+            pending = []
+        except BulkWriteError as bwe:
+            count = bwe.details.get('nInserted', 0)
+            inserted += count
+            stalled = 0 if count else stalled + 1
+            retry = []
+            for error in bwe.details.get('writeErrors', []):
+                row = pending[error['index']]
+                key_pattern = error.get('keyPattern')
+                if error.get('code') == 11000 and (key_pattern is None or id_field in key_pattern):
+                    retry.append(row)
+                else:
+                    errors.append({'line': row[0], 'error': error.get('errmsg', 'Write failed')})
+            pending = retry
     
-    return title
+    errors.extend({'line': line, 'error': f'Could not allocate a unique {id_field}'} for line, _ in pending)
+    return inserted, errors
 
-# ==================== TITLE ENDPOINTS ====================
+def bulk_report(inserted, errors):
+    return jsonify({
+        'success': True, 
+        'inserted': inserted,
+        'failed': len(errors),
+        'errors': sorted(errors, key=lambda error: error['line'])
+    })
 
-@app.route('/api/titles', methods=['GET'])
-def get_titles():
-    """Get all titles with their authors"""
+@app.route('/api/authors/bulk', methods=['POST'])
+def bulk_add_authors():
+    """Import authors from an NDJSON request body, one author per line"""
     try:
-        # Use aggregation to get titles with their authors
-        pipeline = [
-            {
-                '$lookup': {
-                    'from': 'authors',
-                    'localField': 'authors.au_id',
-                    'foreignField': 'au_id',
-                    'as': 'author_details'
-                }
-            },
-            {
-                '$project': {
-                    'title_id': 1,
-                    'title': 1,
-                    'type': 1,
-                    'pub_id': 1,
-                    'price': 1,
-                    'advance': 1,
-                    'royalty': 1,
-                    'ytd_sales': 1,
-                    'notes': 1,
-                    'pubdate': 1,
-                    'authors': {
-                        '$map': {
-                            'input': '$authors',
-                            'as': 'auth',
-                            'in': {
-                                'au_id': '$$auth.au_id',
-                                'au_ord': '$$auth.au_ord',
-                                'royaltyper': '$$auth.royaltyper',
-                                'author_details': {
-                                    '$arrayElemAt': [
-                                        {
-                                            '$filter': {
-                                                'input': '$author_details',
-                                                'as': 'ad',
-                                                'cond': {'$eq': ['$$ad.au_id', '$$auth.au_id']}
-                                            }
-                                        },
-                                        0
-                                    ]
-                                }
-                            }
-                        }
-                    }
-                }
-            },
-            {
-                '$project': {
-                    'title_id': 1,
-                    'title': 1,
-                    'type': 1,
-                    'pub_id': 1,
-                    'price': 1,
-                    'advance': 1,
-                    'royalty': 1,
-                    'ytd_sales': 1,
-                    'notes': 1,
-                    'pubdate': 1,
-                    'authors': {
-                        '$map': {
-                            'input': '$authors',
-                            'as': 'auth',
-                            'in': {
-                                'au_id': '$$auth.au_id',
-                                'au_name': '$$auth.author_details.au_name',
-                                'au_fname': '$$auth.author_details.au_fname',
-                                'au_ord': '$$auth.au_ord',
-                                'royaltyper': '$$auth.royaltyper'
-                            }
-                        }
-                    }
-                }
-            },
-            {'$sort': {'title_id': 1}}
-        ]
+        _, authors_collection, _ = ensure_db()
+        chunk_size = parse_chunk_size()
+        inserted = 0
+        errors = []
         
-        titles = list(titles_collection.aggregate(pipeline))
+        for chunk in chunked(read_ndjson(request.stream), chunk_size):
+            rows = []
+            for line, record, error in chunk:
+                if error:
+                    errors.append({'line': line, 'error': error})
+                    continue
+                try:
+                    author = build_author(record)
+                except Exception as e:
+                    errors.append({'line': line, 'error': f'Invalid data format: {str(e)}'})
+                    continue
+                if not author['au_name']:
+                    errors.append({'line': line, 'error': 'Author last name is required'})
+                    continue
+                rows.append((line, author))
+            
+            chunk_inserted, chunk_errors = insert_chunk(
+                authors_collection, rows, 'au_id', author_ids, format_author_id
+            )
+            inserted += chunk_inserted
+            errors.extend(chunk_errors)
         
-        return jsonify({
-            'success': True, 
-            'data': [serialize_title(title) for title in titles]
-        })
+        if inserted:
+            bump_versions('authors')
+            read_cache.invalidate('authors')
         
+        return bulk_report(inserted, errors)
+        
+    except ValueError as ve:
+        return jsonify({
+            'success': False, 
+            'error': str(ve)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False, 
             'error': str(e)
         }), 500
 
-@app.route('/api/titles', methods=['POST'])
-def add_title():
-    """Add a new title"""
+@app.route('/api/titles/bulk', methods=['POST'])
+def bulk_add_titles():
+    """Import titles from an NDJSON request body, one title per line.
+
+    The authors referenced by each chunk are fetched with one $in query, and
+    authors already seen in earlier chunks are not fetched again.
+    """
     try:
-        data = request.json
-        title = data.get('title', '').strip()
-        type_val = data.get('type', '').strip() or None
-        pub_id = data.get('pub_id', '').strip() or None
-        price = data.get('price')
-        advance = data.get('advance')
-        royalty = data.get('royalty')
-        ytd_sales = data.get('ytd_sales')
-        notes = data.get('notes', '').strip() or None
-        pubdate = data.get('pubdate')
-        authors = data.get('authors', [])  # List of {au_id, royaltyper, au_ord}
-        
-        if not title or not authors:
-            return jsonify({
-                'success': False, 
-                'error': 'Title and authors are required'
-            }), 400
+        database, _, titles_collection = ensure_db()
+        chunk_size = parse_chunk_size()
+        inserted = 0
+        errors = []
+        known_authors = {}
+        touched_authors = set()
         
-        # Convert values - handle None and empty strings
-        price_val = float(price) if price is not None and str(price).strip() else None
-        advance_val = float(advance) if advance is not None and str(advance).strip() else None
-        royalty_val = int(royalty) if royalty is not None and str(royalty).strip() else None
-        ytd_sales_val = int(ytd_sales) if ytd_sales is not None and str(ytd_sales).strip() else None
-        
-        # Process pubdate
-        pubdate_obj = None
-        if pubdate:
-            # Try parsing the date in different formats
-            for fmt in ('%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y'):
+        for chunk in chunked(read_ndjson(request.stream), chunk_size):
+            rows = []
+            for line, record, error in chunk:
+                if error:
+                    errors.append({'line': line, 'error': error})
+                    continue
+                authors = record.get('authors')
+                if not str(record.get('title') or '').strip() or not isinstance(authors, list) or not authors:
+                    errors.append({'line': line, 'error': 'Title and authors are required'})
+                    continue
+                if not all(isinstance(author, dict) and author.get('au_id') for author in authors):
+                    errors.append({'line': line, 'error': 'Author ID is required for all authors'})
+                    continue
+                duplicates = duplicate_author_ids(authors)
+                if duplicates:
+                    errors.append({'line': line, 'error': duplicate_authors_message(duplicates)})
+                    continue
                 try:
-                    pubdate_obj = datetime.strptime(pubdate, fmt)
-                    break
-                except ValueError:
+                    rows.append((line, build_title(record), authors))
+                except Exception as e:
+                    errors.append({'line': line, 'error': f'Invalid data format: {str(e)}'})
+            
+            # Prefetch every author this chunk references that we have not seen yet
+            unseen = {author['au_id'] for _, _, authors in rows for author in authors} - known_authors.keys()
+            if unseen:
+                known_authors.update(fetch_authors(unseen))
+            
+            documents = []
+            for line, title_doc, authors in rows:
+                try:
+                    author_updates, missing = build_title_authors(authors, known_authors)
+                except Exception as e:
+                    errors.append({'line': line, 'error': f'Invalid data format: {str(e)}'})
                     continue
+                if missing:
+                    errors.append({'line': line, 'error': missing_authors_message(missing)})
+                    continue
+                title_doc['authors'] = author_updates
+                touched_authors.update(author['au_id'] for author in author_updates)
+                documents.append((line, title_doc))
+            
+            chunk_inserted, chunk_errors = insert_chunk(
+                titles_collection, documents, 'title_id', title_ids, format_title_id
+            )
+            inserted += chunk_inserted
+            errors.extend(chunk_errors)
         
-        # Generate unique title ID
-        title_id = generate_title_id()
-        
-        # Prepare authors array with validation
-        author_updates = []
-        for i, author in enumerate(authors, 1):
-            au_id = author.get('au_id')
-            if not au_id:
-                return jsonify({
-                    'success': False, 
-                    'error': 'Author ID is required for all authors'
-                }), 400
-                
-            # Verify author exists
-            author_doc = authors_collection.find_one({'au_id': au_id})
-            if not author_doc:
-                return jsonify({
-                    'success': False, 
-                    'error': f'Author with ID {au_id} not found'
-                }), 404
-                
-            author_updates.append({
-                'au_id': au_id,
-                'au_ord': author.get('au_ord', i),
-                'royaltyper': int(author.get('royaltyper', 100))  # Default to 100%
-            })
-        
-        # Create title document
-        title_doc = {
-            'title_id': title_id,
-            'title': title,
-            'type': type_val,
-            'pub_id': pub_id,
-            'price': price_val,
-            'advance': advance_val,
-            'royalty': royalty_val,
-            'ytd_sales': ytd_sales_val,
-            'notes': notes,
-            'pubdate': pubdate_obj,
-            'authors': author_updates
-        }
+        if inserted:
+            bump_versions('titles')
+            read_cache.invalidate('titles', *(f'author:{au_id}' for au_id in touched_authors))
+            refresh_author_stats(database, touched_authors)
         
-        # Insert into MongoDB
-        result = titles_collection.insert_one(title_doc)
+        return bulk_report(inserted, errors)
         
+    except ValueError as ve:
         return jsonify({
-            'success': True, 
-            'message': 'Title added successfully', 
-            'id': title_id,
-            'mongo_id': str(result.inserted_id)
-        })
+            'success': False, 
+            'error': str(ve)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), 500
+
+# ==================== EXPORT ====================
+
+# Catalog exports stream straight from a cursor as NDJSON or CSV, optionally
+# gzip-compressed on the fly, so memory use does not grow with the catalog.
+# Titles already carry their authors' names, so no join is needed here.
+AUTHOR_EXPORT_FIELDS = ['au_id', 'au_name', 'au_fname', 'phone', 'address', 'city', 'state', 'zip', 'contract', 'updated_at']
+TITLE_EXPORT_FIELDS = ['title_id', 'title', 'type', 'pub_id', 'price', 'advance', 'royalty', 'ytd_sales', 'pubdate', 'notes', 'updated_at']
+TITLE_AUTHOR_EXPORT_FIELDS = ['au_id', 'au_name', 'au_fname', 'au_ord', 'royaltyper']
+
+# Exactly the exported fields, so internal ones (search_keys, change_seq) never
+# leave the database and cannot be written back by re-importing an export
+AUTHOR_EXPORT_PROJECTION = {'_id': 0, **{field: 1 for field in AUTHOR_EXPORT_FIELDS}}
+TITLE_EXPORT_PROJECTION = {
+    '_id': 0,
+    **{field: 1 for field in TITLE_EXPORT_FIELDS},
+    **{f'authors.{field}': 1 for field in TITLE_AUTHOR_EXPORT_FIELDS}
+}
+
+def parse_export_args():
+    """Read ?format= (ndjson or csv) and ?since= (ISO 8601 date or timestamp, UTC if no offset)"""
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in ('ndjson', 'csv'):
+        raise ValueError('format must be ndjson or csv')
+    
+    since = request.args.get('since')
+    if since:
+        try:
+            since = datetime.fromisoformat(since)
+        except ValueError:
+            raise ValueError('since must be an ISO 8601 date or timestamp')
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+    return export_format, since
+
+def export_cursor(collection, id_field, since, projection):
+    """Cursor over a collection for export, using the index that matches the filter"""
+    if since:
+        cursor = collection.find({'updated_at': {'$gte': since}}, projection).sort('updated_at', 1)
+    else:
+        cursor = collection.find({}, projection).sort(id_field, 1)
+    return cursor.batch_size(STREAM_BATCH_SIZE)
+
+def export_value(field, value):
+    """Render a stored value for NDJSON/CSV output"""
+    if isinstance(value, datetime):
+        # pubdate is a calendar date, the same as the API returns it
+        return value.strftime('%Y-%m-%d') if field == 'pubdate' else isoformat_utc(value)
+    return value
+
+def author_export_rows(author):
+    yield [export_value(field, author.get(field)) for field in AUTHOR_EXPORT_FIELDS]
+
+def title_export_rows(title):
+    """One CSV row per author of a title, carrying that author's name and royalty share"""
+    title_values = [export_value(field, title.get(field)) for field in TITLE_EXPORT_FIELDS]
+    for author in title.get('authors') or [{}]:
+        yield title_values + [author.get(field) for field in TITLE_AUTHOR_EXPORT_FIELDS]
+
+def export_response(cursor, export_format, header, csv_rows, name):
+    """Stream an export, one batch per chunk (compressed on the way out like every API response)"""
+    def encode(document):
+        if export_format == 'ndjson':
+            return json.dumps({key: export_value(key, value) for key, value in document.items()},
+                              default=str, separators=(',', ':')) + '\n'
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(csv_rows(document))
+        return buffer.getvalue()
+    
+    def generate():
+        chunk = []
+        if export_format == 'csv':
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow(header)
+            chunk.append(buffer.getvalue())
         
+        for count, document in enumerate(cursor, 1):
+            chunk.append(encode(document))
+            if count % STREAM_BATCH_SIZE == 0:
+                yield ''.join(chunk).encode('utf-8')
+                chunk = []
+        
+        yield ''.join(chunk).encode('utf-8')
+    
+    mimetype = 'application/x-ndjson' if export_format == 'ndjson' else 'text/csv'
+    response = app.response_class(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={name}.{export_format}'
+    return response
+
+@app.route('/api/export/authors', methods=['GET'])
+def export_authors():
+    """Stream every author (or those changed since ?since=) as NDJSON or CSV"""
+    try:
+        _, authors_collection, _ = ensure_db()
+        export_format, since = parse_export_args()
+        cursor = export_cursor(authors_collection, 'au_id', since, AUTHOR_EXPORT_PROJECTION)
+        return export_response(cursor, export_format, AUTHOR_EXPORT_FIELDS, author_export_rows, 'authors')
     except ValueError as ve:
         return jsonify({
             'success': False, 
-            'error': f'Invalid data format: {str(ve)}'
+            'error': str(ve)
         }), 400
     except Exception as e:
         return jsonify({
@@ -568,338 +3656,269 @@ def add_title():
             'error': str(e)
         }), 500
 
-@app.route('/api/titles/<title_id>', methods=['GET'])
-def get_title(title_id):
-    """Get a specific title with its authors"""
+@app.route('/api/export/titles', methods=['GET'])
+def export_titles():
+    """Stream every title (or those changed since ?since=) with author names and royalty shares.
+
+    NDJSON has one title per line with its authors array; CSV has one row per
+    title and author.
+    """
     try:
-        # Use aggregation to get the title with author details
-        pipeline = [
-            {'$match': {'title_id': title_id}},
-            {
-                '$lookup': {
-                    'from': 'authors',
-                    'localField': 'authors.au_id',
-                    'foreignField': 'au_id',
-                    'as': 'author_details'
-                }
-            },
-            {
-                '$project': {
-                    'title_id': 1,
-                    'title': 1,
-                    'type': 1,
-                    'pub_id': 1,
-                    'price': 1,
-                    'advance': 1,
-                    'royalty': 1,
-                    'ytd_sales': 1,
-                    'notes': 1,
-                    'pubdate': 1,
-                    'authors': {
-                        '$map': {
-                            'input': '$authors',
-                            'as': 'auth',
-                            'in': {
-                                'au_id': '$$auth.au_id',
-                                'au_ord': '$$auth.au_ord',
-                                'royaltyper': '$$auth.royaltyper',
-                                'author_details': {
-                                    '$arrayElemAt': [
+        _, _, titles_collection = ensure_db()
+        export_format, since = parse_export_args()
+        cursor = export_cursor(titles_collection, 'title_id', since, TITLE_EXPORT_PROJECTION)
+        return export_response(
+            cursor, export_format, TITLE_EXPORT_FIELDS + TITLE_AUTHOR_EXPORT_FIELDS, title_export_rows, 'titles'
+        )
+    except ValueError as ve:
+        return jsonify({
+            'success': False, 
+            'error': str(ve)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False, 
+            'error': str(e)
+        }), 500
+
+# ==================== ADMIN ====================
+
+def backfill_author_names(database):
+    """Rewrite the author name snapshot on every title from the authors collection.
+
+    Runs entirely server-side: the join happens once here instead of on every read,
+    and $merge writes the refreshed authors arrays back into titles.
+    """
+    database['titles'].aggregate([
+        {
+            '$lookup': {
+                'from': 'authors',
+                'localField': 'authors.au_id',
+                'foreignField': 'au_id',
+                'as': 'author_details'
+            }
+        },
+        {
+            '$project': {
+                'authors': {
+                    '$map': {
+                        'input': '$authors',
+                        'as': 'auth',
+                        'in': {
+                            '$let': {
+                                'vars': {
+                                    'details': {
+                                        '$arrayElemAt': [
+                                            {
+                                                '$filter': {
+                                                    'input': '$author_details',
+                                                    'as': 'ad',
+                                                    'cond': {'$eq': ['$$ad.au_id', '$$auth.au_id']}
+                                                }
+                                            },
+                                            0
+                                        ]
+                                    }
+                                },
+                                'in': {
+                                    '$mergeObjects': [
+                                        '$$auth',
                                         {
-                                            '$filter': {
-                                                'input': '$author_details',
-                                                'as': 'ad',
-                                                'cond': {'$eq': ['$$ad.au_id', '$$auth.au_id']}
-                                            }
-                                        },
-                                        0
+                                            'au_name': '$$details.au_name',
+                                            'au_fname': '$$details.au_fname'
+                                        }
                                     ]
                                 }
                             }
                         }
                     }
                 }
-            },
-            {
-                '$project': {
-                    'title_id': 1,
-                    'title': 1,
-                    'type': 1,
-                    'pub_id': 1,
-                    'price': 1,
-                    'advance': 1,
-                    'royalty': 1,
-                    'ytd_sales': 1,
-                    'notes': 1,
-                    'pubdate': 1,
-                    'authors': {
-                        '$map': {
-                            'input': '$authors',
-                            'as': 'auth',
-                            'in': {
-                                'au_id': '$$auth.au_id',
-                                'au_name': '$$auth.author_details.au_name',
-                                'au_fname': '$$auth.author_details.au_fname',
-                                'au_ord': '$$auth.au_ord',
-                                'royaltyper': '$$auth.royaltyper'
-                            }
-                        }
-                    }
-                }
             }
-        ]
-        
-        title = next(titles_collection.aggregate(pipeline), None)
-        
-        if not title:
-            return jsonify({
-                'success': False, 
-                'error': 'Title not found'
-            }), 404
-        
+        },
+        {
+            '$merge': {
+                'into': 'titles',
+                'on': '_id',
+                'whenMatched': 'merge',
+                'whenNotMatched': 'discard'
+            }
+        }
+    ])
+
+@app.cli.command('backfill-author-names')
+def backfill_author_names_command():
+    """Repair the author names stored on titles, e.g. after an interrupted author update"""
+    database, _, _ = ensure_db()
+    backfill_author_names(database)
+    # Titles served from cache or revalidated by ETag would keep the old names
+    bump_versions('titles')
+    read_cache.invalidate('titles')
+    print("✅ Author names on titles are up to date")
+
+
+def backfill_search_keys(database, batch_size=1000):
+    """Recompute search_keys on every author and title, e.g. for records written before search"""
+    for collection_name, fields in SEARCH_FIELDS.items():
+        collection = database[collection_name]
+        names = [field for field, _ in fields]
+        batch = []
+        for document in collection.find({}, {field: 1 for field in names}).batch_size(batch_size):
+            keys = search_tokens(*(document.get(field) for field in names))
+            batch.append(UpdateOne({'_id': document['_id']}, {'$set': {'search_keys': keys}}))
+            if len(batch) >= batch_size:
+                collection.bulk_write(batch, ordered=False)
+                batch = []
+        if batch:
+            collection.bulk_write(batch, ordered=False)
+
+@app.cli.command('backfill-search-keys')
+def backfill_search_keys_command():
+    """Rebuild the search keys used by /api/search"""
+    database, _, _ = ensure_db()
+    backfill_search_keys(database)
+    bump_versions('authors', 'titles')
+    print("✅ Search keys are up to date")
+
+@app.cli.command('rebuild-author-stats')
+def rebuild_author_stats_command():
+    """Recompute the author statistics served by /api/stats/authors from scratch"""
+    database, _, _ = ensure_db()
+    refresh_author_stats(database)
+    print("✅ Author statistics are up to date")
+
+@app.route('/api/admin/index-report', methods=['GET'])
+def get_index_report():
+    """Explain the canonical queries and report any that fall back to a COLLSCAN"""
+    try:
+        database, _, _ = ensure_db()
+        report = index_report(database)
         return jsonify({
             'success': True, 
-            'data': serialize_title(title)
+            'healthy': not index_build_errors and all(not entry.get('collscan') and 'error' not in entry for entry in report),
+            'build_errors': index_build_errors,
+            'data': report
         })
-        
     except Exception as e:
         return jsonify({
             'success': False, 
             'error': str(e)
         }), 500
 
-@app.route('/api/titles/<title_id>', methods=['PUT'])
-def update_title(title_id):
-    """Update an existing title"""
+@app.route('/api/admin/cache', methods=['GET'])
+def get_cache_stats():
+    """Report read cache size and hit/miss/eviction counters for this worker"""
+    stats = read_cache.stats()
+    stats['versions'] = version_cache.stats()
+    return jsonify({
+        'success': True, 
+        'data': stats
+    })
+
+@app.route('/api/admin/compression', methods=['GET'])
+def get_compression_stats():
+    """Report raw vs. compressed bytes of API responses for this worker"""
+    return jsonify({
+        'success': True, 
+        'data': compression_stats.stats()
+    })
+
+@app.route('/api/admin/slow-ops', methods=['GET'])
+def get_slow_ops():
+    """List the slowest recent MongoDB commands of this worker, most recent first"""
     try:
-        data = request.json
-        
-        # Check if title exists
-        existing_title = titles_collection.find_one({'title_id': title_id})
-        if not existing_title:
-            return jsonify({
-                'success': False, 
-                'error': 'Title not found'
-            }), 404
-        
-        updates = {}
-        
-        # Only include fields that are provided and not empty
-        if 'title' in data and data['title'].strip():
-            updates['title'] = data['title'].strip()
-        if 'type' in data:
-            updates['type'] = data['type'].strip() if data['type'].strip() else None
-        if 'pub_id' in data:
-            updates['pub_id'] = data['pub_id'].strip() if data['pub_id'].strip() else None
-        if 'price' in data and data['price'] is not None:
-            price_str = str(data['price']).strip()
-            updates['price'] = float(price_str) if price_str else None
-        if 'advance' in data and data['advance'] is not None:
-            advance_str = str(data['advance']).strip()
-            updates['advance'] = float(advance_str) if advance_str else None
-        if 'royalty' in data and data['royalty'] is not None:
-            royalty_str = str(data['royalty']).strip()
-            updates['royalty'] = int(royalty_str) if royalty_str else None
-        if 'ytd_sales' in data and data['ytd_sales'] is not None:
-            ytd_str = str(data['ytd_sales']).strip()
-            updates['ytd_sales'] = int(ytd_str) if ytd_str else None
-        if 'notes' in data:
-            updates['notes'] = data['notes'].strip() if data['notes'].strip() else None
-            
-        # Handle pubdate if provided
-        if 'pubdate' in data and data['pubdate']:
-            pubdate = data['pubdate'].strip()
-            # Try parsing the date in different formats
-            for fmt in ('%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y'):
-                try:
-                    updates['pubdate'] = datetime.strptime(pubdate, fmt)
-                    break
-                except ValueError:
-                    continue
-        
-        # Handle authors if provided
-        if 'authors' in data and isinstance(data['authors'], list):
-            authors = data['authors']
-            author_updates = []
-            
-            for i, author in enumerate(authors, 1):
-                au_id = author.get('au_id')
-                if not au_id:
-                    return jsonify({
-                        'success': False, 
-                        'error': 'Author ID is required for all authors'
-                    }), 400
-                
-                # Verify author exists
-                author_doc = authors_collection.find_one({'au_id': au_id})
-                if not author_doc:
-                    return jsonify({
-                        'success': False, 
-                        'error': f'Author with ID {au_id} not found'
-                    }), 404
-                
-                author_updates.append({
-                    'au_id': au_id,
-                    'au_ord': author.get('au_ord', i),
-                    'royaltyper': int(author.get('royaltyper', 100))  # Default to 100%
-                })
-            
-            updates['authors'] = author_updates
-        
-        # Update the title in MongoDB
-        result = titles_collection.update_one(
-            {'title_id': title_id},
-            {'$set': updates} if updates else {'$setOnInsert': {'title_id': title_id}}
-        )
-        
-        if result.matched_count == 0:
-            return jsonify({
-                'success': False, 
-                'error': 'Failed to update title'
-            }), 500
-        
+        limit = request.args.get('limit', type=int)
         return jsonify({
             'success': True, 
-            'message': 'Title updated successfully'
+            'threshold_ms': SLOW_OP_MS,
+            'capacity': SLOW_OP_BUFFER,
+            'recorded': slow_ops.recorded,
+            'data': slow_ops.entries(limit)
         })
-        
-    except ValueError as ve:
-        return jsonify({
-            'success': False, 
-            'error': f'Invalid data format: {str(ve)}'
-        }), 400
     except Exception as e:
         return jsonify({
             'success': False, 
             'error': str(e)
         }), 500
 
-@app.route('/api/titles/<title_id>', methods=['DELETE'])
-def delete_title(title_id):
-    """Delete a title"""
+@app.route('/api/admin/slow-ops/<int:op_id>/explain', methods=['POST'])
+def explain_slow_operation(op_id):
+    """Explain a captured command and attach docs examined and the winning plan to it"""
     try:
-        result = titles_collection.delete_one({'title_id': title_id})
-        
-        if result.deleted_count == 0:
+        database, _, _ = ensure_db()
+        summary = explain_slow_op(database, op_id)
+        if summary is None:
             return jsonify({
                 'success': False, 
-                'error': 'Title not found'
+                'error': 'Slow operation not found'
             }), 404
-            
         return jsonify({
             'success': True, 
-            'message': 'Title deleted successfully'
+            'data': summary
         })
-    except Exception as e:
+    except ValueError as e:
         return jsonify({
             'success': False, 
             'error': str(e)
-        }), 500
-
-@app.route('/api/titles/by-author/<au_id>', methods=['GET'])
-def get_titles_by_author(au_id):
-    """Get all titles by a specific author"""
-    try:
-        # Find all titles that have this author in their authors array
-        pipeline = [
-            {'$match': {'authors.au_id': au_id}},
-            {
-                '$lookup': {
-                    'from': 'authors',
-                    'localField': 'authors.au_id',
-                    'foreignField': 'au_id',
-                    'as': 'author_details'
-                }
-            },
-            {
-                '$project': {
-                    'title_id': 1,
-                    'title': 1,
-                    'type': 1,
-                    'price': 1,
-                    'pubdate': 1,
-                    'authors': {
-                        '$filter': {
-                            'input': '$authors',
-                            'as': 'auth',
-                            'cond': {'$eq': ['$$auth.au_id', au_id]}
-                        }
-                    },
-                    'author_details': {
-                        '$arrayElemAt': [
-                            {
-                                '$filter': {
-                                    'input': '$author_details',
-                                    'as': 'ad',
-                                    'cond': {'$eq': ['$$ad.au_id', au_id]}
-                                }
-                            },
-                            0
-                        ]
-                    }
-                }
-            },
-            {
-                '$project': {
-                    'title_id': 1,
-                    'title': 1,
-                    'type': 1,
-                    'price': 1,
-                    'pubdate': 1,
-                    'royaltyper': {'$arrayElemAt': ['$authors.royaltyper', 0]},
-                    'au_name': '$author_details.au_name',
-                    'au_fname': '$author_details.au_fname'
-                }
-            },
-            {'$sort': {'title_id': 1}}
-        ]
-        
-        titles = list(titles_collection.aggregate(pipeline))
-        
-        # Convert ObjectIds and dates to JSON serializable format
-        serialized_titles = []
-        for title in titles:
-            # Serialize all ObjectIds recursively
-            title = serialize_objectid(title)
-            # Convert dates to display string (DD-MM-YYYY)
-            if 'pubdate' in title and title['pubdate'] and isinstance(title['pubdate'], datetime):
-                title['pubdate'] = title['pubdate'].strftime('%d-%m-%Y')
-            serialized_titles.append(title)
-        
-        return jsonify({
-            'success': True, 
-            'data': serialized_titles
-        })
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False, 
             'error': str(e)
         }), 500
 
+@app.route('/api/admin/slow-ops', methods=['DELETE'])
+def clear_slow_ops():
+    """Empty the slow-operation buffer"""
+    slow_ops.clear()
+    return jsonify({
+        'success': True, 
+        'message': 'Slow operation log cleared'
+    })
+
 # ==================== HEALTH CHECK ====================
 
+# /api/health is liveness: the worker's heartbeat thread is still running, whatever the
+# database is doing, so a restart policy never kills a worker over an outage it cannot fix.
+# /api/ready is readiness: warmed up, and the database answered a heartbeat recently, so a
+# load balancer only routes to workers that can serve. Both answer from memory.
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Check if the API and database are working"""
-    try:
-        # Ensure MongoDB is initialized
-        ensure_db()
-        # Try to ping the database
-        client.admin.command('ping')
+    """Check that the API process is running"""
+    error = worker_health.liveness_error()
+    if error:
         return jsonify({
-            'success': True, 
-            'message': 'API and database are healthy'
-        })
-    except Exception as e:
+            'success': False, 
+            'error': error,
+            'data': worker_health.status()
+        }), 503
+    return jsonify({
+        'success': True, 
+        'message': 'API is running',
+        'data': worker_health.status()
+    })
+
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Check that this worker is warmed up and its database answers"""
+    error = worker_health.readiness_error()
+    if error:
         return jsonify({
             'success': False, 
-            'error': str(e)
-        }), 500
+            'error': error,
+            'data': worker_health.status()
+        }), 503
+    return jsonify({
+        'success': True, 
+        'message': 'API and database are healthy',
+        'data': worker_health.status()
+    })
 
 if __name__ == '__main__':
     # Production: use environment variable for port, debug=False
     # Development: debug=True
     debug_mode = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
     port = int(os.getenv('PORT', 5000))
+    worker_health.start()
     # For Render, must bind to 0.0.0.0 and use PORT env var
     app.run(debug=debug_mode, host='0.0.0.0', port=port)
@@ -0,0 +1,735 @@
+"""Async entry point for the Books Manager API.
+
+    uvicorn asgi:app --host 0.0.0.0 --port $PORT
+
+The author and title reads run natively on Quart with the Motor driver, so a
+single process keeps hundreds of requests in flight while they wait on MongoDB
+instead of tying up one sync worker each. Creating and updating a title is native
+too: the authors are looked up while the title ID is allocated or the title is
+read, and the write itself is the one app.py performs. Every other request - the
+author writes, title deletes, the page, static files, bulk import, export,
+admin - is handed to the Flask app in app.py on a pool of FALLBACK_THREADS
+threads, reading the request body as Flask consumes it, so transactions, stats
+refreshes and tombstones have one implementation and a long export or import
+never holds up the rest.
+
+Both share the helpers, read cache and collection versions of app.py, so
+responses, ETags and cache invalidation are identical whichever entry point
+serves them.
+"""
+from quart import Quart, g, request, jsonify
+from motor.motor_asyncio import AsyncIOMotorClient
+from asgiref.sync import AsyncToSync, sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.datastructures import Headers
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import parse_etags
+from werkzeug.routing import RequestRedirect
+import asyncio
+import io
+import os
+import time
+
+import app as wsgi
+
+quart_app = Quart(__name__, static_folder=None)
+
+# Motor connection - opened by each worker process when it starts serving, and
+# warmed up in the background so startup never waits on a database round trip
+motor_client = None
+adb = None
+motor_warmup = None
+motor_ready = False
+
+@quart_app.before_serving
+async def init_motor():
+    """Open the async MongoDB connection with the same settings as the sync client"""
+    global motor_client, adb, motor_warmup
+
+    if wsgi.STORAGE_BACKEND != 'mongodb':
+        raise RuntimeError('asgi.py serves MongoDB only; run app.py under gunicorn with STORAGE_BACKEND=sqlite')
+    connection_uri, redacted_uri = wsgi.mongo_connection_uri()
+    print(f"Connecting async driver to MongoDB with URI: {redacted_uri}")
+    motor_client = AsyncIOMotorClient(
+        connection_uri, event_listeners=wsgi.mongo_event_listeners('async'), **wsgi.MONGO_CLIENT_OPTIONS
+    )
+    adb = motor_client[wsgi.DB_NAME]
+    motor_warmup = asyncio.get_running_loop().create_task(warm_up_motor())
+    # The Flask fallback routes use the sync client; warm it up alongside
+    wsgi.worker_health.start()
+
+async def warm_up_motor():
+    """Connect and open WARMUP_CONNECTIONS pooled connections, retrying until it works"""
+    global motor_ready
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            count = max(1, min(wsgi.WARMUP_CONNECTIONS, wsgi.MONGO_CLIENT_OPTIONS['maxPoolSize']))
+            await asyncio.gather(*(motor_client.admin.command('ping') for _ in range(count)))
+        except Exception as e:
+            print(f"❌ Async MongoDB connection error (attempt {attempt}): {str(e)}")
+            await asyncio.sleep(wsgi.WARMUP_RETRY_SECONDS)
+            continue
+        motor_ready = True
+        print(f"✅ Async driver connected to MongoDB database: {wsgi.DB_NAME}")
+        return
+
+@quart_app.after_serving
+async def close_motor():
+    if motor_warmup is not None:
+        motor_warmup.cancel()
+    if motor_client is not None:
+        motor_client.close()
+
+@quart_app.after_request
+async def add_cors_headers(response):
+    """Match the flask-cors defaults of the WSGI app for simple requests"""
+    if 'Origin' in request.headers:
+        response.headers['Access-Control-Allow-Origin'] = '*'
+    return response
+
+# Request metrics go into the same registry as the Flask routes, so /metrics
+# covers both. Motor runs commands on its own threads, so the Server-Timing
+# header here only has the app time; MongoDB timings still reach the command
+# histograms through the listeners.
+@quart_app.before_request
+async def start_request_timing():
+    g.request_started = time.perf_counter()
+    wsgi.http_in_flight.inc()
+
+@quart_app.after_request
+async def record_request_metrics(response):
+    """Add Server-Timing and record route, status and latency"""
+    started = g.get('request_started')
+    if started is None:
+        return response
+    seconds = time.perf_counter() - started
+    response.headers['Server-Timing'] = f'app;dur={seconds * 1000:.1f}'
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    wsgi.observe_request(request.method, route, response.status_code, seconds)
+    wsgi.http_in_flight.dec()
+    return response
+
+# ==================== CONDITIONAL REQUESTS ====================
+
+async def collection_versions(*collections):
+    """Current version of each named collection, from the worker's copy while it is current"""
+    versions, token = wsgi.version_cache.lookup(collections)
+    if versions is None:
+        found = {
+            doc['_id']: doc['v']
+            async for doc in adb['versions'].find({'_id': {'$in': list(collections)}})
+        }
+        versions = tuple(found.get(name, 0) for name in collections)
+        wsgi.version_cache.remember(collections, token, versions)
+    return versions
+
+async def resource_etag(key, *collections):
+    return wsgi.make_etag(key, await collection_versions(*collections))
+
+def with_etag(response, etag):
+    """Attach the validator and make clients revalidate before reusing their copy"""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def not_modified(etag):
+    return with_etag(quart_app.response_class('', status=304), etag)
+
+def cached_response(key, etag):
+    """Answer from the client's validator or the shared read cache; None means query"""
+    if wsgi.etag_matches(request.if_none_match, etag):
+        return not_modified(etag)
+    body = wsgi.read_cache.get((key, etag))
+    if body is None:
+        return None
+    return with_etag(quart_app.response_class(body, mimetype='application/json'), etag)
+
+def cache_response(key, etag, payload, tags):
+    """Serialize a payload the way Flask does and remember its body under key"""
+    body = (quart_app.json.dumps(payload) + '\n').encode('utf-8')
+    wsgi.read_cache.set((key, etag), body, tags)
+    return with_etag(quart_app.response_class(body, mimetype='application/json'), etag)
+
+def stream_list_response(cursor, serialize, etag):
+    """Stream a Motor cursor as the usual {"success": true, "data": [...]} envelope"""
+    if wsgi.etag_matches(request.if_none_match, etag):
+        return not_modified(etag)
+
+    async def generate():
+        yield b'{"success":true,"data":['
+        separator = ''
+        chunk = []
+        async for document in cursor.batch_size(wsgi.STREAM_BATCH_SIZE):
+            chunk.append(separator + quart_app.json.dumps(serialize(document), separators=(',', ':')))
+            separator = ','
+            if len(chunk) >= wsgi.STREAM_BATCH_SIZE:
+                yield ''.join(chunk).encode('utf-8')
+                chunk = []
+        yield (''.join(chunk) + ']}\n').encode('utf-8')
+
+    return with_etag(quart_app.response_class(generate(), mimetype='application/json'), etag)
+
+# ==================== AUTHOR ENDPOINTS ====================
+
+@quart_app.route('/api/authors', methods=['GET'])
+async def get_authors():
+    """Get authors, one keyset page at a time (``?all=true`` streams every author)"""
+    try:
+        paginate, limit, after = wsgi.parse_page_args(request.args)
+        fields = wsgi.parse_fields(request.args, wsgi.AUTHOR_FIELDS)
+        projection = wsgi.fields_projection(fields, 'au_id', wsgi.AUTHOR_PROJECTION)
+
+        cache_key = ('authors', paginate, limit, after, fields)
+        etag = await resource_etag(cache_key, 'authors')
+
+        if not paginate:
+            authors = adb['authors'].find({}, projection).sort('au_id', 1)
+            return stream_list_response(authors, wsgi.serialize_author, etag)
+
+        cached = cached_response(cache_key, etag)
+        if cached is not None:
+            return cached
+
+        query = {'au_id': {'$gt': after}} if after else {}
+        authors = await adb['authors'].find(query, projection).sort('au_id', 1).to_list(limit + 1)
+        return cache_response(cache_key, etag, wsgi.page_response(
+            [wsgi.serialize_author(author) for author in authors], limit, 'au_id'
+        ), ['authors'])
+    except ValueError as ve:
+        return jsonify({
+            'success': False,
+            'error': str(ve)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@quart_app.route('/api/authors/<au_id>', methods=['GET'])
+async def get_author(au_id):
+    """Get a specific author"""
+    try:
+        fields = wsgi.parse_fields(request.args, wsgi.AUTHOR_FIELDS)
+        cache_key = ('author', au_id, fields)
+        etag = await resource_etag(cache_key, 'authors')
+        cached = cached_response(cache_key, etag)
+        if cached is not None:
+            return cached
+
+        author = await adb['authors'].find_one(
+            {'au_id': au_id}, wsgi.fields_projection(fields, 'au_id', wsgi.AUTHOR_PROJECTION)
+        )
+
+        if not author:
+            return jsonify({
+                'success': False,
+                'error': 'Author not found'
+            }), 404
+
+        return cache_response(cache_key, etag, {
+            'success': True,
+            'data': wsgi.serialize_author(author)
+        }, ['authors', f'author:{au_id}'])
+    except ValueError as ve:
+        return jsonify({
+            'success': False,
+            'error': str(ve)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+# ==================== TITLE ENDPOINTS ====================
+
+@quart_app.route('/api/titles', methods=['GET'])
+async def get_titles():
+    """Get titles with their authors, one keyset page at a time (``?all=true`` streams every title)"""
+    try:
+        paginate, limit, after = wsgi.parse_page_args(request.args)
+        fields = wsgi.parse_fields(request.args, wsgi.TITLE_FIELDS)
+        projection = wsgi.fields_projection(fields, 'title_id', wsgi.TITLE_PROJECTION)
+
+        cache_key = ('titles', paginate, limit, after, fields)
+        etag = await resource_etag(cache_key, 'titles')
+
+        if not paginate:
+            titles = adb['titles'].find({}, projection).sort('title_id', 1)
+            return stream_list_response(titles, lambda title: wsgi.serialize_title(title, fields), etag)
+
+        cached = cached_response(cache_key, etag)
+        if cached is not None:
+            return cached
+
+        query = {'title_id': {'$gt': after}} if after else {}
+        titles = await adb['titles'].find(query, projection).sort('title_id', 1).to_list(limit + 1)
+        return cache_response(cache_key, etag, wsgi.page_response(
+            [wsgi.serialize_title(title, fields) for title in titles], limit, 'title_id'
+        ), ['titles'])
+    except ValueError as ve:
+        return jsonify({
+            'success': False,
+            'error': str(ve)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+async def fetch_authors(au_ids):
+    """Fetch the name fields of the given authors with one $in query, keyed by au_id"""
+    return {
+        doc['au_id']: doc async for doc in adb['authors'].find(
+            {'au_id': {'$in': list(set(au_ids))}},
+            {'_id': 0, 'au_id': 1, 'au_name': 1, 'au_fname': 1}
+        )
+    }
+
+def error_response(error):
+    body, status = error
+    return jsonify(body), status
+
+@quart_app.route('/api/titles', methods=['POST'])
+async def add_title():
+    """Add a new title"""
+    try:
+        data = await request.get_json()
+        authors = data.get('authors', [])  # List of {au_id, royaltyper, au_ord}
+
+        if not data.get('title', '').strip() or not authors:
+            return jsonify({
+                'success': False,
+                'error': 'Title and authors are required'
+            }), 400
+
+        title_doc = wsgi.build_title(data)
+
+        error = wsgi.title_authors_error(authors)
+        if error:
+            return error_response(error)
+
+        # Validate the authors while the title ID is being allocated
+        known_authors, title_id = await asyncio.gather(
+            fetch_authors([author['au_id'] for author in authors]),
+            asyncio.to_thread(wsgi.generate_title_id)
+        )
+        author_updates, missing = wsgi.build_title_authors(authors, known_authors)
+        if missing:
+            return error_response(wsgi.missing_authors_error(missing))
+        title_doc['authors'] = author_updates
+
+        # The pre-allocated ID is used first, fresh ones only if it collides
+        ids = iter([title_id])
+        inserted_id = await asyncio.to_thread(
+            wsgi.insert_title, title_doc, lambda: next(ids, None) or wsgi.generate_title_id()
+        )
+
+        return jsonify({
+            'success': True,
+            'message': 'Title added successfully',
+            'id': title_doc['title_id'],
+            'mongo_id': str(inserted_id)
+        })
+    except ValueError as ve:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid data format: {str(ve)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@quart_app.route('/api/titles/<title_id>', methods=['PUT'])
+async def update_title(title_id):
+    """Update an existing title"""
+    try:
+        data = await request.get_json()
+        updates = wsgi.build_title_updates(data)
+
+        if 'authors' in data and isinstance(data['authors'], list):
+            error = wsgi.title_authors_error(data['authors'])
+            if error:
+                return error_response(error)
+
+            # Validate the new authors and look the title up concurrently
+            known_authors, existing_title = await asyncio.gather(
+                fetch_authors([author['au_id'] for author in data['authors']]),
+                adb['titles'].find_one({'title_id': title_id}, {'_id': 1})
+            )
+            author_updates, missing = wsgi.build_title_authors(data['authors'], known_authors)
+            if missing:
+                return error_response(wsgi.missing_authors_error(missing))
+            if not existing_title:
+                return jsonify({
+                    'success': False,
+                    'error': 'Title not found'
+                }), 404
+            updates['authors'] = author_updates
+
+        if not await asyncio.to_thread(wsgi.apply_title_updates, title_id, updates):
+            return jsonify({
+                'success': False,
+                'error': 'Title not found'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'message': 'Title updated successfully'
+        })
+    except ValueError as ve:
+        return jsonify({
+            'success': False,
+            'error': f'Invalid data format: {str(ve)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@quart_app.route('/api/titles/<title_id>', methods=['GET'])
+async def get_title(title_id):
+    """Get a specific title with its authors"""
+    try:
+        fields = wsgi.parse_fields(request.args, wsgi.TITLE_FIELDS)
+        cache_key = ('title', title_id, fields)
+        etag = await resource_etag(cache_key, 'titles')
+        cached = cached_response(cache_key, etag)
+        if cached is not None:
+            return cached
+
+        title = await adb['titles'].find_one(
+            {'title_id': title_id}, wsgi.fields_projection(fields, 'title_id', wsgi.TITLE_PROJECTION)
+        )
+
+        if not title:
+            return jsonify({
+                'success': False,
+                'error': 'Title not found'
+            }), 404
+
+        return cache_response(cache_key, etag, {
+            'success': True,
+            'data': wsgi.serialize_title(title, fields)
+        }, wsgi.title_tags(title_id, [author.get('au_id') for author in title.get('authors', [])]))
+    except ValueError as ve:
+        return jsonify({
+            'success': False,
+            'error': str(ve)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@quart_app.route('/api/titles/by-author/<au_id>', methods=['GET'])
+async def get_titles_by_author(au_id):
+    """Get all titles by a specific author"""
+    try:
+        cache_key = ('titles_by_author', au_id)
+        etag = await resource_etag(cache_key, 'titles')
+        cached = cached_response(cache_key, etag)
+        if cached is not None:
+            return cached
+
+        titles = adb['titles'].find(
+            {'authors.au_id': au_id}, wsgi.TITLES_BY_AUTHOR_PROJECTION
+        ).sort('title_id', 1)
+        serialized_titles = [wsgi.serialize_author_title(title) async for title in titles]
+
+        return cache_response(cache_key, etag, {
+            'success': True,
+            'data': serialized_titles
+        }, [f'author:{au_id}'])
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@quart_app.route('/api/authors/<au_id>/profile', methods=['GET'])
+async def get_author_profile(au_id):
+    """Get an author with their titles and summary statistics in one round trip"""
+    try:
+        cache_key = ('author_profile', au_id)
+        etag = await resource_etag(cache_key, 'authors', 'titles')
+        cached = cached_response(cache_key, etag)
+        if cached is not None:
+            return cached
+
+        results = await adb['authors'].aggregate(wsgi.author_profile_pipeline(au_id)).to_list(1)
+        profile = wsgi.unpack_author_profile(results[0])
+        if profile is None:
+            return jsonify({
+                'success': False,
+                'error': 'Author not found'
+            }), 404
+
+        return cache_response(cache_key, etag, {
+            'success': True,
+            'data': wsgi.serialize_author_profile(au_id, profile)
+        }, ['authors', f'author:{au_id}'])
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+# ==================== HEALTH CHECK ====================
+
+@quart_app.route('/api/health', methods=['GET'])
+async def health_check():
+    """Check that the API process is running"""
+    error = wsgi.worker_health.liveness_error()
+    if error:
+        return jsonify({
+            'success': False,
+            'error': error,
+            'data': worker_status()
+        }), 503
+    return jsonify({
+        'success': True,
+        'message': 'API is running',
+        'data': worker_status()
+    })
+
+@quart_app.route('/api/ready', methods=['GET'])
+async def readiness_check():
+    """Check that both drivers of this worker are warmed up and the database answers"""
+    error = wsgi.worker_health.readiness_error() or (None if motor_ready else 'Warming up')
+    if error:
+        return jsonify({
+            'success': False,
+            'error': error,
+            'data': worker_status()
+        }), 503
+    return jsonify({
+        'success': True,
+        'message': 'API and database are healthy',
+        'data': worker_status()
+    })
+
+def worker_status():
+    """The worker's heartbeat state (kept by the sync client) plus the async pool"""
+    status = wsgi.worker_health.status()
+    status['async_ready'] = motor_ready
+    status['async_pool'] = wsgi.pool_stats('async')
+    return status
+
+# ==================== COMPRESSION ====================
+
+class CompressionMiddleware:
+    """Negotiated compression for the async routes, following app.compress_response.
+
+    Quart sends bodies in several messages, so the body is buffered until it
+    either ends under COMPRESS_MIN_BYTES (sent as is) or outgrows it (compressed,
+    whole or chunk by chunk from there on).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not scope['path'].startswith('/api/'):
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = decode_headers(scope['headers'])
+        encoding = wsgi.negotiate_encoding(request_headers.get('Accept-Encoding'))
+        if_none_match = parse_etags(request_headers.get('If-None-Match'))
+        state = {'start': None, 'headers': None, 'etag': '', 'buffer': b'', 'compressor': None, 'raw': 0, 'sent': 0}
+
+        async def start_response(compressed_length=None):
+            headers = state['headers']
+            if compressed_length is not None or state['compressor'] is not None:
+                headers['Content-Encoding'] = encoding
+                if state['etag']:
+                    headers['ETag'] = f'"{wsgi.encoded_etag(state["etag"], encoding)}"'
+                if compressed_length is None:
+                    headers.pop('Content-Length', None)
+                else:
+                    headers['Content-Length'] = str(compressed_length)
+            await send({**state['start'], 'headers': encode_headers(headers)})
+
+        async def compressing_send(message):
+            if message['type'] == 'http.response.start':
+                headers = decode_headers(message['headers'])
+                state['start'], state['headers'] = message, headers
+                state['etag'] = (headers.get('ETag') or '').strip('"')
+                mimetype = (headers.get('Content-Type') or '').split(';')[0].strip()
+                
+                if message['status'] == 304:
+                    # Echo the representation the client holds
+                    headers.add('Vary', 'Accept-Encoding')
+                    for candidate in wsgi.ENCODINGS:
+                        if state['etag'] and if_none_match.contains(wsgi.encoded_etag(state['etag'], candidate)):
+                            headers['ETag'] = f'"{wsgi.encoded_etag(state["etag"], candidate)}"'
+                    await start_response()
+                    state['start'] = None
+                elif 'Content-Encoding' in headers or mimetype not in wsgi.COMPRESSIBLE_TYPES:
+                    await start_response()
+                    state['start'] = None
+                else:
+                    headers.add('Vary', 'Accept-Encoding')
+                    if message['status'] != 200 or encoding is None:
+                        await start_response()
+                        state['start'] = None
+                return  # otherwise held back until the body shows whether to compress
+            
+            if message['type'] != 'http.response.body':
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+            if state['start'] is not None:
+                state['buffer'] += body
+                if more_body and len(state['buffer']) < wsgi.COMPRESS_MIN_BYTES:
+                    return
+                body, state['buffer'] = state['buffer'], b''
+                
+                if not more_body:
+                    if len(body) < wsgi.COMPRESS_MIN_BYTES:
+                        await start_response()
+                        await send({'type': 'http.response.body', 'body': body})
+                        return
+                    # Complete body: compress it once and cache it by ETag like the WSGI app
+                    etag = state['etag']
+                    compressed = (wsgi.cached_compressed_body(etag, encoding, body) if etag
+                                  else wsgi.compress_body(body, encoding))
+                    wsgi.compression_stats.record(encoding, len(body), len(compressed))
+                    await start_response(len(compressed))
+                    await send({'type': 'http.response.body', 'body': compressed})
+                    return
+                
+                state['compressor'] = wsgi.StreamCompressor(encoding)
+                await start_response()
+                state['start'] = None
+
+            compressor = state['compressor']
+            if compressor is None:
+                await send(message)
+                return
+
+            state['raw'] += len(body)
+            data = compressor.compress(body)
+            if not more_body:
+                data += compressor.finish()
+                wsgi.compression_stats.record(encoding, state['raw'], state['sent'] + len(data))
+            state['sent'] += len(data)
+            await send({'type': 'http.response.body', 'body': data, 'more_body': more_body})
+
+        await self.app(scope, receive, compressing_send)
+
+def decode_headers(raw_headers):
+    return Headers([(k.decode('latin-1'), v.decode('latin-1')) for k, v in raw_headers])
+
+def encode_headers(headers):
+    return [(k.encode('latin-1'), v.encode('latin-1')) for k, v in headers.items()]
+
+# ==================== FLASK FALLBACK ====================
+
+# Threads running Flask requests for this process; sized like the sync driver's pool
+FALLBACK_THREADS = int(os.getenv('ASGI_FALLBACK_THREADS', wsgi.MONGO_CLIENT_OPTIONS['maxPoolSize']))
+
+fallback_executor = ThreadPoolExecutor(max_workers=FALLBACK_THREADS, thread_name_prefix='flask')
+
+class RequestBodyStream(io.RawIOBase):
+    """wsgi.input that receives the request body from the server as Flask reads it"""
+
+    def __init__(self, receive):
+        self.receive = AsyncToSync(receive)
+        self.pending = b''
+        self.more_body = True
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.pending and self.more_body:
+            message = self.receive()
+            if message['type'] != 'http.request':
+                raise OSError('Client disconnected during the request body')
+            self.pending = message.get('body', b'')
+            self.more_body = message.get('more_body', False)
+        count = min(len(buffer), len(self.pending))
+        buffer[:count] = self.pending[:count]
+        self.pending = self.pending[count:]
+        return count
+
+class PooledWsgiInstance(WsgiToAsgiInstance):
+    """One request to the Flask app on fallback_executor.
+
+    asgiref's own instance reads the whole body before calling the app and runs
+    every app on the one thread sync_to_async keeps for thread-sensitive code, so
+    a streaming export would hold up every write of the process.
+    """
+
+    # The undecorated method; the inherited one is bound to sync_to_async's single thread
+    run_wsgi_app = sync_to_async(
+        vars(WsgiToAsgiInstance)['run_wsgi_app'].func, thread_sensitive=False, executor=fallback_executor
+    )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            raise ValueError('WSGI wrapper received a non-HTTP scope')
+        self.scope = scope
+        self.sync_send = AsyncToSync(send)
+        await self.run_wsgi_app(io.BufferedReader(RequestBodyStream(receive)))
+
+    def build_environ(self, scope, body):
+        environ = super().build_environ(scope, body)
+        # The stream ends with the body, chunked or not, so werkzeug need not trust Content-Length
+        environ['wsgi.input_terminated'] = True
+        return environ
+
+class PooledWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi running the app on fallback_executor with a streamed request body"""
+
+    async def __call__(self, scope, receive, send):
+        await PooledWsgiInstance(self.wsgi_application)(scope, receive, send)
+
+# ==================== DISPATCH ====================
+
+def closing_wsgi(wsgi_application):
+    """Close the WSGI response once it is sent; asgiref never does, and Flask's
+    call_on_close hooks (request metrics) depend on it"""
+    def application(environ, start_response):
+        result = wsgi_application(environ, start_response)
+        try:
+            for chunk in result:
+                yield chunk
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+    return application
+
+flask_app = PooledWsgiToAsgi(closing_wsgi(wsgi.app))
+async_app = CompressionMiddleware(quart_app)
+
+def serves_natively(scope):
+    """True when the async app has a route for this request's path and method"""
+    if scope['method'] == 'OPTIONS':
+        return False  # CORS preflight is answered by flask-cors
+    try:
+        quart_app.url_map.bind('').match(scope['path'], method=scope['method'])
+        return True
+    except (HTTPException, RequestRedirect):
+        return False
+
+async def app(scope, receive, send):
+    """ASGI application: async routes on Quart, everything else on the Flask app"""
+    if scope['type'] == 'http' and not serves_natively(scope):
+        await flask_app(scope, receive, send)
+    else:
+        await async_app(scope, receive, send)
@@ -0,0 +1,629 @@
+"""Load benchmark for the Books Manager API.
+
+Seeds a MongoDB database with a synthetic catalog, replays a weighted read/write
+mix against the API routes from concurrent clients and reports throughput and
+p50/p95/p99 latency per endpoint as JSON, so runs can be compared over time.
+Every /api/* route and /metrics is in the mix except the slow-op explain and
+clear, which act on one worker's buffer rather than serve clients.
+
+    # Seed 10k authors / 1M titles into BooksBench, then run 60s against a server
+    DB_NAME=BooksBench gunicorn app:app &
+    python benchmark.py --seed-data --authors 10000 --titles 1000000 \\
+        --target http://localhost:8000 --duration 60 --output results.json
+
+    # Drive the Flask app in-process instead of over HTTP
+    python benchmark.py --in-process --duration 30
+
+    # Compare with an earlier run
+    python benchmark.py --target http://localhost:8000 --baseline results.json
+
+The benchmark database comes from --db (default BooksBench), never from DB_NAME,
+so a run cannot write into the production catalog by accident. The server under
+test must use the same database.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode, urlsplit
+
+# ==================== SYNTHETIC CATALOG ====================
+
+SURNAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+    'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin',
+    'Lee', 'Perez', 'Thompson', 'White', 'Harris', 'Sanchez', 'Clark', 'Ramirez', 'Lewis', 'Robinson',
+    'Walker', 'Young', 'Allen', 'King', 'Wright', 'Scott', 'Torres', 'Nguyen', 'Hill', 'Flores',
+    'Green', 'Adams', 'Nelson', 'Baker', 'Hall', 'Rivera', 'Campbell', 'Mitchell', 'Carter', 'Roberts',
+    'Ringer', 'Straight', 'Dull', 'Greene', 'Blotchet-Halls', 'Yokomoto', "O'Leary", 'MacFeather', 'Karsen', 'Panteley'
+]
+FIRST_NAMES = [
+    'Abraham', 'Reginald', 'Cheryl', 'Michel', 'Innes', 'Ann', 'Marjorie', 'Dean', 'Stearns', 'Livia',
+    'Sylvia', 'Sheryl', 'Heather', 'Akiko', 'Michael', 'Albert', 'Anne', 'Burt', 'Charlene', 'Morningstar',
+    'Johnson', 'Marie', 'Paolo', 'Ines', 'Kenji', 'Amara', 'Lucas', 'Freya', 'Tomas', 'Nadia'
+]
+CITIES = [
+    ('Berkeley', 'CA'), ('Oakland', 'CA'), ('San Jose', 'CA'), ('Lawrence', 'KS'), ('Nashville', 'TN'),
+    ('Corvallis', 'OR'), ('Ann Arbor', 'MI'), ('Gary', 'IN'), ('Rockville', 'MD'), ('Salt Lake City', 'UT')
+]
+TITLE_WORDS = [
+    'Secrets', 'Silicon', 'Valley', 'Computer', 'Phobic', 'Cooking', 'Emotional', 'Security', 'Busy', 'Executive',
+    'Database', 'Guide', 'Straight', 'Talk', 'About', 'Computers', 'Fifty', 'Years', 'Buckingham', 'Palace',
+    'Kitchens', 'Sushi', 'Anyone', 'Prolonged', 'Data', 'Deprivation', 'Life', 'Without', 'Fear', 'Is',
+    'Anger', 'Enemy', 'Onions', 'Leeks', 'Garlic', 'Mediterranean', 'Traditional', 'Modern', 'Stress', 'Victims',
+    'Net', 'Etiquette', 'Gourmet', 'Microwave', 'Baking', 'Dining', 'Psychology', 'Business', 'Systems', 'Patterns'
+]
+TITLE_TYPES = ['business', 'mod_cook', 'popular_comp', 'psychology', 'trad_cook', 'UNDECIDED']
+PUBLISHER_IDS = ['0736', '0877', '1389', '1622', '1756', '9901', '9952', '9999']
+NOTE_WORDS = [
+    'helpful', 'hints', 'on', 'how', 'to', 'use', 'your', 'electronic', 'resources', 'best', 'advantage',
+    'favorite', 'recipes', 'for', 'quick', 'easy', 'elegant', 'meals', 'annotated', 'analysis', 'of',
+    'what', 'computers', 'can', 'do', 'you', 'carefully', 'researched', 'study', 'effects', 'strong'
+]
+
+def synthetic_author(rng):
+    """Author request data in the shape POST /api/authors accepts"""
+    city, state = rng.choice(CITIES)
+    return {
+        'au_name': rng.choice(SURNAMES),
+        'au_fname': rng.choice(FIRST_NAMES),
+        'phone': f'{rng.randint(200, 999)} {rng.randint(200, 999)}-{rng.randint(1000, 9999)}',
+        'address': f'{rng.randint(1, 9999)} {rng.choice(TITLE_WORDS)} St.',
+        'city': city,
+        'state': state,
+        'zip': f'{rng.randint(10000, 99999)}',
+        'contract': rng.random() < 0.8
+    }
+
+def synthetic_title(rng):
+    """Title request data without authors, in the shape POST /api/titles accepts"""
+    pubdate = datetime(1985, 1, 1) + timedelta(days=rng.randint(0, 14000))
+    return {
+        'title': ' '.join(rng.sample(TITLE_WORDS, rng.randint(2, 6))),
+        'type': rng.choice(TITLE_TYPES),
+        'pub_id': rng.choice(PUBLISHER_IDS),
+        'price': round(rng.uniform(2, 40), 2),
+        'advance': float(rng.choice([0, 2000, 4000, 5000, 6000, 7000, 8000, 10125, 15000])),
+        'royalty': rng.choice([10, 12, 14, 16, 24]),
+        'ytd_sales': rng.randint(0, 25000),
+        'notes': ' '.join(rng.choice(NOTE_WORDS) for _ in range(rng.randint(8, 30))) if rng.random() < 0.6 else '',
+        'pubdate': pubdate.strftime('%Y-%m-%d')
+    }
+
+def pick_author_index(rng, author_count):
+    """Skewed pick so a few authors have many titles, like a real catalog"""
+    return int(author_count * rng.random() ** 2)
+
+def title_author_count(rng, max_authors):
+    """Mostly single-author titles, with a tail of co-authored ones"""
+    count = 1
+    while count < max_authors and rng.random() < 0.3:
+        count += 1
+    return count
+
+def title_authors(rng, au_ids, max_authors):
+    """An authors array of distinct authors whose royalty shares add up to 100"""
+    chosen = []
+    for _ in range(title_author_count(rng, max_authors)):
+        au_id = au_ids[pick_author_index(rng, len(au_ids))]
+        if au_id not in chosen:
+            chosen.append(au_id)
+    share, remainder = divmod(100, len(chosen))
+    return [
+        {'au_id': au_id, 'au_ord': ord_, 'royaltyper': share + (remainder if ord_ == 1 else 0)}
+        for ord_, au_id in enumerate(chosen, 1)
+    ]
+
+def seed_catalog(app, database, authors, titles, max_authors, seed, batch_size=5000, reset=False):
+    """Insert a synthetic catalog through the app's own document builders and ID allocators.
+
+    Documents are built exactly like the bulk import builds them, so search keys,
+    denormalized author names and statistics match what the API would have written.
+    """
+    rng = random.Random(seed)
+    if reset:
+        for name in ('authors', 'titles', 'author_stats', 'tombstones', 'counters', 'versions'):
+            database[name].drop()
+        app.ensure_indexes(database)
+        print("♻️  Dropped the existing benchmark collections", file=sys.stderr)
+
+    started = time.perf_counter()
+    au_ids = []
+    author_names = {}
+    for offset in range(0, authors, batch_size):
+        rows = [(line, app.build_author(synthetic_author(rng))) for line in range(offset, min(offset + batch_size, authors))]
+        app.insert_chunk(database['authors'], rows, 'au_id', app.author_ids, app.format_author_id)
+        for _, author in rows:
+            au_ids.append(author['au_id'])
+            author_names[author['au_id']] = {'au_name': author['au_name'], 'au_fname': author['au_fname']}
+    print(f"✅ Seeded {len(au_ids)} authors", file=sys.stderr)
+
+    for offset in range(0, titles, batch_size):
+        rows = []
+        for line in range(offset, min(offset + batch_size, titles)):
+            title = app.build_title(synthetic_title(rng))
+            title['authors'], _ = app.build_title_authors(title_authors(rng, au_ids, max_authors), author_names)
+            rows.append((line, title))
+        app.insert_chunk(database['titles'], rows, 'title_id', app.title_ids, app.format_title_id)
+        if (offset // batch_size) % 20 == 19:
+            print(f"   ... {offset + len(rows)} titles", file=sys.stderr)
+    print(f"✅ Seeded {titles} titles", file=sys.stderr)
+
+    app.refresh_author_stats(database)
+    app.bump_versions('authors', 'titles')
+    seconds = time.perf_counter() - started
+    print(f"✅ Author statistics rebuilt; seeding took {seconds:.1f}s", file=sys.stderr)
+    return seconds
+
+def sample_ids(database, collection, field, size):
+    """Random existing IDs to aim reads at"""
+    return [
+        document[field] for document in
+        database[collection].aggregate([{'$sample': {'size': size}}, {'$project': {'_id': 0, field: 1}}])
+    ]
+
+# ==================== WORKLOAD ====================
+
+class Workload:
+    """Shared state of a run: the IDs reads aim at and the records the run itself created.
+
+    Writes only ever update or delete records created by the benchmark, so a run
+    leaves the seeded catalog as it found it apart from the new titles' authors.
+    """
+
+    def __init__(self, au_ids, title_ids, surnames):
+        self.au_ids = au_ids
+        self.title_ids = title_ids
+        self.surnames = surnames
+        self.started_at = datetime.now(timezone.utc)
+        self._lock = threading.Lock()
+        self.created_authors = []
+        self.created_titles = []
+        self.changes_token = None
+
+    def add(self, pool, value):
+        with self._lock:
+            getattr(self, pool).append(value)
+
+    def take(self, pool, rng, remove=False):
+        with self._lock:
+            values = getattr(self, pool)
+            if not values:
+                return None
+            index = rng.randrange(len(values))
+            if remove:
+                values[index], values[-1] = values[-1], values[index]
+                return values.pop()
+            return values[index]
+
+# Every operation returns (method, path, body, content_type, on_success) or None
+# when it has nothing to act on yet. on_success gets the parsed JSON response.
+
+def random_cursor(app, rng, ids):
+    return app.encode_cursor(rng.choice(ids))
+
+def op_list_authors(app, workload, rng):
+    return 'GET', '/api/authors?' + urlencode({'limit': 100, 'after': random_cursor(app, rng, workload.au_ids)}), None, None, None
+
+def op_get_author(app, workload, rng):
+    return 'GET', f'/api/authors/{rng.choice(workload.au_ids)}', None, None, None
+
+def op_author_profile(app, workload, rng):
+    return 'GET', f'/api/authors/{rng.choice(workload.au_ids)}/profile', None, None, None
+
+def op_list_titles(app, workload, rng):
+    return 'GET', '/api/titles?' + urlencode({'limit': 100, 'after': random_cursor(app, rng, workload.title_ids)}), None, None, None
+
+def op_list_titles_sparse(app, workload, rng):
+    query = {
+        'limit': 500, 'after': random_cursor(app, rng, workload.title_ids),
+        'fields': 'title_id,title,type,price,authors.au_name,authors.au_fname'
+    }
+    return 'GET', '/api/titles?' + urlencode(query), None, None, None
+
+def op_get_title(app, workload, rng):
+    return 'GET', f'/api/titles/{rng.choice(workload.title_ids)}', None, None, None
+
+def op_titles_by_author(app, workload, rng):
+    return 'GET', f'/api/titles/by-author/{rng.choice(workload.au_ids)}', None, None, None
+
+def op_search(app, workload, rng):
+    surname = rng.choice(workload.surnames)
+    return 'GET', '/api/search?' + urlencode({'q': surname[:rng.randint(2, len(surname))]}), None, None, None
+
+def op_author_stats(app, workload, rng):
+    return 'GET', '/api/stats/authors?' + urlencode({'limit': 100, 'after': random_cursor(app, rng, workload.au_ids)}), None, None, None
+
+def op_author_stat(app, workload, rng):
+    return 'GET', f'/api/stats/authors/{rng.choice(workload.au_ids)}', None, None, None
+
+def op_export_recent(app, workload, rng):
+    # Only what this run wrote, so the export stays small on a big catalog
+    since = workload.started_at.isoformat()
+    return 'GET', '/api/export/titles?' + urlencode({'format': rng.choice(['ndjson', 'csv']), 'since': since}), None, None, None
+
+def op_export_authors(app, workload, rng):
+    since = workload.started_at.isoformat()
+    return 'GET', '/api/export/authors?' + urlencode({'format': rng.choice(['ndjson', 'csv']), 'since': since}), None, None, None
+
+def op_changes(app, workload, rng):
+    # One sync client polling: each response's token is the next request's
+    def synced(payload):
+        workload.changes_token = payload['next_since']
+    token = workload.changes_token
+    return 'GET', '/api/changes' + ('?' + urlencode({'since': token}) if token else ''), None, None, synced
+
+def op_health(app, workload, rng):
+    return 'GET', '/api/health', None, None, None
+
+def op_ready(app, workload, rng):
+    return 'GET', '/api/ready', None, None, None
+
+def op_metrics(app, workload, rng):
+    return 'GET', '/metrics', None, None, None
+
+def op_admin_cache(app, workload, rng):
+    return 'GET', '/api/admin/cache', None, None, None
+
+def op_index_report(app, workload, rng):
+    return 'GET', '/api/admin/index-report', None, None, None
+
+def op_admin_compression(app, workload, rng):
+    return 'GET', '/api/admin/compression', None, None, None
+
+def op_slow_ops(app, workload, rng):
+    return 'GET', '/api/admin/slow-ops', None, None, None
+
+def op_create_author(app, workload, rng):
+    def created(payload):
+        workload.add('created_authors', payload['id'])
+    return 'POST', '/api/authors', json.dumps(synthetic_author(rng)), 'application/json', created
+
+def op_update_author(app, workload, rng):
+    au_id = workload.take('created_authors', rng)
+    if au_id is None:
+        return None
+    # A rename rewrites the name snapshot on every title of the author
+    body = {'au_name': rng.choice(SURNAMES), 'au_fname': rng.choice(FIRST_NAMES)}
+    return 'PUT', f'/api/authors/{au_id}', json.dumps(body), 'application/json', None
+
+def op_delete_author(app, workload, rng):
+    au_id = workload.take('created_authors', rng, remove=True)
+    if au_id is None:
+        return None
+    return 'DELETE', f'/api/authors/{au_id}', None, None, None
+
+def op_create_title(app, workload, rng):
+    data = synthetic_title(rng)
+    pool = list(workload.au_ids)
+    created_author = workload.take('created_authors', rng)
+    if created_author is not None:
+        pool.append(created_author)
+    data['authors'] = title_authors(rng, pool, 3)
+
+    def created(payload):
+        workload.add('created_titles', payload['id'])
+    return 'POST', '/api/titles', json.dumps(data), 'application/json', created
+
+def op_update_title(app, workload, rng):
+    title_id = workload.take('created_titles', rng)
+    if title_id is None:
+        return None
+    body = {'price': round(rng.uniform(2, 40), 2), 'ytd_sales': rng.randint(0, 25000)}
+    return 'PUT', f'/api/titles/{title_id}', json.dumps(body), 'application/json', None
+
+def op_delete_title(app, workload, rng):
+    title_id = workload.take('created_titles', rng, remove=True)
+    if title_id is None:
+        return None
+    return 'DELETE', f'/api/titles/{title_id}', None, None, None
+
+def op_bulk_authors(app, workload, rng):
+    body = '\n'.join(json.dumps(synthetic_author(rng)) for _ in range(50))
+    return 'POST', '/api/authors/bulk', body, 'application/x-ndjson', None
+
+def op_bulk_titles(app, workload, rng):
+    rows = []
+    for _ in range(50):
+        data = synthetic_title(rng)
+        data['authors'] = title_authors(rng, workload.au_ids, 3)
+        rows.append(json.dumps(data))
+    return 'POST', '/api/titles/bulk', '\n'.join(rows), 'application/x-ndjson', None
+
+OPERATIONS = {
+    'list_authors': op_list_authors,
+    'get_author': op_get_author,
+    'author_profile': op_author_profile,
+    'list_titles': op_list_titles,
+    'list_titles_sparse': op_list_titles_sparse,
+    'get_title': op_get_title,
+    'titles_by_author': op_titles_by_author,
+    'search': op_search,
+    'author_stats': op_author_stats,
+    'author_stat': op_author_stat,
+    'export_recent': op_export_recent,
+    'export_authors': op_export_authors,
+    'changes': op_changes,
+    'health': op_health,
+    'ready': op_ready,
+    'metrics': op_metrics,
+    'admin_cache': op_admin_cache,
+    'index_report': op_index_report,
+    'admin_compression': op_admin_compression,
+    'slow_ops': op_slow_ops,
+    'create_author': op_create_author,
+    'update_author': op_update_author,
+    'delete_author': op_delete_author,
+    'create_title': op_create_title,
+    'update_title': op_update_title,
+    'delete_title': op_delete_title,
+    'bulk_authors': op_bulk_authors,
+    'bulk_titles': op_bulk_titles,
+}
+
+# Roughly 85% reads, weighted towards the screens the UI loads most
+DEFAULT_MIX = {
+    'list_authors': 8, 'get_author': 10, 'author_profile': 8,
+    'list_titles': 10, 'list_titles_sparse': 4, 'get_title': 12, 'titles_by_author': 12,
+    'search': 10, 'author_stats': 3, 'author_stat': 4, 'export_recent': 1, 'export_authors': 1,
+    'changes': 2, 'health': 1, 'ready': 1, 'metrics': 1,
+    'admin_cache': 1, 'index_report': 0, 'admin_compression': 0.5, 'slow_ops': 0.5,
+    'create_author': 3, 'update_author': 2, 'delete_author': 1,
+    'create_title': 4, 'update_title': 3, 'delete_title': 2, 'bulk_authors': 1, 'bulk_titles': 1,
+}
+
+def parse_mix(text):
+    """Parse name=weight,... on top of DEFAULT_MIX"""
+    mix = dict(DEFAULT_MIX)
+    for part in filter(None, (text or '').split(',')):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}'. Allowed: {', '.join(OPERATIONS)}")
+        mix[name] = float(weight)
+    if not any(weight > 0 for weight in mix.values()):
+        raise ValueError('The mix has no operation with a positive weight')
+    return mix
+
+# ==================== TRANSPORTS ====================
+
+class HttpTransport:
+    """One keep-alive HTTP connection per client thread"""
+
+    def __init__(self, target):
+        parts = urlsplit(target)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self._connect = lambda: connection_class(parts.hostname, parts.port, timeout=60)
+        self._prefix = parts.path.rstrip('/')
+        self._connection = self._connect()
+
+    def request(self, method, path, body, content_type):
+        headers = {'Accept-Encoding': 'gzip'}
+        if content_type:
+            headers['Content-Type'] = content_type
+        try:
+            self._connection.request(method, self._prefix + path, body=body, headers=headers)
+            response = self._connection.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            self._connection.close()
+            self._connection = self._connect()
+            raise
+        return response.status, data, response.getheader('Content-Encoding')
+
+class InProcessTransport:
+    """Calls the Flask app directly through its test client, without a server"""
+
+    def __init__(self, app):
+        self._client = app.app.test_client()
+
+    def request(self, method, path, body, content_type):
+        response = self._client.open(
+            path, method=method, data=body, content_type=content_type, headers={'Accept-Encoding': 'gzip'}
+        )
+        data = response.get_data()
+        response.close()
+        return response.status_code, data, response.headers.get('Content-Encoding')
+
+def parse_payload(data, encoding):
+    if encoding == 'gzip':
+        import gzip
+        data = gzip.decompress(data)
+    return json.loads(data)
+
+# ==================== RUNNER ====================
+
+def run_client(app, transport, workload, mix, seed, deadline, warmup_until, samples):
+    """Issue requests until the deadline, appending (operation, status, seconds) after warm-up"""
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        planned = OPERATIONS[name](app, workload, rng)
+        if planned is None:
+            # Nothing created yet to update or delete; create something instead
+            name = 'create_title' if 'title' in name else 'create_author'
+            planned = OPERATIONS[name](app, workload, rng)
+        method, path, body, content_type, on_success = planned
+
+        started = time.perf_counter()
+        try:
+            status, data, encoding = transport.request(method, path, body, content_type)
+        except Exception:
+            status, data, encoding = 0, b'', None
+        seconds = time.perf_counter() - started
+
+        if on_success is not None and status == 200:
+            try:
+                on_success(parse_payload(data, encoding))
+            except ValueError:
+                pass
+        if started >= warmup_until:
+            samples.append((name, status, seconds))
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def summarize(samples, seconds):
+    """Throughput and latency percentiles, overall and per operation"""
+    def summary(rows):
+        latencies = sorted(latency for _, _, latency in rows)
+        errors = sum(1 for _, status, _ in rows if status == 0 or status >= 400)
+        return {
+            'requests': len(rows),
+            'errors': errors,
+            'throughput_rps': round(len(rows) / seconds, 2) if seconds else None,
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else None,
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 3) if latencies else None,
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+            'max_ms': round(latencies[-1] * 1000, 3) if latencies else None,
+        }
+
+    by_operation = {}
+    for sample in samples:
+        by_operation.setdefault(sample[0], []).append(sample)
+    return summary(samples), {name: summary(rows) for name, rows in sorted(by_operation.items())}
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_report(result, baseline=None, file=sys.stderr):
+    """Human-readable table, with deltas against a baseline run when given"""
+    base = (baseline or {}).get('endpoints', {})
+    print(f"\n{'operation':<20} {'req':>7} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+          + ('  Δp95' if base else ''), file=file)
+    rows = list(result['endpoints'].items()) + [('TOTAL', result['totals'])]
+    for name, stats in rows:
+        line = (f"{name:<20} {stats['requests']:>7} {stats['errors']:>5} {stats['throughput_rps'] or 0:>9.1f} "
+                f"{stats['p50_ms'] or 0:>9.2f} {stats['p95_ms'] or 0:>9.2f} {stats['p99_ms'] or 0:>9.2f}")
+        previous = base.get(name) if name != 'TOTAL' else (baseline or {}).get('totals')
+        if previous and previous.get('p95_ms') and stats['p95_ms']:
+            line += f"  {(stats['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100:+.1f}%"
+        print(line, file=file)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Seed a synthetic catalog and load-test the Books Manager API')
+    parser.add_argument('--db', default='BooksBench', help='Database to seed and test (default: BooksBench)')
+    parser.add_argument('--seed-data', action='store_true', help='Insert a synthetic catalog before the run')
+    parser.add_argument('--reset', action='store_true', help='Drop the benchmark collections before seeding')
+    parser.add_argument('--authors', type=int, default=10000, help='Authors to seed (default: 10000)')
+    parser.add_argument('--titles', type=int, default=100000, help='Titles to seed (default: 100000)')
+    parser.add_argument('--max-authors-per-title', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for data and request mix')
+    parser.add_argument('--target', help='Base URL of a running server, e.g. http://localhost:8000')
+    parser.add_argument('--in-process', action='store_true', help='Drive the Flask app without a server')
+    parser.add_argument('--duration', type=float, default=30, help='Measured seconds (default: 30)')
+    parser.add_argument('--warmup', type=float, default=5, help='Seconds before measuring starts (default: 5)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Client threads (default: 8)')
+    parser.add_argument('--mix', help='Operation weights over the default mix, e.g. search=20,index_report=1')
+    parser.add_argument('--sample-size', type=int, default=2000, help='Existing IDs sampled for reads')
+    parser.add_argument('--output', help='Write the JSON result here instead of stdout')
+    parser.add_argument('--baseline', help='Earlier JSON result to compare p95 latencies against')
+    args = parser.parse_args(argv)
+
+    if not args.seed_data and not args.target and not args.in_process:
+        parser.error('nothing to do: pass --seed-data, --target or --in-process')
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    # The app reads DB_NAME at import time
+    os.environ['DB_NAME'] = args.db
+    import app
+    database, _, _ = app.ensure_db()
+
+    seed_seconds = None
+    if args.seed_data:
+        seed_seconds = seed_catalog(
+            app, database, args.authors, args.titles, args.max_authors_per_title, args.seed, reset=args.reset
+        )
+    if not args.target and not args.in_process:
+        return 0
+
+    au_ids = sample_ids(database, 'authors', 'au_id', args.sample_size)
+    title_ids = sample_ids(database, 'titles', 'title_id', args.sample_size)
+    if not au_ids or not title_ids:
+        print(f"❌ {args.db} has no authors or titles; run with --seed-data first", file=sys.stderr)
+        return 1
+    workload = Workload(au_ids, title_ids, SURNAMES)
+
+    print(f"🚀 {args.concurrency} clients for {args.warmup:g}s warm-up + {args.duration:g}s against "
+          f"{args.target or 'the in-process app'}", file=sys.stderr)
+    samples = []
+    warmup_until = time.perf_counter() + args.warmup
+    deadline = warmup_until + args.duration
+    threads = []
+    for index in range(args.concurrency):
+        transport = HttpTransport(args.target) if args.target else InProcessTransport(app)
+        thread = threading.Thread(
+            target=run_client,
+            args=(app, transport, workload, mix, args.seed + index, deadline, warmup_until, samples),
+            daemon=True
+        )
+        threads.append(thread)
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    totals, endpoints = summarize(samples, args.duration)
+    result = {
+        'meta': {
+            'started_at': workload.started_at.isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'target': args.target or 'in-process',
+            'database': args.db,
+            'dataset': {
+                'authors': database['authors'].estimated_document_count(),
+                'titles': database['titles'].estimated_document_count(),
+                'seeded': args.seed_data,
+                'seed_seconds': round(seed_seconds, 1) if seed_seconds is not None else None,
+                'max_authors_per_title': args.max_authors_per_title,
+            },
+            'seed': args.seed,
+            'concurrency': args.concurrency,
+            'duration_s': args.duration,
+            'warmup_s': args.warmup,
+            'mix': mix,
+        },
+        'totals': totals,
+        'endpoints': endpoints,
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+        print(f"\n✅ Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
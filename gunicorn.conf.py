@@ -0,0 +1,19 @@
+"""Gunicorn settings for the Books Manager API, read automatically by
+
+    gunicorn app:app
+
+Importing app.py opens no connections, so the master holds no MongoDB client to
+leak into forked workers (also with preload_app). Each worker creates its own
+client and warms it up in the background as soon as it has loaded the app, so
+boot and scale-out never wait on a database round trip; /api/ready turns 200
+once the worker can serve. The warm-up thread then keeps a heartbeat that the
+health and readiness probes answer from.
+"""
+import sys
+
+
+def post_worker_init(worker):
+    """Start the worker's warm-up before it accepts its first request"""
+    app_module = sys.modules.get('app')
+    if app_module is not None:
+        app_module.worker_health.start()
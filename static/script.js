@@ -24,10 +24,27 @@ function showError(error) {
     showToast(error.message || 'An error occurred', 'error');
 }
 
+// Last ETag and body seen per GET url, replayed when the server answers 304
+const etagCache = new Map();
+
 // Safe fetch helper: returns {ok, status, data, text}
-async function safeFetchJson(url, opts) {
+async function safeFetchJson(url, opts = {}) {
+    const method = (opts.method || 'GET').toUpperCase();
+    const cached = method === 'GET' ? etagCache.get(url) : null;
+    if (cached) {
+        opts = { ...opts, headers: { ...(opts.headers || {}), 'If-None-Match': cached.etag } };
+    }
+
     const res = await fetch(url, opts);
+    if (res.status === 304 && cached) {
+        return { ok: true, status: 200, data: JSON.parse(cached.text), text: cached.text };
+    }
+
     const text = await res.text();
+    const etag = res.headers.get('ETag');
+    if (method === 'GET' && res.ok && etag) {
+        etagCache.set(url, { etag, text });
+    }
     let data = null;
     try {
         data = text ? JSON.parse(text) : null;
@@ -37,6 +54,23 @@ async function safeFetchJson(url, opts) {
     return { ok: res.ok, status: res.status, data, text };
 }
 
+// Page through a keyset-paginated list endpoint and return every row
+async function fetchAllPages(path, extraParams = {}, pageSize = 500) {
+    let rows = [];
+    let cursor = null;
+    do {
+        const params = new URLSearchParams({ ...extraParams, limit: pageSize });
+        if (cursor) params.set('after', cursor);
+        const { data } = await safeFetchJson(`${path}?${params}`);
+        if (!data || !data.success) {
+            return data;
+        }
+        rows = rows.concat(data.data);
+        cursor = data.next_cursor;
+    } while (cursor);
+    return { success: true, data: rows };
+}
+
 // ----------------- Locale helpers (Indian formats) -----------------
 function formatCurrencyINR(value) {
     if (value === null || value === undefined || value === '') return '';
@@ -89,8 +123,7 @@ document.querySelectorAll('.tab-btn').forEach(btn => {
 
 async function loadAuthors() {
     try {
-        const response = await fetch(`${API_BASE}/authors`);
-        const data = await response.json();
+        const data = await fetchAllPages(`${API_BASE}/authors`);
         
         if (data.success) {
             authors = data.data;
@@ -212,8 +245,7 @@ document.getElementById('authorForm').addEventListener('submit', async (e) => {
         if (data.success) {
             showToast('Author added successfully!');
             resetAuthorForm();
-            await loadAuthors();
-            await loadTitles();
+            await syncChanges();
         } else {
             showError(new Error(data.error));
         }
@@ -249,8 +281,7 @@ document.getElementById('updateAuthorBtn').addEventListener('click', async () =>
         if (data.success) {
             showToast('Author updated successfully!');
             resetAuthorForm();
-            await loadAuthors();
-            await loadTitles();
+            await syncChanges();
         } else {
             showError(new Error(data.error));
         }
@@ -277,8 +308,7 @@ document.getElementById('deleteAuthorBtn').addEventListener('click', async () =>
         if (data.success) {
             showToast(data.message);
             resetAuthorForm();
-            await loadAuthors();
-            await loadTitles();
+            await syncChanges();
         } else {
             showError(new Error(data.error));
         }
@@ -294,8 +324,10 @@ document.getElementById('cancelAuthorBtn').addEventListener('click', resetAuthor
 
 async function loadTitles() {
     try {
-        const response = await fetch(`${API_BASE}/titles`);
-        const data = await response.json();
+        // The list only shows these; the edit form loads the full title on click
+        const data = await fetchAllPages(`${API_BASE}/titles`, {
+            fields: 'title_id,title,type,price,authors.au_name,authors.au_fname'
+        });
         
         if (data.success) {
             titles = data.data;
@@ -365,8 +397,7 @@ async function selectTitle(titleId) {
     currentTitleId = titleId;
     
     try {
-        const response = await fetch(`${API_BASE}/titles/${titleId}`);
-        const data = await response.json();
+        const { data } = await safeFetchJson(`${API_BASE}/titles/${titleId}`);
         
         if (data.success) {
             const title = data.data;
@@ -507,7 +538,7 @@ document.getElementById('addTitleForm').addEventListener('submit', async (e) =>
         if (data.success) {
             showToast('Title added successfully!');
             document.getElementById('addTitleForm').reset();
-            await loadTitles();
+            await syncChanges();
         } else {
             showError(new Error(data.error));
         }
@@ -569,7 +600,7 @@ document.getElementById('editTitleForm').addEventListener('submit', async (e) =>
         
         if (data.success) {
             showToast('Title updated successfully!');
-            await loadTitles();
+            await syncChanges();
             await selectTitle(currentTitleId); // Refresh the form
         } else {
             showError(new Error(data.error));
@@ -599,7 +630,7 @@ document.getElementById('deleteTitleBtn').addEventListener('click', async () =>
             currentTitleId = null;
             document.getElementById('editTitleSection').style.display = 'block';
             document.getElementById('editTitleForm').style.display = 'none';
-            await loadTitles();
+            await syncChanges();
         } else {
             showError(new Error(data.error));
         }
@@ -619,16 +650,11 @@ document.getElementById('viewTitlesBtn').addEventListener('click', async () => {
     }
     
     try {
-        const [titlesResponse, authorResponse] = await Promise.all([
-            fetch(`${API_BASE}/titles/by-author/${authorId}`),
-            fetch(`${API_BASE}/authors/${authorId}`)
-        ]);
+        // Author, titles and stats come back from one request
+        const { data } = await safeFetchJson(`${API_BASE}/authors/${authorId}/profile`);
         
-        const titlesData = await titlesResponse.json();
-        const authorData = await authorResponse.json();
-        
-        if (titlesData.success && authorData.success) {
-            const author = authorData.data;
+        if (data.success) {
+            const { author, titles, stats } = data.data;
             const fullName = `${author.au_fname || ''} ${author.au_name}`.trim();
             
             // Update author information
@@ -648,24 +674,14 @@ document.getElementById('viewTitlesBtn').addEventListener('click', async () => {
             const locationText = document.getElementById('authorLocationText');
             locationText.textContent = locationParts.length > 0 ? locationParts.join(', ') : 'Location not specified';
             
-            // Update stats
-            document.getElementById('totalTitles').textContent = titlesData.data.length;
-            
-            // Calculate average royalty if there are titles
-            if (titlesData.data.length > 0) {
-                const totalRoyalty = titlesData.data.reduce((sum, title) => {
-                    return sum + (parseFloat(title.royaltyper) || 0);
-                }, 0);
-                const avgRoyalty = (totalRoyalty / titlesData.data.length).toFixed(1);
-                document.getElementById('authorRoyalty').textContent = avgRoyalty;
-            } else {
-                document.getElementById('authorRoyalty').textContent = '0';
-            }
+            // Update stats (computed on the server)
+            document.getElementById('totalTitles').textContent = stats.titles;
+            document.getElementById('authorRoyalty').textContent = stats.titles > 0 ? stats.royaltyper_avg.toFixed(1) : '0';
             
             // Update titles table
             const tbody = document.getElementById('titlesTableBody');
             
-            if (titlesData.data.length === 0) {
+            if (titles.length === 0) {
                 tbody.innerHTML = `
                     <tr>
                         <td colspan="6" style="text-align: center; padding: 40px;">
@@ -675,7 +691,7 @@ document.getElementById('viewTitlesBtn').addEventListener('click', async () => {
                     </tr>
                 `;
             } else {
-                tbody.innerHTML = titlesData.data.map(title => `
+                tbody.innerHTML = titles.map(title => `
                     <tr>
                         <td>${title.title_id}</td>
                         <td>${title.title}</td>
@@ -699,12 +715,60 @@ document.getElementById('viewTitlesBtn').addEventListener('click', async () => {
     }
 });
 
+// ==================== DELTA SYNC ====================
+
+// Token of the state the lists were loaded at; after a write only what changed since is fetched
+let syncToken = null;
+
+// Replace rows by key with their new versions and drop deleted keys, keeping the list sorted by key
+function applyDiff(rows, key, upserts, deletedKeys) {
+    const byKey = new Map(rows.map(row => [row[key], row]));
+    deletedKeys.forEach(k => byKey.delete(k));
+    upserts.forEach(row => byKey.set(row[key], row));
+    return [...byKey.values()].sort((a, b) => (a[key] < b[key] ? -1 : a[key] > b[key] ? 1 : 0));
+}
+
+// Load both lists from scratch; the token is taken first so no write in between is missed
+async function reloadAll() {
+    const { data } = await safeFetchJson(`${API_BASE}/changes`);
+    syncToken = data && data.success ? data.next_since : null;
+    await loadAuthors();
+    await loadTitles();
+}
+
+// Bring both lists up to date after a write
+async function syncChanges() {
+    try {
+        if (!syncToken) {
+            await reloadAll();
+            return;
+        }
+        const { data } = await safeFetchJson(`${API_BASE}/changes?since=${encodeURIComponent(syncToken)}`);
+        if (!data || !data.success || data.reset) {
+            await reloadAll();
+            return;
+        }
+        syncToken = data.next_since;
+        const changes = data.data;
+        if (changes.authors.length || changes.deleted.authors.length) {
+            authors = applyDiff(authors, 'au_id', changes.authors, changes.deleted.authors);
+            renderAuthorsList();
+            populateAuthorSelects();
+        }
+        if (changes.titles.length || changes.deleted.titles.length) {
+            titles = applyDiff(titles, 'title_id', changes.titles, changes.deleted.titles);
+            renderTitlesList();
+        }
+    } catch (error) {
+        showError(error);
+    }
+}
+
 // ==================== INITIALIZATION ====================
 
 async function init() {
     try {
-        await loadAuthors();
-        await loadTitles();
+        await reloadAll();
         showToast('Application loaded successfully!');
     } catch (error) {
         showError(error);
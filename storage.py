@@ -0,0 +1,707 @@
+"""Storage backends for the catalog endpoints of app.py.
+
+The author and title handlers talk to a CatalogStore instead of the MongoDB
+collections directly. app.MongoCatalogStore is the default and runs on MongoDB
+Atlas. SQLiteCatalogStore is an embedded engine that serves the same contract
+from a local file, with no database server and no network hop:
+
+    STORAGE_BACKEND=sqlite SQLITE_PATH=books.db gunicorn app:app
+
+Documents go in and come out in the shape the Mongo collections use (titles
+carry an ``authors`` array with each author's name, timestamps are naive UTC
+datetimes), so the handlers, serializers, cache and ETags work unchanged.
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+
+# Counter that numbers catalog writes for the SQLite changes feed
+CHANGES_SEQUENCE = 'changes'
+
+
+class CatalogStore:
+    """Operations the catalog handlers need from a storage backend.
+
+    The changes feed works on positions: opaque strings, each backend its own
+    format, after which changes_since picks up every committed write. Deletes
+    leave a tombstone so the feed can report them.
+
+    ``projection`` arguments are MongoDB-style projections (``{'field': 1}``
+    to include, ``{'field': 0}`` to exclude, ``authors.<field>`` paths into the
+    authors array); ``_id`` is returned unless the projection excludes it.
+    """
+
+    name = None
+
+    def ping(self):
+        """Raise if the backend cannot serve requests"""
+        raise NotImplementedError
+
+    def warm_up(self):
+        """Prepare a freshly started worker (connections, schema); runs off the request path"""
+        self.ping()
+
+    def lease_ids(self, sequence, size):
+        """Reserve ``size`` numbers of a sequence atomically and return the end of the block"""
+        raise NotImplementedError
+
+    def bump_versions(self, *collections, session=None):
+        """Increment the version of each named collection"""
+        raise NotImplementedError
+
+    def collection_versions(self, *collections):
+        """Current version of each named collection, 0 when never written"""
+        raise NotImplementedError
+
+    def refresh_author_stats(self, au_ids):
+        """Bring derived author statistics up to date after titles of au_ids changed"""
+        raise NotImplementedError
+
+    # Authors
+
+    def find_authors(self, after, limit, projection):
+        """Up to ``limit`` authors with au_id > after (all when after is None), by au_id"""
+        raise NotImplementedError
+
+    def iter_authors(self, projection):
+        """Every author by au_id, read in batches"""
+        raise NotImplementedError
+
+    def get_author(self, au_id, projection):
+        raise NotImplementedError
+
+    def fetch_authors(self, au_ids):
+        """au_id -> {au_id, au_name, au_fname} for the given authors that exist"""
+        raise NotImplementedError
+
+    def insert_author(self, author, generate_id):
+        """Insert under a fresh au_id from generate_id (set on the document); return the storage ID"""
+        raise NotImplementedError
+
+    def update_author(self, au_id, updates):
+        """Apply updates; renames reach every title of the author. Returns False if there is no such author.
+
+        Bumps the versions of the collections it changed in the same transaction.
+        """
+        raise NotImplementedError
+
+    def author_title_counts(self, au_id):
+        """(linked, orphaned) title counts for a delete dry run, or None if there is no such author"""
+        raise NotImplementedError
+
+    def author_profile(self, au_id):
+        """The author, their titles and their statistics, or None if there is no such author.
+
+        Returns {'author': document, 'titles': [...], 'stats': {...}}: titles by title_id with
+        only this author's entry in ``authors``, and stats with the fields of an author_stats
+        document (empty when the author has no titles).
+        """
+        raise NotImplementedError
+
+    def delete_author(self, au_id):
+        """Delete the author, the titles only they wrote and their co-author entries.
+
+        Returns (titles_deleted, titles_updated), or None if there is no such author.
+        Bumps the authors and titles versions and records tombstones for the author and
+        the deleted titles in the same transaction.
+        """
+        raise NotImplementedError
+
+    # Titles
+
+    def find_titles(self, after, limit, projection):
+        raise NotImplementedError
+
+    def iter_titles(self, projection):
+        raise NotImplementedError
+
+    def get_title(self, title_id, projection):
+        raise NotImplementedError
+
+    def titles_by_author(self, au_id):
+        """The author's titles by title_id, each with only that author's entry in ``authors``"""
+        raise NotImplementedError
+
+    def insert_title(self, title, generate_id):
+        raise NotImplementedError
+
+    def update_title(self, title_id, updates):
+        """Apply updates and return the title as it was before (with its authors' au_id), or None"""
+        raise NotImplementedError
+
+    def delete_title(self, title_id):
+        """Delete the title, record its tombstone and return it (with its authors' au_id), or None"""
+        raise NotImplementedError
+
+    # Changes
+
+    def change_position(self):
+        """The position of the latest committed write"""
+        raise NotImplementedError
+
+    def changes_since(self, position, limit, author_projection, title_projection):
+        """Everything written after ``position``.
+
+        Returns (position, authors, titles, deletions): the position the read reached, the
+        authors and titles written since (as they are now) and the (collection, key) of
+        every tombstone recorded since. Returns None when the client must reload instead:
+        the position is older than the backend keeps changes for, comes from another
+        format, or more than ``limit`` of any kind changed. Raises ValueError for a
+        malformed position.
+        """
+        raise NotImplementedError
+
+
+def apply_projection(document, projection):
+    """Apply a MongoDB-style inclusion or exclusion projection to a plain document"""
+    if not projection:
+        return document
+    include = {path: flag for path, flag in projection.items() if path != '_id'}
+    keep_id = projection.get('_id', 1)
+    if include and all(include.values()):
+        result = {}
+        author_fields = [path.split('.', 1)[1] for path in include if path.startswith('authors.')]
+        for path in include:
+            if '.' not in path and path in document:
+                result[path] = document[path]
+        if author_fields and 'authors' in document:
+            result['authors'] = [
+                {field: author[field] for field in author_fields if field in author}
+                for author in document['authors']
+            ]
+    else:
+        result = {key: value for key, value in document.items() if key not in include}
+    if keep_id and '_id' in document:
+        result['_id'] = document['_id']
+    else:
+        result.pop('_id', None)
+    return result
+
+
+def to_utc_naive(value):
+    """Datetimes are stored like MongoDB returns them: naive UTC"""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def author_stats(titles):
+    """Statistics of one author over their titles, as app.author_stats_group computes them.
+
+    Each title carries only that author's entry in ``authors``; empty when there are no titles.
+    """
+    if not titles:
+        return {}
+    shares = [(title['authors'][0].get('royaltyper') or 0) if title['authors'] else 0 for title in titles]
+    return {
+        'titles': len(titles),
+        'royaltyper_total': sum(shares),
+        'royaltyper_avg': sum(shares) / len(titles),
+        'ytd_sales': sum(title.get('ytd_sales') or 0 for title in titles),
+        'revenue': sum(
+            (title.get('price') or 0) * (title.get('ytd_sales') or 0) * share / 100
+            for title, share in zip(titles, shares)
+        )
+    }
+
+
+PROFILE_TITLE_PROJECTION = {
+    'title_id': 1, 'title': 1, 'type': 1, 'price': 1, 'pubdate': 1, 'authors.au_id': 1,
+    'authors.au_name': 1, 'authors.au_fname': 1, 'authors.au_ord': 1, 'authors.royaltyper': 1
+}
+
+AUTHOR_COLUMNS = (
+    'au_id', 'au_name', 'au_fname', 'phone', 'address', 'city', 'state', 'zip', 'contract', 'updated_at', 'change_seq'
+)
+TITLE_COLUMNS = (
+    'title_id', 'title', 'type', 'pub_id', 'price', 'advance', 'royalty', 'ytd_sales', 'notes', 'pubdate', 'updated_at',
+    'change_seq'
+)
+DATETIME_COLUMNS = ('pubdate', 'updated_at', 'deleted_at')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS authors (
+    id INTEGER PRIMARY KEY,
+    au_id TEXT NOT NULL UNIQUE,
+    au_name TEXT NOT NULL,
+    au_fname TEXT,
+    phone TEXT,
+    address TEXT,
+    city TEXT,
+    state TEXT,
+    zip TEXT,
+    contract INTEGER,
+    updated_at TEXT,
+    change_seq INTEGER
+);
+CREATE TABLE IF NOT EXISTS titles (
+    id INTEGER PRIMARY KEY,
+    title_id TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    type TEXT,
+    pub_id TEXT,
+    price REAL,
+    advance REAL,
+    royalty INTEGER,
+    ytd_sales INTEGER,
+    notes TEXT,
+    pubdate TEXT,
+    updated_at TEXT,
+    change_seq INTEGER
+);
+CREATE TABLE IF NOT EXISTS title_authors (
+    title_id TEXT NOT NULL REFERENCES titles (title_id) ON DELETE CASCADE,
+    au_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    au_ord INTEGER,
+    royaltyper INTEGER,
+    PRIMARY KEY (title_id, au_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS title_authors_au_id ON title_authors (au_id, title_id);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, seq INTEGER NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS versions (name TEXT PRIMARY KEY, v INTEGER NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tombstones (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    deleted_at TEXT NOT NULL,
+    change_seq INTEGER
+);
+CREATE INDEX IF NOT EXISTS tombstones_deleted_at ON tombstones (deleted_at);
+"""
+
+# Files created before the changes feed was numbered lack change_seq; the
+# columns are added on open and the indexes built once they exist
+CHANGE_SEQ_TABLES = ('authors', 'titles', 'tombstones')
+
+
+class SQLiteCatalogStore(CatalogStore):
+    """Embedded catalog store on one SQLite file.
+
+    Titles and their authors are normalized into titles + title_authors, and
+    author names are joined in on read, so a rename is a single-row update.
+    Every lookup the handlers make is served by a primary key or index. Each
+    thread gets its own connection; the file runs in WAL mode so readers never
+    wait for the writer.
+
+    Every author and title write, and every tombstone, is stamped with
+    ``change_seq`` from the CHANGES_SEQUENCE counter. Writers already queue on the
+    file's write lock, so numbers commit in order at no extra cost, and a position
+    is the latest number plus the time it was handed out.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path, batch_size=500, tombstone_retention=7 * 24 * 3600):
+        self.path = path
+        self.batch_size = batch_size
+        self.tombstone_retention = tombstone_retention
+        self._local = threading.local()
+        # executescript manages its own transaction
+        self._connection().executescript(SCHEMA)
+        self._add_change_seq()
+
+    def _connection(self):
+        # A forked worker must not share its parent's connection
+        if getattr(self._local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, isolation_level=None, timeout=30)
+            connection.row_factory = sqlite3.Row
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute('PRAGMA foreign_keys=ON')
+            connection.execute('PRAGMA cache_size=-65536')      # 64 MB page cache
+            connection.execute('PRAGMA mmap_size=268435456')    # 256 MB memory-mapped reads
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return self._local.connection
+
+    def _add_change_seq(self):
+        with self._write() as connection:
+            for table in CHANGE_SEQ_TABLES:
+                columns = {row['name'] for row in connection.execute(f'PRAGMA table_info({table})')}
+                if 'change_seq' not in columns:
+                    connection.execute(f'ALTER TABLE {table} ADD COLUMN change_seq INTEGER')
+                connection.execute(f'CREATE INDEX IF NOT EXISTS {table}_change_seq ON {table} (change_seq)')
+            connection.execute('DROP INDEX IF EXISTS authors_updated_at')
+            connection.execute('DROP INDEX IF EXISTS titles_updated_at')
+
+    @contextmanager
+    def _write(self):
+        """One write transaction; BEGIN IMMEDIATE takes the write lock up front"""
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    @staticmethod
+    def _value(column, value):
+        if column in DATETIME_COLUMNS and isinstance(value, datetime):
+            return to_utc_naive(value).isoformat()
+        if column == 'contract' and value is not None:
+            return int(bool(value))
+        return value
+
+    @staticmethod
+    def _document(row):
+        # The rowid stands in for the ObjectId and serializes the same way, as a string
+        document = {'_id': str(row['id'])}
+        for column in row.keys():
+            if column == 'id':
+                continue
+            value = row[column]
+            if column in DATETIME_COLUMNS and value is not None:
+                value = datetime.fromisoformat(value)
+            elif column == 'contract' and value is not None:
+                value = bool(value)
+            document[column] = value
+        return document
+
+    def ping(self):
+        self._connection().execute('SELECT 1')
+
+    @staticmethod
+    def _lease(connection, sequence, size):
+        connection.execute(
+            'INSERT INTO counters (name, seq) VALUES (?, ?) '
+            'ON CONFLICT (name) DO UPDATE SET seq = seq + excluded.seq',
+            (sequence, size)
+        )
+        return connection.execute('SELECT seq FROM counters WHERE name = ?', (sequence,)).fetchone()[0]
+
+    def lease_ids(self, sequence, size):
+        with self._write() as connection:
+            return self._lease(connection, sequence, size)
+
+    def _next_change_seq(self, connection):
+        # Writers hold the write lock until they commit, so numbers commit in order
+        return self._lease(connection, CHANGES_SEQUENCE, 1)
+
+    @staticmethod
+    def _bump(connection, collections):
+        connection.executemany(
+            'INSERT INTO versions (name, v) VALUES (?, 1) ON CONFLICT (name) DO UPDATE SET v = v + 1',
+            [(name,) for name in collections]
+        )
+
+    def bump_versions(self, *collections, session=None):
+        with self._write() as connection:
+            self._bump(connection, collections)
+
+    def collection_versions(self, *collections):
+        placeholders = ','.join('?' * len(collections))
+        found = dict(self._connection().execute(
+            f'SELECT name, v FROM versions WHERE name IN ({placeholders})', collections
+        ).fetchall())
+        return tuple(found.get(name, 0) for name in collections)
+
+    def refresh_author_stats(self, au_ids):
+        pass  # nothing is materialized; there is no author_stats table to keep current
+
+    # Authors
+
+    def find_authors(self, after, limit, projection):
+        if after is None:
+            rows = self._connection().execute('SELECT * FROM authors ORDER BY au_id LIMIT ?', (limit,))
+        else:
+            rows = self._connection().execute(
+                'SELECT * FROM authors WHERE au_id > ? ORDER BY au_id LIMIT ?', (after, limit)
+            )
+        return [apply_projection(self._document(row), projection) for row in rows.fetchall()]
+
+    def iter_authors(self, projection):
+        after = None
+        while True:
+            batch = self.find_authors(after, self.batch_size, None)
+            for author in batch:
+                yield apply_projection(author, projection)
+            if len(batch) < self.batch_size:
+                return
+            after = batch[-1]['au_id']
+
+    def get_author(self, au_id, projection):
+        row = self._connection().execute('SELECT * FROM authors WHERE au_id = ?', (au_id,)).fetchone()
+        return apply_projection(self._document(row), projection) if row else None
+
+    def fetch_authors(self, au_ids):
+        au_ids = list(set(au_ids))
+        if not au_ids:
+            return {}
+        placeholders = ','.join('?' * len(au_ids))
+        rows = self._connection().execute(
+            f'SELECT au_id, au_name, au_fname FROM authors WHERE au_id IN ({placeholders})', au_ids
+        )
+        return {row['au_id']: dict(row) for row in rows.fetchall()}
+
+    def _insert(self, table, columns, document, id_field, generate_id, write_children=None, retries=5):
+        """Insert under a freshly generated ID, moving on to the next ID if it is taken"""
+        for _ in range(retries):
+            document[id_field] = generate_id()
+            try:
+                with self._write() as connection:
+                    document['change_seq'] = self._next_change_seq(connection)
+                    cursor = connection.execute(
+                        f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})',
+                        [self._value(column, document.get(column)) for column in columns]
+                    )
+                    if write_children is not None:
+                        write_children(connection, document)
+                    return cursor.lastrowid
+            except sqlite3.IntegrityError as e:
+                if f'{table}.{id_field}' not in str(e):
+                    raise
+        raise RuntimeError(f'Could not allocate a unique {id_field}')
+
+    def insert_author(self, author, generate_id):
+        return self._insert('authors', AUTHOR_COLUMNS, author, 'au_id', generate_id)
+
+    def update_author(self, au_id, updates):
+        columns = [column for column in updates if column in AUTHOR_COLUMNS] + ['change_seq']
+        with self._write() as connection:
+            updates = {**updates, 'change_seq': self._next_change_seq(connection)}
+            cursor = connection.execute(
+                f'UPDATE authors SET {", ".join(f"{column} = ?" for column in columns)} WHERE au_id = ?',
+                [self._value(column, updates[column]) for column in columns] + [au_id]
+            )
+            if cursor.rowcount == 0:
+                return False
+            if 'au_name' in updates or 'au_fname' in updates:
+                # Names are joined in on read; only the titles' change time and number move
+                connection.execute(
+                    'UPDATE titles SET updated_at = ?, change_seq = ? WHERE title_id IN '
+                    '(SELECT title_id FROM title_authors WHERE au_id = ?)',
+                    (self._value('updated_at', updates.get('updated_at')), updates['change_seq'], au_id)
+                )
+                self._bump(connection, ('authors', 'titles'))
+            else:
+                self._bump(connection, ('authors',))
+        return True
+
+    # Titles whose only author is au_id; the NOT EXISTS probe uses the (title_id, au_id) key
+    ORPHANED_TITLES = (
+        'SELECT ta.title_id FROM title_authors ta WHERE ta.au_id = ? AND NOT EXISTS '
+        '(SELECT 1 FROM title_authors other WHERE other.title_id = ta.title_id AND other.au_id <> ?)'
+    )
+
+    def author_title_counts(self, au_id):
+        connection = self._connection()
+        if connection.execute('SELECT 1 FROM authors WHERE au_id = ?', (au_id,)).fetchone() is None:
+            return None
+        linked = connection.execute('SELECT COUNT(*) FROM title_authors WHERE au_id = ?', (au_id,)).fetchone()[0]
+        orphaned = connection.execute(f'SELECT COUNT(*) FROM ({self.ORPHANED_TITLES})', (au_id, au_id)).fetchone()[0]
+        return linked, orphaned
+
+    def author_profile(self, au_id):
+        author = self.get_author(au_id, None)
+        if author is None:
+            return None
+        rows = self._connection().execute(
+            'SELECT t.* FROM title_authors ta JOIN titles t ON t.title_id = ta.title_id '
+            'WHERE ta.au_id = ? ORDER BY ta.title_id',
+            (au_id,)
+        ).fetchall()
+        titles = self._with_authors(rows, au_id)
+        return {
+            'author': author,
+            'titles': [apply_projection(title, PROFILE_TITLE_PROJECTION) for title in titles],
+            'stats': author_stats(titles)
+        }
+
+    def delete_author(self, au_id):
+        now = datetime.now(timezone.utc)
+        with self._write() as connection:
+            if connection.execute('DELETE FROM authors WHERE au_id = ?', (au_id,)).rowcount == 0:
+                return None
+            seq = self._next_change_seq(connection)
+            orphaned = [row[0] for row in connection.execute(self.ORPHANED_TITLES, (au_id, au_id)).fetchall()]
+            deleted = connection.execute(
+                f'DELETE FROM titles WHERE title_id IN ({self.ORPHANED_TITLES})', (au_id, au_id)
+            ).rowcount
+            updated = connection.execute(
+                'UPDATE titles SET updated_at = ?, change_seq = ? '
+                'WHERE title_id IN (SELECT title_id FROM title_authors WHERE au_id = ?)',
+                (self._value('updated_at', now), seq, au_id)
+            ).rowcount
+            connection.execute('DELETE FROM title_authors WHERE au_id = ?', (au_id,))
+            self._record_tombstones(connection, now, seq, [('authors', au_id)] + [('titles', key) for key in orphaned])
+            self._bump(connection, ('authors', 'titles'))
+        return deleted, updated
+
+    # Titles
+
+    def _with_authors(self, rows, au_id=None):
+        """Title documents with their authors arrays, fetched with one query for all rows"""
+        titles = [self._document(row) for row in rows]
+        if not titles:
+            return titles
+        by_id = {title['title_id']: title for title in titles}
+        for title in titles:
+            title['authors'] = []
+        placeholders = ','.join('?' * len(by_id))
+        query = (
+            'SELECT ta.title_id, ta.au_id, a.au_name, a.au_fname, ta.au_ord, ta.royaltyper '
+            'FROM title_authors ta LEFT JOIN authors a ON a.au_id = ta.au_id '
+            f'WHERE ta.title_id IN ({placeholders})'
+        )
+        parameters = list(by_id)
+        if au_id is not None:
+            query += ' AND ta.au_id = ?'
+            parameters.append(au_id)
+        for row in self._connection().execute(query + ' ORDER BY ta.title_id, ta.position', parameters):
+            entry = dict(row)
+            by_id[entry.pop('title_id')]['authors'].append(entry)
+        return titles
+
+    def find_titles(self, after, limit, projection):
+        if after is None:
+            rows = self._connection().execute('SELECT * FROM titles ORDER BY title_id LIMIT ?', (limit,))
+        else:
+            rows = self._connection().execute(
+                'SELECT * FROM titles WHERE title_id > ? ORDER BY title_id LIMIT ?', (after, limit)
+            )
+        return [apply_projection(title, projection) for title in self._with_authors(rows.fetchall())]
+
+    def iter_titles(self, projection):
+        after = None
+        while True:
+            batch = self.find_titles(after, self.batch_size, None)
+            for title in batch:
+                yield apply_projection(title, projection)
+            if len(batch) < self.batch_size:
+                return
+            after = batch[-1]['title_id']
+
+    def get_title(self, title_id, projection):
+        rows = self._connection().execute('SELECT * FROM titles WHERE title_id = ?', (title_id,)).fetchall()
+        titles = self._with_authors(rows)
+        return apply_projection(titles[0], projection) if titles else None
+
+    def titles_by_author(self, au_id):
+        rows = self._connection().execute(
+            'SELECT t.* FROM title_authors ta JOIN titles t ON t.title_id = ta.title_id '
+            'WHERE ta.au_id = ? ORDER BY ta.title_id',
+            (au_id,)
+        ).fetchall()
+        return [apply_projection(title, PROFILE_TITLE_PROJECTION) for title in self._with_authors(rows, au_id)]
+
+    @staticmethod
+    def _write_title_authors(connection, title_id, authors):
+        connection.execute('DELETE FROM title_authors WHERE title_id = ?', (title_id,))
+        connection.executemany(
+            'INSERT INTO title_authors (title_id, au_id, position, au_ord, royaltyper) VALUES (?, ?, ?, ?, ?)',
+            [
+                (title_id, author['au_id'], position, author.get('au_ord'), author.get('royaltyper'))
+                for position, author in enumerate(authors)
+            ]
+        )
+
+    def insert_title(self, title, generate_id):
+        return self._insert(
+            'titles', TITLE_COLUMNS, title, 'title_id', generate_id,
+            lambda connection, document: self._write_title_authors(
+                connection, document['title_id'], document.get('authors', [])
+            )
+        )
+
+    def _previous_authors(self, connection, title_id):
+        rows = connection.execute('SELECT au_id FROM title_authors WHERE title_id = ? ORDER BY position', (title_id,))
+        return [{'au_id': row['au_id']} for row in rows.fetchall()]
+
+    def update_title(self, title_id, updates):
+        columns = [column for column in updates if column in TITLE_COLUMNS] + ['change_seq']
+        with self._write() as connection:
+            row = connection.execute('SELECT id FROM titles WHERE title_id = ?', (title_id,)).fetchone()
+            if row is None:
+                return None
+            previous = {'_id': str(row['id']), 'authors': self._previous_authors(connection, title_id)}
+            if not updates:
+                return previous
+            updates = {**updates, 'change_seq': self._next_change_seq(connection)}
+            connection.execute(
+                f'UPDATE titles SET {", ".join(f"{column} = ?" for column in columns)} WHERE title_id = ?',
+                [self._value(column, updates[column]) for column in columns] + [title_id]
+            )
+            if 'authors' in updates:
+                self._write_title_authors(connection, title_id, updates['authors'])
+        return previous
+
+    def delete_title(self, title_id):
+        with self._write() as connection:
+            row = connection.execute('SELECT id FROM titles WHERE title_id = ?', (title_id,)).fetchone()
+            if row is None:
+                return None
+            previous = {'_id': str(row['id']), 'authors': self._previous_authors(connection, title_id)}
+            connection.execute('DELETE FROM titles WHERE title_id = ?', (title_id,))
+            self._record_tombstones(
+                connection, datetime.now(timezone.utc), self._next_change_seq(connection), [('titles', title_id)]
+            )
+        return previous
+
+    # Changes
+
+    def _record_tombstones(self, connection, now, seq, entries):
+        """Remember deletions for the changes feed and forget the ones past retention"""
+        connection.executemany(
+            'INSERT INTO tombstones (kind, key, deleted_at, change_seq) VALUES (?, ?, ?, ?)',
+            [(kind, key, self._value('deleted_at', now), seq) for kind, key in entries]
+        )
+        cutoff = to_utc_naive(now) - timedelta(seconds=self.tombstone_retention)
+        connection.execute('DELETE FROM tombstones WHERE deleted_at < ?', (cutoff.isoformat(),))
+
+    def change_seq(self):
+        """The change sequence number of the latest committed write, 0 before the first"""
+        row = self._connection().execute('SELECT seq FROM counters WHERE name = ?', (CHANGES_SEQUENCE,)).fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _position(seq):
+        return f'{seq}@{datetime.now(timezone.utc).isoformat()}'
+
+    def change_position(self):
+        return self._position(self.change_seq())
+
+    def changes_since(self, position, limit, author_projection, title_projection):
+        since, separator, issued_at = position.partition('@')
+        if not separator:
+            return None
+        try:
+            since, issued_at = int(since), datetime.fromisoformat(issued_at.replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError('Invalid since token')
+        if issued_at.tzinfo is None:
+            raise ValueError('Invalid since token')
+        # A minute's margin absorbs clock skew between this server and the tombstones' expiry
+        if datetime.now(timezone.utc) - issued_at > timedelta(seconds=self.tombstone_retention - 60):
+            return None
+
+        connection = self._connection()
+        # One read transaction: every query sees the same snapshot of the WAL
+        connection.execute('BEGIN')
+        try:
+            seq = self.change_seq()
+            authors = connection.execute(
+                'SELECT * FROM authors WHERE change_seq > ? ORDER BY change_seq LIMIT ?', (since, limit + 1)
+            ).fetchall()
+            titles = connection.execute(
+                'SELECT * FROM titles WHERE change_seq > ? ORDER BY change_seq LIMIT ?', (since, limit + 1)
+            ).fetchall()
+            deletions = connection.execute(
+                'SELECT kind, key FROM tombstones WHERE change_seq > ? ORDER BY change_seq LIMIT ?', (since, limit + 1)
+            ).fetchall()
+            if max(len(authors), len(titles), len(deletions)) > limit:
+                return None
+            titles = self._with_authors(titles)
+        finally:
+            connection.execute('COMMIT')
+        return (
+            self._position(seq),
+            [apply_projection(self._document(row), author_projection) for row in authors],
+            [apply_projection(title, title_projection) for title in titles],
+            [(row['kind'], row['key']) for row in deletions]
+        )
@@ -0,0 +1,30 @@
+"""Shared fixtures. The tests run on the embedded SQLite backend, so no database server is needed."""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# app.py reads its settings at import time
+os.environ['STORAGE_BACKEND'] = 'sqlite'
+os.environ['SQLITE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='books-tests-'), 'books.db')
+os.environ['SHARED_VERSIONS_PATH'] = ''
+
+import pytest
+
+import app as app_module
+from storage import SQLiteCatalogStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteCatalogStore(str(tmp_path / 'books.db'), batch_size=2)
+
+
+@pytest.fixture
+def client(store, monkeypatch):
+    """Flask test client on a fresh catalog with an empty read cache"""
+    monkeypatch.setattr(app_module, 'store', store)
+    app_module.read_cache.clear()
+    return app_module.app.test_client()
@@ -0,0 +1,27 @@
+"""Parsing and chunking of NDJSON bulk imports"""
+import io
+
+from app import chunked, read_ndjson
+
+
+def test_read_ndjson_reports_bad_lines_by_number():
+    stream = io.BytesIO(b'{"au_name": "Smith"}\n\n  \n{bad json\n[1, 2]\n{"au_name": "Jones"}')
+    rows = list(read_ndjson(stream))
+    assert [(line, record) for line, record, error in rows if error is None] == [
+        (1, {'au_name': 'Smith'}), (6, {'au_name': 'Jones'})
+    ]
+    errors = {line: error for line, _, error in rows if error}
+    assert errors[4].startswith('Invalid JSON')
+    assert errors[5] == 'Each line must be a JSON object'
+    assert len(rows) == 4
+
+
+def test_read_ndjson_handles_utf8_and_crlf():
+    rows = list(read_ndjson(io.BytesIO('{"city": "Zürich"}\r\n'.encode('utf-8'))))
+    assert rows == [(1, {'city': 'Zürich'}, None)]
+
+
+def test_chunked():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked(range(4), 2)) == [[0, 1], [2, 3]]
+    assert list(chunked([], 3)) == []
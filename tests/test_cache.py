@@ -0,0 +1,69 @@
+"""ResponseCache: LRU order, TTL, the memory cap and tag invalidation"""
+from app import ResponseCache
+
+
+def test_hit_and_miss():
+    cache = ResponseCache(max_bytes=1024, max_entries=4, ttl=60)
+    assert cache.get('a') is None
+    cache.set('a', b'body', ['authors'])
+    assert cache.get('a') == b'body'
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_bytes=1024, max_entries=2, ttl=60)
+    cache.set('a', b'1', [])
+    cache.set('b', b'2', [])
+    cache.get('a')
+    cache.set('c', b'3', [])
+    assert cache.get('b') is None
+    assert cache.get('a') == b'1' and cache.get('c') == b'3'
+    assert cache.evictions == 1
+
+
+def test_byte_cap():
+    cache = ResponseCache(max_bytes=10, max_entries=10, ttl=60)
+    cache.set('a', b'x' * 6, [])
+    cache.set('b', b'y' * 6, [])
+    assert cache.get('a') is None and cache.get('b') == b'y' * 6
+    assert cache.stats()['bytes'] == 6
+
+    # Bodies larger than the whole cache are not stored at all
+    cache.set('c', b'z' * 11, [])
+    assert cache.get('c') is None and cache.get('b') == b'y' * 6
+
+
+def test_replacing_a_key_keeps_the_byte_count():
+    cache = ResponseCache(max_bytes=100, max_entries=10, ttl=60)
+    cache.set('a', b'x' * 10, ['authors'])
+    cache.set('a', b'x' * 4, ['titles'])
+    assert cache.stats()['bytes'] == 4
+    cache.invalidate('authors')
+    assert cache.get('a') == b'x' * 4
+
+
+def test_expired_entries_are_misses():
+    cache = ResponseCache(max_bytes=1024, max_entries=4, ttl=0)
+    cache.set('a', b'body', [])
+    assert cache.get('a') is None
+    assert cache.expirations == 1
+    assert cache.stats()['entries'] == 0
+
+
+def test_invalidate_drops_only_tagged_entries():
+    cache = ResponseCache(max_bytes=1024, max_entries=10, ttl=60)
+    cache.set('list', b'1', ['titles'])
+    cache.set('one', b'2', ['titles', 'title:T1', 'author:A1'])
+    cache.set('other', b'3', ['authors'])
+    cache.invalidate('author:A1')
+    assert cache.get('one') is None
+    assert cache.get('list') == b'1' and cache.get('other') == b'3'
+    cache.invalidate('titles', 'missing')
+    assert cache.get('list') is None
+    assert cache.stats()['entries'] == 1
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ResponseCache(max_bytes=1024, max_entries=0, ttl=60)
+    cache.set('a', b'body', [])
+    assert cache.get('a') is None
@@ -0,0 +1,94 @@
+"""The /api/changes feed on top of the store's change positions"""
+import pytest
+
+import app as app_module
+
+
+def changes(client, token=None):
+    response = client.get('/api/changes', query_string={'since': token} if token else {})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_without_a_token_the_client_reloads(client):
+    body = changes(client)
+    assert body['reset'] is True
+    assert body['next_since']
+
+
+def test_writes_after_the_token_are_returned_once(client):
+    token = changes(client)['next_since']
+    au_id = client.post('/api/authors', json={'au_name': 'Smith'}).get_json()['id']
+    title_id = client.post('/api/titles', json={'title': 'T', 'authors': [{'au_id': au_id}]}).get_json()['id']
+
+    body = changes(client, token)
+    assert body['reset'] is False
+    assert [author['au_id'] for author in body['data']['authors']] == [au_id]
+    assert [title['title_id'] for title in body['data']['titles']] == [title_id]
+    assert 'change_seq' not in body['data']['authors'][0]
+
+    # Nothing written since: the next token sees nothing new
+    body = changes(client, body['next_since'])
+    assert body['data'] == {'authors': [], 'titles': [], 'deleted': {'authors': [], 'titles': []}}
+
+
+def test_rename_and_deletes(client):
+    first = client.post('/api/authors', json={'au_name': 'Smith'}).get_json()['id']
+    second = client.post('/api/authors', json={'au_name': 'Jones'}).get_json()['id']
+    solo = client.post('/api/titles', json={'title': 'Solo', 'authors': [{'au_id': first}]}).get_json()['id']
+    shared = client.post('/api/titles', json={
+        'title': 'Shared', 'authors': [{'au_id': first}, {'au_id': second}]
+    }).get_json()['id']
+    token = changes(client)['next_since']
+
+    client.put(f'/api/authors/{second}', json={'au_name': 'Jonas'})
+    body = changes(client, token)
+    assert [author['au_name'] for author in body['data']['authors']] == ['Jonas']
+    assert [title['title_id'] for title in body['data']['titles']] == [shared]
+
+    token = body['next_since']
+    client.delete(f'/api/authors/{first}')
+    body = changes(client, token)
+    assert body['data']['deleted'] == {'authors': [first], 'titles': [solo]}
+    assert [[author['au_id'] for author in title['authors']] for title in body['data']['titles']] == [[second]]
+
+    token = body['next_since']
+    client.delete(f'/api/titles/{shared}')
+    assert changes(client, token)['data']['deleted'] == {'authors': [], 'titles': [shared]}
+
+
+def test_too_many_changes_reset(client, monkeypatch):
+    token = changes(client)['next_since']
+    client.post('/api/authors', json={'au_name': 'Smith'})
+    client.post('/api/authors', json={'au_name': 'Jones'})
+    monkeypatch.setattr(app_module, 'CHANGES_MAX_ITEMS', 1)
+    assert changes(client, token)['reset'] is True
+
+
+def test_timestamp_tokens_reset_and_garbage_is_rejected(client):
+    # Tokens of the earlier timestamp format
+    assert changes(client, app_module.encode_cursor('2026-01-01T00:00:00+00:00'))['reset'] is True
+    assert client.get('/api/changes?since=garbage').status_code == 400
+
+
+def test_change_seq_counts_every_write(store):
+    assert store.change_seq() == 0
+    position = store.change_position()
+    store.insert_author({'au_name': 'Smith'}, lambda: 'A0001')
+    store.update_author('A0001', {'au_fname': 'Ann'})
+    assert store.change_seq() == 2
+
+    position, authors, titles, deletions = store.changes_since(position, 10, None, None)
+    assert position.startswith('2@')
+    assert [(author['au_id'], author['change_seq']) for author in authors] == [('A0001', 2)]
+    assert titles == [] and deletions == []
+
+
+def test_positions_past_retention_or_limit_reset(store):
+    store.insert_author({'au_name': 'Smith'}, lambda: 'A0001')
+    store.insert_author({'au_name': 'Jones'}, lambda: 'A0002')
+    assert store.changes_since('0@2000-01-01T00:00:00+00:00', 10, None, None) is None
+    assert store.changes_since(store._position(0), 1, None, None) is None
+    assert store.changes_since('stream:8263', 10, None, None) is None
+    with pytest.raises(ValueError):
+        store.changes_since('x@2026-01-01T00:00:00+00:00', 10, None, None)
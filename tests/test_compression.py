@@ -0,0 +1,74 @@
+"""Accept-Encoding negotiation and response compression"""
+import gzip
+
+import pytest
+from werkzeug.http import parse_etags
+
+import app as app_module
+from app import StreamCompressor, compress_body, encoded_etag, etag_matches, negotiate_encoding
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, None),
+    ('', None),
+    ('identity', None),
+    ('gzip', 'gzip'),
+    ('GZIP;q=0.5', 'gzip'),
+    ('gzip, br', 'br'),
+    ('gzip;q=1.0, br;q=0.8', 'gzip'),
+    ('br;q=0, gzip', 'gzip'),
+    ('*', 'br'),
+    ('*;q=0.5, gzip', 'gzip'),
+    ('gzip;q=oops', None),
+])
+def test_negotiate_encoding(monkeypatch, header, expected):
+    monkeypatch.setattr(app_module, 'ENCODINGS', ('br', 'gzip'))
+    assert negotiate_encoding(header) == expected
+
+
+def test_brotli_is_not_offered_without_the_package(monkeypatch):
+    monkeypatch.setattr(app_module, 'ENCODINGS', ('gzip',))
+    assert negotiate_encoding('br') is None
+    assert negotiate_encoding('br, gzip;q=0.1') == 'gzip'
+
+
+def test_gzip_body_and_stream_round_trip():
+    body = b'{"data": "' + b'x' * 5000 + b'"}'
+    assert gzip.decompress(compress_body(body, 'gzip')) == body
+
+    compressor = StreamCompressor('gzip')
+    chunks = [compressor.compress(body[:100]), compressor.compress(body[100:])]
+    # Every chunk is flushed, so a client can decode what it has received so far
+    assert chunks[0]
+    assert gzip.decompress(b''.join(chunks) + compressor.finish()) == body
+
+
+def test_brotli_round_trip():
+    brotli = pytest.importorskip('brotli')
+    body = b'abc' * 1000
+    assert brotli.decompress(compress_body(body, 'br')) == body
+    compressor = StreamCompressor('br')
+    assert brotli.decompress(compressor.compress(body) + compressor.finish()) == body
+
+
+def test_compressed_representation_has_its_own_etag():
+    assert encoded_etag('abc', 'gzip') == 'abc-gzip'
+    assert etag_matches(parse_etags('"abc-gzip"'), 'abc')
+
+
+def test_api_responses_are_compressed_and_revalidate(client, monkeypatch):
+    monkeypatch.setattr(app_module, 'COMPRESS_MIN_BYTES', 10)
+    client.post('/api/authors', json={'au_name': 'Smith', 'address': 'x' * 200})
+    response = client.get('/api/authors', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.get_data())
+    etag = response.headers['ETag']
+    assert etag.endswith('-gzip"')
+
+    response = client.get('/api/authors', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+
+    response = client.get('/api/authors')
+    assert 'Content-Encoding' not in response.headers
@@ -0,0 +1,48 @@
+"""ETags derived from collection versions and conditional GETs"""
+from werkzeug.http import parse_etags
+
+from app import etag_matches, make_etag
+
+
+def test_etag_follows_key_and_versions():
+    etag = make_etag('authors', (1, 2))
+    assert etag == make_etag('authors', (1, 2))
+    assert len(etag) == 20
+    assert etag != make_etag('authors', (1, 3))
+    assert etag != make_etag('titles', (1, 2))
+
+
+def test_etag_matches():
+    etag = make_etag('authors', (1,))
+    assert etag_matches(parse_etags(f'"{etag}"'), etag)
+    assert etag_matches(parse_etags(f'"other", "{etag}"'), etag)
+    assert etag_matches(parse_etags('*'), etag)
+    assert not etag_matches(parse_etags('"other"'), etag)
+    assert not etag_matches(parse_etags(None), etag)
+
+
+def test_conditional_get_until_a_write(client):
+    client.post('/api/authors', json={'au_name': 'Smith'})
+    response = client.get('/api/authors')
+    etag = response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+    response = client.get('/api/authors', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+
+    client.post('/api/authors', json={'au_name': 'Jones'})
+    response = client.get('/api/authors', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_author_detail_revalidates(client):
+    au_id = client.post('/api/authors', json={'au_name': 'Smith'}).get_json()['id']
+    etag = client.get(f'/api/authors/{au_id}').headers['ETag']
+    assert client.get(f'/api/authors/{au_id}', headers={'If-None-Match': etag}).status_code == 304
+
+    client.put(f'/api/authors/{au_id}', json={'au_fname': 'Ann'})
+    response = client.get(f'/api/authors/{au_id}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['data']['au_fname'] == 'Ann'
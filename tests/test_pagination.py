@@ -0,0 +1,49 @@
+"""Keyset pagination cursors and the page envelope"""
+import pytest
+
+import app as app_module
+from app import decode_cursor, encode_cursor, page_response, parse_limit, parse_page_args
+
+
+def test_cursor_round_trip():
+    for key in ['A0001', '', 'T-ä/+=', '2026-01-01T00:00:00+00:00']:
+        cursor = encode_cursor(key)
+        assert '=' not in cursor
+        assert decode_cursor(cursor) == key
+
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', '', encode_cursor('x')[:-2] + '!!'])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(cursor)
+
+
+def test_cursor_keys_must_be_strings():
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(42))
+
+
+def test_parse_limit(monkeypatch):
+    monkeypatch.setattr(app_module, 'MAX_PAGE_SIZE', 50)
+    assert parse_limit('10') == 10
+    assert parse_limit(500) == 50
+    for limit in ['0', '-1', 'ten', None]:
+        with pytest.raises(ValueError):
+            parse_limit(limit)
+
+
+def test_parse_page_args():
+    assert parse_page_args({'all': 'true', 'limit': 'bad'}) == (False, None, None)
+    assert parse_page_args({}) == (True, app_module.DEFAULT_PAGE_SIZE, None)
+    assert parse_page_args({'limit': '5', 'after': encode_cursor('A0002')}) == (True, 5, 'A0002')
+
+
+def test_page_response_trims_the_extra_row():
+    rows = [{'au_id': f'A{n}'} for n in range(3)]
+    page = page_response(rows, 2, 'au_id')
+    assert page['data'] == rows[:2]
+    assert decode_cursor(page['next_cursor']) == 'A1'
+
+    last = page_response(rows[:2], 2, 'au_id')
+    assert last['data'] == rows[:2] and last['next_cursor'] is None
+    assert page_response([], 2, 'au_id')['next_cursor'] is None
@@ -0,0 +1,28 @@
+"""Deferred refreshes of the materialized author statistics"""
+import app as app_module
+from app import StatsRefresher
+
+
+class RecordingStore:
+    def __init__(self):
+        self.refreshed = []
+
+    def refresh_author_stats(self, au_ids):
+        self.refreshed.append(au_ids)
+
+
+def test_marked_authors_are_refreshed_together(monkeypatch):
+    store = RecordingStore()
+    monkeypatch.setattr(app_module, 'get_store', lambda: store)
+    monkeypatch.setattr(app_module, 'STATS_REFRESH_DELAY', 60)
+    refresher = StatsRefresher()
+    refresher.mark(['A2', None])
+    refresher.mark(['A1', 'A2'])
+    assert store.refreshed == []
+
+    refresher.flush(['A1', 'A3'])
+    assert store.refreshed == [['A1']]
+    refresher.flush()
+    refresher.flush()
+    assert store.refreshed == [['A1'], ['A2']]
+    assert refresher.refreshes == 2
@@ -0,0 +1,173 @@
+"""SQLiteCatalogStore against the CatalogStore contract, and the catalog endpoints on top of it"""
+import itertools
+
+import pytest
+
+from storage import apply_projection
+
+
+def id_generator(prefix):
+    counter = itertools.count(1)
+    return lambda: f'{prefix}{next(counter):04d}'
+
+
+@pytest.fixture
+def catalog(store):
+    """Three authors and two titles, one of them co-written"""
+    new_author_id = id_generator('A')
+    for name, first in [('Smith', 'Ann'), ('Jones', 'Bo'), ('Brown', 'Cy')]:
+        store.insert_author({'au_name': name, 'au_fname': first}, new_author_id)
+    new_title_id = id_generator('T')
+    store.insert_title({
+        'title': 'Shared', 'price': 10.0, 'ytd_sales': 100,
+        'authors': [
+            {'au_id': 'A0001', 'au_ord': 1, 'royaltyper': 60},
+            {'au_id': 'A0002', 'au_ord': 2, 'royaltyper': 40},
+        ],
+    }, new_title_id)
+    store.insert_title({
+        'title': 'Solo', 'price': 5.0, 'ytd_sales': 10,
+        'authors': [{'au_id': 'A0001', 'au_ord': 1, 'royaltyper': 100}],
+    }, new_title_id)
+    return store
+
+
+# ==================== AUTHORS ====================
+
+def test_insert_and_get_author(store):
+    storage_id = store.insert_author({'au_name': 'Smith', 'contract': True}, lambda: 'A0001')
+    author = store.get_author('A0001', None)
+    assert author['_id'] == str(storage_id)
+    assert author['au_name'] == 'Smith'
+    assert author['contract'] is True
+    assert store.get_author('missing', None) is None
+
+
+def test_insert_moves_on_when_the_generated_id_is_taken(store):
+    store.insert_author({'au_name': 'Smith'}, lambda: 'A0001')
+    ids = iter(['A0001', 'A0002'])
+    author = {'au_name': 'Jones'}
+    store.insert_author(author, lambda: next(ids))
+    assert author['au_id'] == 'A0002'
+
+
+def test_rename_reaches_titles(catalog):
+    assert catalog.update_author('A0001', {'au_name': 'Smythe'})
+    names = {author['au_id']: author['au_name'] for author in catalog.get_title('T0001', None)['authors']}
+    assert names == {'A0001': 'Smythe', 'A0002': 'Jones'}
+    assert catalog.collection_versions('authors', 'titles') == (1, 1)
+    assert catalog.update_author('missing', {'au_name': 'X'}) is False
+
+
+def test_delete_author_removes_orphaned_titles_only(catalog):
+    assert catalog.author_title_counts('A0001') == (2, 1)
+    assert catalog.delete_author('A0001') == (1, 1)
+    assert catalog.get_title('T0002', None) is None
+    assert [author['au_id'] for author in catalog.get_title('T0001', None)['authors']] == ['A0002']
+    assert catalog.delete_author('A0001') is None
+
+
+# ==================== TITLES ====================
+
+def test_title_authors_keep_their_order(catalog):
+    title = catalog.get_title('T0001', None)
+    assert [(author['au_id'], author['royaltyper']) for author in title['authors']] == [('A0001', 60), ('A0002', 40)]
+
+
+def test_update_title_replaces_authors_and_returns_previous(catalog):
+    previous = catalog.update_title('T0002', {'price': 7.5, 'authors': [{'au_id': 'A0003', 'royaltyper': 100}]})
+    assert previous['authors'] == [{'au_id': 'A0001'}]
+    title = catalog.get_title('T0002', None)
+    assert title['price'] == 7.5
+    assert [author['au_id'] for author in title['authors']] == ['A0003']
+    assert catalog.update_title('missing', {'price': 1}) is None
+
+
+def test_delete_title(catalog):
+    assert catalog.delete_title('T0002')['authors'] == [{'au_id': 'A0001'}]
+    assert catalog.get_title('T0002', None) is None
+    assert catalog.delete_title('T0002') is None
+
+
+def test_titles_by_author_carry_only_that_author(catalog):
+    titles = catalog.titles_by_author('A0002')
+    assert [title['title_id'] for title in titles] == ['T0001']
+    assert [author['au_id'] for author in titles[0]['authors']] == ['A0002']
+
+
+def test_author_profile(catalog):
+    profile = catalog.author_profile('A0001')
+    assert profile['author']['au_name'] == 'Smith'
+    assert [title['title_id'] for title in profile['titles']] == ['T0001', 'T0002']
+    assert profile['stats'] == {
+        'titles': 2,
+        'royaltyper_total': 160,
+        'royaltyper_avg': 80,
+        'ytd_sales': 110,
+        'revenue': 10.0 * 100 * 0.6 + 5.0 * 10,
+    }
+    assert catalog.author_profile('A0003')['stats'] == {}
+    assert catalog.author_profile('missing') is None
+
+
+# ==================== PAGINATION ====================
+
+def test_find_authors_pages_by_au_id(catalog):
+    assert [author['au_id'] for author in catalog.find_authors(None, 2, None)] == ['A0001', 'A0002']
+    assert [author['au_id'] for author in catalog.find_authors('A0002', 2, None)] == ['A0003']
+
+
+def test_iter_authors_crosses_batches(catalog):
+    # batch_size is 2, so three authors take two batches
+    assert [author['au_id'] for author in catalog.iter_authors({'au_id': 1, '_id': 0})] == ['A0001', 'A0002', 'A0003']
+
+
+def test_apply_projection():
+    title = {'_id': '1', 'title': 'T', 'price': 1, 'authors': [{'au_id': 'A', 'au_name': 'N', 'royaltyper': 50}]}
+    assert apply_projection(title, {'title': 1, 'authors.au_id': 1}) == {'_id': '1', 'title': 'T', 'authors': [{'au_id': 'A'}]}
+    assert apply_projection(title, {'authors': 0, '_id': 0}) == {'title': 'T', 'price': 1}
+
+
+def test_cursor_walks_every_author_once(client):
+    for name in ['Smith', 'Jones', 'Brown', 'White', 'Black']:
+        assert client.post('/api/authors', json={'au_name': name}).status_code == 200
+
+    seen, after = [], None
+    while True:
+        response = client.get('/api/authors', query_string={'limit': 2, **({'after': after} if after else {})})
+        body = response.get_json()
+        assert len(body['data']) <= 2
+        seen.extend(author['au_name'] for author in body['data'])
+        after = body['next_cursor']
+        if after is None:
+            break
+    assert sorted(seen) == ['Black', 'Brown', 'Jones', 'Smith', 'White']
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get('/api/authors?after=not-a-cursor').status_code == 400
+
+
+# ==================== HANDLERS ====================
+
+def test_title_with_duplicate_author_is_rejected(client):
+    au_id = client.post('/api/authors', json={'au_name': 'Smith'}).get_json()['id']
+    response = client.post('/api/titles', json={'title': 'Twice', 'authors': [{'au_id': au_id}, {'au_id': au_id}]})
+    assert response.status_code == 400
+    assert response.get_json()['duplicates'] == [au_id]
+
+    title_id = client.post('/api/titles', json={'title': 'Once', 'authors': [{'au_id': au_id}]}).get_json()['id']
+    response = client.put(f'/api/titles/{title_id}', json={'authors': [{'au_id': au_id}, {'au_id': au_id}]})
+    assert response.status_code == 400
+
+
+def test_author_profile_endpoint(client):
+    au_id = client.post('/api/authors', json={'au_name': 'Smith'}).get_json()['id']
+    client.post('/api/titles', json={'title': 'T', 'price': 2, 'ytd_sales': 5, 'authors': [{'au_id': au_id}]})
+    response = client.get(f'/api/authors/{au_id}/profile')
+    assert response.status_code == 200
+    profile = response.get_json()['data']
+    assert profile['author']['au_id'] == au_id
+    assert [title['title'] for title in profile['titles']] == ['T']
+    assert profile['stats']['revenue'] == 10
+    assert client.get('/api/authors/missing/profile').status_code == 404
@@ -0,0 +1,78 @@
+"""Write generations shared through an mmapped file, and the per-worker version cache"""
+import os
+
+import pytest
+
+import app as app_module
+from app import SharedGenerations, VersionCache
+
+pytestmark = pytest.mark.skipif(app_module.fcntl is None, reason='needs fcntl')
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'generations')
+
+
+def test_generations_are_shared_through_the_file(path):
+    writer, reader = SharedGenerations(path), SharedGenerations(path)
+    assert reader.read(('authors', 'titles')) == (0, 0)
+    writer.bump('authors')
+    writer.bump('authors', 'titles')
+    assert reader.read(('authors', 'titles')) == (2, 1)
+    assert os.path.getsize(path) == SharedGenerations.SIZE
+
+
+def test_a_collection_named_twice_is_bumped_once(path):
+    generations = SharedGenerations(path)
+    generations.bump('authors', 'authors')
+    assert generations.read(('authors',)) == (1,)
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs fork')
+def test_forked_worker_bumps_are_seen_by_the_parent(path):
+    generations = SharedGenerations(path)
+    generations.read(('titles',))
+    pid = os.fork()
+    if pid == 0:
+        try:
+            generations.bump('titles')
+        finally:
+            os._exit(0)
+    os.waitpid(pid, 0)
+    assert generations.read(('titles',)) == (1,)
+
+
+def test_version_cache_refreshes_only_when_a_generation_moves(path):
+    cache = VersionCache(SharedGenerations(path), max_age=60)
+    collections = ('authors',)
+    versions, token = cache.lookup(collections)
+    assert versions is None
+    cache.remember(collections, token, (5,))
+
+    assert cache.lookup(collections)[0] == (5,)
+    assert cache.lookup(('authors', 'titles'))[0] is None
+
+    # A write in any worker on the host
+    SharedGenerations(path).bump('authors')
+    versions, token = cache.lookup(collections)
+    assert versions is None
+    cache.remember(collections, token, (6,))
+    assert cache.lookup(collections)[0] == (6,)
+    assert (cache.hits, cache.refreshes) == (2, 3)
+
+
+def test_version_cache_entries_expire(path):
+    cache = VersionCache(SharedGenerations(path), max_age=0)
+    _, token = cache.lookup(('authors',))
+    cache.remember(('authors',), token, (1,))
+    assert cache.lookup(('authors',))[0] is None
+
+
+def test_without_shared_generations_every_lookup_reads_the_store():
+    cache = VersionCache(None, max_age=60)
+    assert cache.lookup(('authors',)) == (None, None)
+    cache.remember(('authors',), None, (1,))
+    cache.bump('authors')
+    assert cache.lookup(('authors',)) == (None, None)
+    assert cache.stats()['shared'] is None